@@ -1,4 +1,5 @@
 import json
+import os
 import random
 import time
 import sys
@@ -16,55 +17,54 @@ import string
 from random_word import RandomWords
 from urllib.parse import urlparse, urljoin
 
+from ducktrack.control import send_command
+from ducktrack.page_candidates import ACTION_WEIGHTS, find_candidates, scroll_candidate_into_view
+from ducktrack.util import get_recordings_dir
+
 SEED_WEBSITES_FILE = 'seed_websites.json'
 MIN_WAIT_SECONDS = 5
 MAX_WAIT_SECONDS = 15
 INTERACTION_TIMEOUT_MS = 10000
-INTERACTION_DELAY_MIN = 0.75  # Reduced from 1.5
-INTERACTION_DELAY_MAX = 1.5   # Reduced from 3.0 (minimal delay)
 NUM_INTERACTIONS = 50
 BROWSER_TYPE = 'chromium'
+PAGE_SETTLE_SECONDS = 2.0  # Fixed pause after the load event that the page readiness wait replaces
+BROWSER_RESTART_EVERY = 25  # Sessions before a reused browser is relaunched (--reuse-browser)
 
 # Define hotkeys for pyautogui to trigger (matching those in ducktrack app)
 RECORD_HOTKEY = ['ctrl', 'alt', 'r'] 
 STOP_HOTKEY = ['ctrl', 'alt', 's'] # Using the same key for toggle
 RECORDING_APP_NAME = "DuckTrack" # Name of the recording application
 
-# Input types that should trigger typing instead of just clicking
-TYPING_INPUT_TYPES = ['text', 'email', 'password', 'search', 'url', 'tel', 'number']
-
-# Define selectors
-INTERACTIVE_SELECTOR = (
-    'a:visible, button:visible, select:visible, ' # Links, buttons, dropdowns
-    'input:visible[type="button"], input:visible[type="submit"], ' # Input buttons
-    'input:visible[type="checkbox"], input:visible[type="radio"], '   # Checkboxes, Radio buttons
-    '[role="button"]:visible, [role="link"]:visible, [role="checkbox"]:visible, ' # ARIA roles
-    '[role="radio"]:visible, [role="combobox"]:visible, [role="option"]:visible, ' # More ARIA roles
-    '[role="menuitem"]:visible, [role="tab"]:visible, [onclick]:visible' # ARIA roles + elements with explicit onclick handlers
-)
-TYPING_SELECTOR = (
-    # Standard input types
-    'textarea:visible, ' +
-    ', '.join([f'input:visible[type="{t}"]' for t in TYPING_INPUT_TYPES]) + ', ' +
-    # Input elements defaulting to type="text"
-    'input:visible:not([type]), ' +
-    # Common ARIA roles for text input
-    '[role="textbox"]:visible, [role="searchbox"]:visible, ' +
-    # Elements made editable via attribute
-    '[contenteditable="true"]:visible'
-)
-
 # Enhanced random text generation
 ALL_CHARS = string.ascii_letters + string.digits + string.punctuation + ' ' * 15 # More spaces
 
 # Adjust timing constants for smoother interactions
 # Set delays to near zero
-INTERACTION_DELAY_MIN = 0.75  # Reduced from 1.5
-INTERACTION_DELAY_MAX = 1.5   # Reduced from 3.0 (minimal delay)
 MOUSE_MOVE_DURATION_MIN = 0.5  # Reduced from 0.8 
 MOUSE_MOVE_DURATION_MAX = 1.0  # Reduced from 1.5 (minimal duration)
-CLICK_PAUSE_BEFORE = 0.2  # Reduced from 0.3
-CLICK_PAUSE_AFTER = 0.3   # Reduced from 0.5
+CLICK_PAUSE_BEFORE = 0.2  # Human-like hesitation before clicking
+
+# Readiness waits: wait for something observable instead of a fixed sleep, up to a timeout
+READINESS_POLL_SEC = 0.05
+VIEWPORT_STABLE_SEC = 0.3        # Viewport size unchanged this long counts as settled
+FULLSCREEN_TIMEOUT_SEC = 5.0
+NETWORK_IDLE_TIMEOUT_SEC = 5.0
+DOM_QUIET_MS = 300               # No DOM mutations for this long counts as quiet
+DOM_QUIET_TIMEOUT_SEC = 3.0
+FOCUS_TIMEOUT_SEC = 1.0
+RECORDER_ACK_TIMEOUT_SEC = 5.0
+
+# Fixed sleeps that readiness waits replaced, used to report the time saved
+INTERACTION_DELAY_SECONDS = 1.125  # Mean of the old 0.75-1.5s pause between interactions
+CLICK_PAUSE_AFTER = 0.3
+SCROLL_PAUSE_SECONDS = 0.55
+FOCUS_PAUSE_SECONDS = 0.45
+HOTKEY_PAUSE_SECONDS = 1.5
+FULLSCREEN_PAUSE_SECONDS = 3.0
+
+# Human-like random pauses, kept separate from readiness; scaled by --human-pause-scale (0 disables)
+HUMAN_PAUSE_MIN = 0.1
+HUMAN_PAUSE_MAX = 0.5
 
 class MacWindow:
     """Helper class to store macOS window info and provide activate method."""
@@ -81,7 +81,11 @@ class MacWindow:
         self.isActive = False # We'll need a separate script to check this reliably if needed, activate brings it to front
 
     def activate(self):
-        """Uses AppleScript to activate the application and bring the window to front."""
+        """
+        Uses AppleScript to activate the application and bring the window to front. Returns
+        whether this window was brought to front; False when only the application could be
+        activated (e.g. no window has this title any more) or AppleScript failed.
+        """
         # Escape quotes in title for AppleScript
         safe_title = self.title.replace('"', '\\"')
         script = f'''
@@ -103,8 +107,9 @@ class MacWindow:
             # Using osascript -e to execute the script string directly
             process = subprocess.run(['osascript', '-e', script], capture_output=True, text=True, check=True, timeout=5)
             print(f"AppleScript activate output: {process.stdout.strip()}")
-            self.isActive = True # Assume activation succeeded if no error
+            self.isActive = process.stdout.strip() == "OK"
             time.sleep(0.3) # Small delay after activation
+            return self.isActive
         except subprocess.CalledProcessError as e:
             print(f"Error activating window via AppleScript: {e}")
             print(f"Stderr: {e.stderr}")
@@ -120,6 +125,8 @@ class MacWindow:
             print("Error: AppleScript activation command timed out.")
         except Exception as e:
             print(f"Unexpected error during AppleScript activation: {e}")
+        self.isActive = False
+        return False
 
     def __repr__(self):
         return f"MacWindow(title='{self.title}', app='{self.app_name}', pos=({self.left},{self.top}), size=({self.width},{self.height}))"
@@ -341,6 +348,69 @@ def get_browser_window_macos(browser_type):
         print(f"Unexpected error during AppleScript window search: {e}")
         return None
 
+class BrowserWindowCache:
+    """
+    Caches the browser window found by get_browser_window for one session.
+
+    Finding the window is slow (an AppleScript run on macOS, a walk over every window on
+    Windows), so it is only searched for again when the page reports that the window moved or
+    was resized (window.screenX/screenY/outerWidth/outerHeight) or when activating it fails.
+    """
+
+    def __init__(self, page, browser_type=BROWSER_TYPE):
+        self.page = page
+        self.browser_type = browser_type
+        self.window = None
+        self.has_focus = False
+        self._geometry = None
+        self.hits = 0
+        self.misses = 0
+
+    def _page_state(self):
+        try:
+            *geometry, has_focus = self.page.evaluate('() => [screenX, screenY, outerWidth, outerHeight, document.hasFocus()]')
+            return tuple(geometry), has_focus
+        except PlaywrightError:
+            return None, False
+
+    def get(self):
+        """Returns the browser window, re-finding it only if its geometry changed."""
+        geometry, self.has_focus = self._page_state()
+        if self.window is not None and geometry is not None and geometry == self._geometry:
+            self.hits += 1
+            return self.window
+        self.misses += 1
+        self.window = get_browser_window(self.browser_type)
+        self._geometry = geometry
+        return self.window
+
+    def _activate_window(self):
+        """
+        Activates the cached window and returns whether that worked. MacWindow.activate reports
+        failure by returning False; pygetwindow windows raise instead and return None.
+        """
+        try:
+            activated = self.window.activate() is not False
+        except Exception as e:
+            print(f"Warning: Could not activate browser window: {e}")
+            return False
+        time.sleep(0.1) # Reduced from 0.2
+        return activated
+
+    def activate(self):
+        """Brings the window to the front unless the page already has focus, re-finding it once if that fails."""
+        if self.has_focus or self.window is None:
+            return
+        if not self._activate_window():
+            print("Warning: Could not activate cached browser window, finding it again.")
+            self.window = None
+            if self.get():
+                self._activate_window()
+
+    def summary(self):
+        lookups = self.hits + self.misses
+        return f"window cache {self.hits}/{lookups} hits ({self.hits / max(lookups, 1):.0%})"
+
 def get_browser_window(browser_type):
     """Find the browser window using OS-specific methods."""
     if sys.platform == 'darwin': # macOS
@@ -564,22 +634,53 @@ def activate_recording_app():
         print(f"Error in activate_recording_app: {e}")
         return False
 
-def trigger_hotkey(keys):
-    """Triggers a keyboard hotkey combination using pyautogui."""
+def trigger_hotkey(keys, expect_recording=None, replaces=HOTKEY_PAUSE_SECONDS):
+    """
+    Triggers a keyboard hotkey combination using pyautogui. With `expect_recording`, waits for
+    DuckTrack to acknowledge the recording starting (True) or stopping (False) instead of
+    sleeping for a fixed time.
+    """
     try:
         # First try to activate the recording app
         activation_success = activate_recording_app()
         
         if activation_success:
             print(f"Triggering hotkey via pyautogui: {'+'.join(keys)}")
+            sent_at = time.time()
             pyautogui.hotkey(*keys)
-            time.sleep(1.5) # Increased delay to ensure app registers it
+            if expect_recording is None:
+                time.sleep(HOTKEY_PAUSE_SECONDS) # Increased delay to ensure app registers it
+            elif not readiness.recorder(expect_recording, sent_at, replaces=replaces):
+                print(f"Warning: DuckTrack did not acknowledge {'start' if expect_recording else 'stop'} of recording.")
         else:
             print(f"Skipping hotkey {'+'.join(keys)} because recording app activation failed.")
     except Exception as e:
         print(f"Warning: Could not trigger hotkey {'+'.join(keys)}. Error: {e}")
         print("Check pyautogui permissions/dependencies if this persists (e.g., Accessibility on macOS).")
 
+def control_recording(command, replaces=HOTKEY_PAUSE_SECONDS):
+    """
+    Sends 'start' or 'stop' to DuckTrack's local control server and waits for its acknowledgement.
+    No window is activated and no keys are pressed, so nothing ends up in events.jsonl. Falls back
+    to the hotkeys if the control server isn't reachable. Returns True if the control server was used.
+    """
+    started = time.perf_counter()
+    try:
+        ack = send_command(command)
+    except OSError as e:
+        print(f"DuckTrack control server not reachable ({e}), falling back to the hotkey.")
+        trigger_hotkey(RECORD_HOTKEY if command == 'start' else STOP_HOTKEY,
+                       expect_recording=command == 'start', replaces=replaces)
+        return False
+
+    readiness.log(replaces, started, ack.get('ok', False) and ack.get('obs_acknowledged', False))
+    if ack.get('ok'):
+        print(f"DuckTrack acknowledged '{command}': recording_path={ack.get('recording_path')}, "
+              f"obs_state={ack.get('obs_state')}")
+    else:
+        print(f"Warning: DuckTrack rejected '{command}': {ack.get('error')}")
+    return True
+
 def get_domain(url):
     """Extracts the domain (netloc) from a URL string."""
     try:
@@ -721,27 +822,173 @@ def calculate_screen_coordinates(window_pos, logical_pos, dpr, debug=False):
     
     return screen_x, screen_y
 
-def interact_with_website(page, num_interactions=NUM_INTERACTIONS, debug_mode=False):
-    """Uses Playwright to find elements, pygetwindow to find the window, and pyautogui to interact."""
-    print(f"Page loaded: {page.title()}")
-    # time.sleep(random.uniform(2.5, 4.0)) # REMOVED initial wait
-
-    # --- Initialize Tracking Sets ---
-    visited_urls = set()
-    interacted_elements = set()
-    current_url = page.url
-    visited_urls.add(current_url)
-    print(f"Initial URL: {current_url}")
-    # --- End Initialization ---
-
-    # Get initial domain
-    initial_url = page.url
-    initial_domain = get_domain(initial_url)
-    if initial_domain:
-        print(f"Operating on domain: {initial_domain}")
-    else:
-        print(f"Warning: Could not determine initial domain for {initial_url}")
+# In-page wait that resolves once no DOM mutation has happened for `quietMs` (true), or after
+# `timeoutMs` (false)
+DOM_QUIET_SCRIPT = """
+([quietMs, timeoutMs]) => new Promise((resolve) => {
+    const start = performance.now();
+    let last = start;
+    const observer = new MutationObserver(() => { last = performance.now(); });
+    observer.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+    const check = () => {
+        const now = performance.now();
+        if (now - last >= quietMs || now - start >= timeoutMs) {
+            observer.disconnect();
+            resolve(now - last >= quietMs);
+        } else {
+            setTimeout(check, Math.min(quietMs - (now - last), 100));
+        }
+    };
+    setTimeout(check, quietMs);
+})
+"""
+
+def latest_recording_dir():
+    """The newest DuckTrack recording directory, or None."""
+    try:
+        entries = [e for e in os.scandir(get_recordings_dir()) if e.is_dir() and e.name.startswith('recording-')]
+    except OSError:
+        return None
+    return max(entries, key=lambda e: e.name).path if entries else None
+
+class Readiness:
+    """
+    Waits on observable conditions (viewport settled, network idle, DOM quiet, focus, recorder
+    acknowledgement) in place of fixed sleeps. Each wait gives up after its timeout and the
+    caller carries on as it did after the fixed sleep.
+
+    Every wait is logged against the fixed sleep it replaces, so the time saved per session
+    can be reported. Human-like pauses are a separate knob (`human_pause_scale`) and are
+    logged separately.
+    """
+
+    def __init__(self, human_pause_scale=1.0):
+        self.human_pause_scale = human_pause_scale
+        self.reset()
+
+    def reset(self):
+        self.replaced_sec = 0.0
+        self.waited_sec = 0.0
+        self.human_sec = 0.0
+        self.waits = 0
+        self.timeouts = 0
+
+    def log(self, replaces, started, ready):
+        """Records a wait that started at `started` in place of a `replaces`-second sleep."""
+        self.replaced_sec += replaces
+        self.waited_sec += time.perf_counter() - started
+        self.waits += 1
+        if not ready:
+            self.timeouts += 1
+        return ready
+
+    def human_pause(self, min_sec, max_sec=None):
+        """Sleeps for a random human-like pause, scaled by human_pause_scale."""
+        pause = random.uniform(min_sec, max_sec if max_sec is not None else min_sec) * self.human_pause_scale
+        if pause > 0:
+            time.sleep(pause)
+            self.human_sec += pause
+
+    def viewport_settled(self, page, replaces=FULLSCREEN_PAUSE_SECONDS, timeout=FULLSCREEN_TIMEOUT_SEC,
+                         require_fullscreen=True):
+        """Waits until the window size has stopped changing (and covers the screen, if required)."""
+        started = time.perf_counter()
+        deadline = started + timeout
+        last_size, stable_since = None, started
+        while time.perf_counter() < deadline:
+            try:
+                size = page.evaluate('() => [innerWidth, innerHeight, outerWidth, outerHeight, screen.width, screen.height]')
+            except PlaywrightError:
+                size = None
+            now = time.perf_counter()
+            if size != last_size:
+                last_size, stable_since = size, now
+            elif size and now - stable_since >= VIEWPORT_STABLE_SEC and \
+                    (not require_fullscreen or (size[2] >= size[4] and size[3] >= size[5])):
+                return self.log(replaces, started, True)
+            time.sleep(READINESS_POLL_SEC)
+        return self.log(replaces, started, False)
+
+    def dom_quiet(self, page, replaces, quiet_ms=DOM_QUIET_MS, timeout=DOM_QUIET_TIMEOUT_SEC):
+        """Waits until the DOM has had no mutations for quiet_ms, following a navigation if one starts."""
+        started = time.perf_counter()
+        try:
+            ready = page.evaluate(DOM_QUIET_SCRIPT, [quiet_ms, timeout * 1000])
+        except PlaywrightError:
+            # The page navigated away mid-wait; wait for the new document instead
+            try:
+                page.wait_for_load_state('domcontentloaded', timeout=timeout * 1000)
+                ready = page.evaluate(DOM_QUIET_SCRIPT, [quiet_ms, timeout * 1000])
+            except PlaywrightError:
+                ready = False
+        return self.log(replaces, started, ready)
+
+    def page_ready(self, page, replaces=PAGE_SETTLE_SECONDS):
+        """Waits for the network to go idle and then for the DOM to go quiet."""
+        started = time.perf_counter()
+        try:
+            page.wait_for_load_state('networkidle', timeout=NETWORK_IDLE_TIMEOUT_SEC * 1000)
+            network_idle = True
+        except PlaywrightError:
+            network_idle = False  # Long-polling/analytics pages never go idle
+        try:
+            dom_quiet = page.evaluate(DOM_QUIET_SCRIPT, [DOM_QUIET_MS, DOM_QUIET_TIMEOUT_SEC * 1000])
+        except PlaywrightError:
+            dom_quiet = False
+        return self.log(replaces, started, network_idle and dom_quiet)
+
+    def focus(self, page, replaces=FOCUS_PAUSE_SECONDS, timeout=FOCUS_TIMEOUT_SEC):
+        """Waits until an element other than the body has keyboard focus."""
+        started = time.perf_counter()
+        try:
+            page.wait_for_function('() => document.activeElement && document.activeElement !== document.body',
+                                   timeout=timeout * 1000, polling=int(READINESS_POLL_SEC * 1000))
+            ready = True
+        except PlaywrightError:
+            ready = False
+        return self.log(replaces, started, ready)
+
+    def recorder(self, recording, since, replaces=HOTKEY_PAUSE_SECONDS, timeout=RECORDER_ACK_TIMEOUT_SEC):
+        """
+        Waits for DuckTrack to acknowledge a start (a new recording directory with events.jsonl)
+        or a stop (that recording's metadata.json) requested at wall-clock time `since`.
+        """
+        started = time.perf_counter()
+        deadline = started + timeout
+        # Directory names and times have one-second resolution
+        since = since - 1.0
+        while time.perf_counter() < deadline:
+            recording_dir = latest_recording_dir()
+            try:
+                if recording_dir and recording:
+                    acknowledged = os.path.getctime(recording_dir) >= since and \
+                        os.path.exists(os.path.join(recording_dir, 'events.jsonl'))
+                else:
+                    acknowledged = recording_dir is not None and \
+                        os.path.getmtime(os.path.join(recording_dir, 'metadata.json')) >= since
+            except OSError:
+                acknowledged = False
+            if acknowledged:
+                return self.log(replaces, started, True)
+            time.sleep(READINESS_POLL_SEC)
+        return self.log(replaces, started, False)
+
+    def summary(self):
+        return (f"Readiness: {self.waits} waits took {self.waited_sec:.1f}s instead of {self.replaced_sec:.1f}s "
+                f"of fixed sleeps (saved {self.replaced_sec - self.waited_sec:.1f}s, {self.timeouts} timed out), "
+                f"human pauses {self.human_sec:.1f}s")
+
+readiness = Readiness()
+
+def is_page_fullscreen(page):
+    """Whether the page's browser window covers the whole screen."""
+    try:
+        return page.evaluate('() => window.outerWidth >= screen.width && window.outerHeight >= screen.height')
+    except PlaywrightError:
+        return False
 
+def enter_fullscreen(page):
+    """Activates the browser window, toggles fullscreen and returns whether the page is now fullscreen."""
     # --- Activate Browser Window BEFORE Fullscreen ---
     print("Finding and activating browser window before fullscreen toggle...")
     browser_window_for_fullscreen = get_browser_window(BROWSER_TYPE)
@@ -764,7 +1011,56 @@ def interact_with_website(page, num_interactions=NUM_INTERACTIONS, debug_mode=Fa
     else:  # Windows/Linux
         print("Using F11 fullscreen shortcut...")
         pyautogui.press('f11')
-    time.sleep(3.0) # Reduced wait time for fullscreen transition from 4.5
+    readiness.viewport_settled(page)
+    return is_page_fullscreen(page)
+
+def reactivate_browser_after_hotkey():
+    """Brings the browser back to the front on macOS after the recording hotkey focused DuckTrack."""
+    if sys.platform != 'darwin':
+        return
+    # Try to reactivate the browser window through AppleScript
+    browser_activate_script = f'''
+        tell application "System Events"
+            tell application process "Chromium"
+                set frontmost to true
+            end tell
+        end tell
+        return "Browser reactivated"
+    '''
+    try:
+        subprocess.run(['osascript', '-e', browser_activate_script], 
+                      capture_output=True, text=True, check=False)
+        print("Reactivated browser window after starting recording")
+        time.sleep(0.5) # Reduced from 1.0
+    except Exception as e:
+        print(f"Error reactivating browser: {e}")
+
+def interact_with_website(page, num_interactions=NUM_INTERACTIONS, debug_mode=False, toggle_fullscreen=True):
+    """
+    Uses Playwright to find elements, pygetwindow to find the window, and pyautogui to interact.
+    Pass toggle_fullscreen=False if the window was already made fullscreen with enter_fullscreen.
+    """
+    print(f"Page loaded: {page.title()}")
+    # time.sleep(random.uniform(2.5, 4.0)) # REMOVED initial wait
+
+    # --- Initialize Tracking Sets ---
+    visited_urls = set()
+    interacted_elements = set()
+    current_url = page.url
+    visited_urls.add(current_url)
+    print(f"Initial URL: {current_url}")
+    # --- End Initialization ---
+
+    # Get initial domain
+    initial_url = page.url
+    initial_domain = get_domain(initial_url)
+    if initial_domain:
+        print(f"Operating on domain: {initial_domain}")
+    else:
+        print(f"Warning: Could not determine initial domain for {initial_url}")
+
+    if toggle_fullscreen:
+        enter_fullscreen(page)
 
     screen_width, screen_height = pyautogui.size()
     print(f"Screen dimensions: {screen_width}x{screen_height}")
@@ -818,38 +1114,37 @@ def interact_with_website(page, num_interactions=NUM_INTERACTIONS, debug_mode=Fa
             print(f"Test coords: Logical (100,100) → Screen ({test_screen_x},{test_screen_y})")
 
     # Initial window fetch (might be slightly delayed after F11)
-    browser_window = get_browser_window(BROWSER_TYPE)
+    window_cache = BrowserWindowCache(page)
+    browser_window = window_cache.get()
     if browser_window:
         print(f"Initial window guess: '{browser_window.title}' at ({browser_window.left}, {browser_window.top}) Size: {browser_window.width}x{browser_window.height}")
 
+    interactions_started = time.perf_counter()
+    interactions_attempted = 0
+    discovery_seconds = 0.0
+
     for i in range(num_interactions):
         print(f"--- Interaction {i + 1}/{num_interactions} ---")
         if page.is_closed():
             print("Page closed, stopping interactions.")
             break
+        interactions_attempted += 1
 
-        # Re-fetch window info before each interaction, in case it moved/resized
-        current_browser_window = get_browser_window(BROWSER_TYPE)
+        # Re-fetch window info only if it moved/resized since the last interaction
+        current_browser_window = window_cache.get()
         if not current_browser_window:
             raise Exception("Browser window not found")
         else:
-            try:
-                if not current_browser_window.isActive:
-                    # print("Activating browser window...") # Reduce noise
-                    current_browser_window.activate()
-                    time.sleep(0.1) # Reduced from 0.2
-            except Exception as e:
-                print(f"Warning: Could not activate browser window: {e}")
+            window_cache.activate()
+            current_browser_window = window_cache.window or current_browser_window
             window_pos = {'x': current_browser_window.left, 'y': current_browser_window.top}
             print(f"Using window pos: ({window_pos['x']}, {window_pos['y']}) Size: {current_browser_window.width}x{current_browser_window.height}")
 
         try:
             # --- Find all potentially relevant elements BEFORE the action --- 
-            all_interactive_elements = page.query_selector_all(INTERACTIVE_SELECTOR)
-            all_typing_elements = page.query_selector_all(TYPING_SELECTOR)
-            
-            visible_interactive = [el for el in all_interactive_elements if el.is_visible() and el.is_enabled()]
-            visible_typing = [el for el in all_typing_elements if el.is_visible() and el.is_enabled()]
+            discovery_start = time.perf_counter()
+            visible_interactive, visible_typing, visible_images = find_candidates(page)
+            discovery_seconds += time.perf_counter() - discovery_start
             print(f"Debug: Found {len(visible_interactive)} visible/enabled interactive elements.")
             print(f"Debug: Found {len(visible_typing)} visible/enabled typing elements.")
             # --- End element finding --- 
@@ -860,17 +1155,17 @@ def interact_with_website(page, num_interactions=NUM_INTERACTIONS, debug_mode=Fa
 
             # Always possible actions
             possible_actions.extend(['scroll', 'move'])
-            action_weights.extend([15, 15]) # Original weights
+            action_weights.extend([ACTION_WEIGHTS['scroll'], ACTION_WEIGHTS['move']])
 
             # Add click if possible
             if visible_interactive:
                 possible_actions.append('click')
-                action_weights.append(35) # Original weight
+                action_weights.append(ACTION_WEIGHTS['click'])
             
             # Add type if possible
             if visible_typing:
                 possible_actions.append('type')
-                action_weights.append(35) # Original weight
+                action_weights.append(ACTION_WEIGHTS['type'])
 
             if not possible_actions: # Should not happen with scroll/move always present, but safety check
                 print("Warning: No possible actions found, defaulting to move.")
@@ -895,31 +1190,27 @@ def interact_with_website(page, num_interactions=NUM_INTERACTIONS, debug_mode=Fa
                 target_candidates = []
 
                 # Combine candidates: interactive, typing, and images
-                potential_targets = visible_interactive + visible_typing + page.query_selector_all('img:visible')
+                potential_targets = visible_interactive + visible_typing + visible_images
                 random.shuffle(potential_targets) # Shuffle to avoid always picking the first off-screen one
 
                 if viewport_size:
                     vp_height = viewport_size['height']
                     for el in potential_targets:
-                        try:
-                            bbox = el.bounding_box()
-                            if bbox:
-                                # Check if element is mostly outside the viewport (top or bottom)
-                                if bbox['y'] < 10 or bbox['y'] + bbox['height'] > vp_height - 10:
-                                    target_candidates.append(el)
-                                    # Optional: Break early if we found a few candidates
-                                    # if len(target_candidates) >= 5: break 
-                        except PlaywrightError:
-                            continue # Ignore elements that error out on bounding_box
+                        bbox = el['bbox']
+                        # Check if element is mostly outside the viewport (top or bottom)
+                        if bbox['y'] < 10 or bbox['y'] + bbox['height'] > vp_height - 10:
+                            target_candidates.append(el)
 
                 if target_candidates:
                     scroll_target_element = random.choice(target_candidates)
-                    element_text_desc = "Image" if scroll_target_element.evaluate('el => el.tagName.toLowerCase()') == 'img' else (scroll_target_element.inner_text() or scroll_target_element.get_attribute('aria-label') or "[Scroll Target]")[:40].strip()
+                    element_text_desc = "Image" if scroll_target_element['tag'] == 'img' else (scroll_target_element['text'] or scroll_target_element['aria_label'] or "[Scroll Target]")[:40].strip()
                     print(f"Action: Scrolling towards element: '{element_text_desc}'")
                     try:
-                        scroll_target_element.scroll_into_view_if_needed(timeout=INTERACTION_TIMEOUT_MS // 2)
-                        print("Debug: scroll_into_view_if_needed completed.")
-                        action_performed = True
+                        scroll_target_element = scroll_candidate_into_view(page, scroll_target_element)
+                        if scroll_target_element:
+                            print("Debug: scroll into view completed.")
+                        else:
+                            print(f"Warning: Scroll target '{element_text_desc}' is no longer on the page.")
                     except PlaywrightError as scroll_err:
                         print(f"Warning: Could not scroll to target element '{element_text_desc}': {scroll_err}")
                         scroll_target_element = None # Failed to scroll
@@ -964,8 +1255,8 @@ def interact_with_website(page, num_interactions=NUM_INTERACTIONS, debug_mode=Fa
                         visible_typing_elements=visible_typing)
                 # --- End Scroll Logic ---
                 
-                # Add extra pause after scrolling - REMOVED -> Added back
-                time.sleep(random.uniform(0.35, 0.75))  
+                # Let lazily loaded content settle after scrolling
+                readiness.dom_quiet(page, replaces=SCROLL_PAUSE_SECONDS)
             
             elif action == 'click' and window_pos is not None:
                 print("Action: Finding CLICKABLE element (non-typing)...")
@@ -975,13 +1266,12 @@ def interact_with_website(page, num_interactions=NUM_INTERACTIONS, debug_mode=Fa
 
                 if visible_interactive:
                     target_element = random.choice(visible_interactive)
-                    element_text_desc = (target_element.inner_text() or target_element.get_attribute('value') or target_element.get_attribute('aria-label') or target_element.get_attribute('placeholder') or "[No Text/Desc]")[:60].strip()
+                    element_text_desc = (target_element['text'] or target_element['value'] or target_element['aria_label'] or target_element['placeholder'] or "[No Text/Desc]")[:60].strip()
                     
                     try:
                         # --- Check for Mailto and Cross-Domain Links --- 
-                        tag_name = target_element.evaluate('el => el.tagName.toLowerCase()')
-                        if tag_name == 'a':
-                            href = target_element.get_attribute('href')
+                        if target_element['tag'] == 'a':
+                            href = target_element['href']
                             if href:
                                 href_lower_stripped = href.lower().strip()
                                 # Skip mailto links
@@ -1005,9 +1295,9 @@ def interact_with_website(page, num_interactions=NUM_INTERACTIONS, debug_mode=Fa
                         # --- Ensure element is visible before getting final bbox --- 
                         print(f"Debug: Attempting to scroll element '{element_text_desc}' into view...")
                         try:
-                            target_element.scroll_into_view_if_needed(timeout=INTERACTION_TIMEOUT_MS // 4) # Shorter timeout for scroll
+                            target_element = scroll_candidate_into_view(page, target_element)
                             print("Debug: Element scrolled into view (if needed). Re-checking visibility...")
-                            if not target_element.is_visible(): # Double check visibility after scroll
+                            if not target_element or not target_element['visible']: # Double check visibility after scroll
                                 print(f"Warning: Element '{element_text_desc}' still not visible after attempting scroll. Skipping click/type.")
                                 continue # Skip to next interaction
                         except PlaywrightError as scroll_err:
@@ -1015,7 +1305,7 @@ def interact_with_website(page, num_interactions=NUM_INTERACTIONS, debug_mode=Fa
                             continue # Skip to next interaction
                         # --- End visibility check ---
                         
-                        bbox = target_element.bounding_box()
+                        bbox = target_element['bbox']
                         if bbox:
                             # Element is in view and bbox obtained, proceed with click/type
                             # Playwright provides logical coordinates (CSS pixels)
@@ -1023,32 +1313,14 @@ def interact_with_website(page, num_interactions=NUM_INTERACTIONS, debug_mode=Fa
                             logical_center_x = logical_x + logical_w / 2
                             logical_center_y = logical_y + logical_h / 2
 
-                            # --- Check if Element is Occluded --- 
-                            is_occluded = True # Assume occluded initially
-                            try:
-                                topmost_element_handle = page.evaluate_handle(f'document.elementFromPoint({logical_center_x}, {logical_center_y})')
-                                
-                                # Check if the target element is the same as or contains the topmost element at its center
-                                is_same_or_contains = page.evaluate(
-                                    '([target, topmost]) => { return target === topmost || target.contains(topmost) || topmost.contains(target); }', 
-                                    [target_element, topmost_element_handle]
-                                )
-                                
-                                if is_same_or_contains:
-                                    is_occluded = False
-                                    print(f"Debug: Element '{element_text_desc}' center point is not occluded.")
-                                else:
-                                    # Try to get tag name of obscuring element for debugging
-                                    try:
-                                        obscuring_tag = topmost_element_handle.evaluate('el => el.tagName.toLowerCase()')
-                                        print(f"Warning: Element '{element_text_desc}' center point is likely occluded by element: <{obscuring_tag}>")
-                                    except:
-                                        print(f"Warning: Element '{element_text_desc}' center point is likely occluded by an unknown element.")
-                                        
-                            except Exception as occlude_check_err:
-                                print(f"Warning: Could not perform occlusion check for '{element_text_desc}': {occlude_check_err}")
-                                # If check fails, maybe proceed cautiously or skip? Let's skip for now.
-                                is_occluded = True 
+                            # --- Check if Element is Occluded (computed in-page with its bbox) --- 
+                            is_occluded = target_element['occluded'] is not False
+                            if not is_occluded:
+                                print(f"Debug: Element '{element_text_desc}' center point is not occluded.")
+                            elif target_element['occluded_by']:
+                                print(f"Warning: Element '{element_text_desc}' center point is likely occluded by element: <{target_element['occluded_by']}>")
+                            else:
+                                print(f"Warning: Element '{element_text_desc}' center point is likely occluded by an unknown element.")
 
                             if is_occluded:
                                 print(f"Skipping click on potentially occluded element: '{element_text_desc}'")
@@ -1096,13 +1368,13 @@ def interact_with_website(page, num_interactions=NUM_INTERACTIONS, debug_mode=Fa
                             pyautogui.moveTo(screen_x, screen_y, duration=half_duration)
                             
                             # Pause briefly before clicking
-                            time.sleep(CLICK_PAUSE_BEFORE)
+                            readiness.human_pause(CLICK_PAUSE_BEFORE)
                             
                             # Click more naturally
                             pyautogui.click()
                             
-                            # Pause after clicking
-                            time.sleep(CLICK_PAUSE_AFTER)
+                            # Wait for the page to react (or navigate) after clicking
+                            readiness.dom_quiet(page, replaces=CLICK_PAUSE_AFTER)
                             
                             # --- Record Interaction and URL Change ---
                             print(f"Recording interaction for element: {element_text_desc}")
@@ -1152,15 +1424,15 @@ def interact_with_website(page, num_interactions=NUM_INTERACTIONS, debug_mode=Fa
 
                 if visible_typing:
                     target_element = random.choice(visible_typing)
-                    element_text_desc = (target_element.get_attribute('placeholder') or target_element.get_attribute('aria-label') or target_element.get_attribute('name') or "[Typing Field]")[:60].strip()
+                    element_text_desc = (target_element['placeholder'] or target_element['aria_label'] or target_element['name'] or "[Typing Field]")[:60].strip()
 
                     try:
                          # --- Ensure element is visible before getting final bbox --- 
                         print(f"Debug: Attempting to scroll element '{element_text_desc}' into view...")
                         try:
-                            target_element.scroll_into_view_if_needed(timeout=INTERACTION_TIMEOUT_MS // 4) # Shorter timeout for scroll
+                            target_element = scroll_candidate_into_view(page, target_element)
                             print("Debug: Element scrolled into view (if needed). Re-checking visibility...")
-                            if not target_element.is_visible(): # Double check visibility after scroll
+                            if not target_element or not target_element['visible']: # Double check visibility after scroll
                                 print(f"Warning: Element '{element_text_desc}' still not visible after attempting scroll. Skipping type.")
                                 continue # Skip to next interaction
                         except PlaywrightError as scroll_err:
@@ -1168,7 +1440,7 @@ def interact_with_website(page, num_interactions=NUM_INTERACTIONS, debug_mode=Fa
                             continue # Skip to next interaction
                         # --- End visibility check ---
 
-                        bbox = target_element.bounding_box()
+                        bbox = target_element['bbox']
                         if bbox:
                             logical_x, logical_y, logical_w, logical_h = bbox['x'], bbox['y'], bbox['width'], bbox['height']
                             logical_center_x = logical_x + logical_w / 2
@@ -1203,13 +1475,13 @@ def interact_with_website(page, num_interactions=NUM_INTERACTIONS, debug_mode=Fa
                             pyautogui.moveTo(screen_x, screen_y, duration=half_duration)
                             
                             # Pause briefly before clicking
-                            time.sleep(CLICK_PAUSE_BEFORE)
+                            readiness.human_pause(CLICK_PAUSE_BEFORE)
                             
                             # Click to focus
                             pyautogui.click()
                             
-                            # Longer wait for focus
-                            time.sleep(random.uniform(0.3, 0.6))  # Reduced from 0.5-0.8 -> Increased range
+                            # Wait for the field to take focus
+                            readiness.focus(page)
                             
                             # --- ADDED TEXT GENERATION FOR TYPE ACTION ---
                             # Generate text suitable for the platform
@@ -1361,10 +1633,9 @@ def interact_with_website(page, num_interactions=NUM_INTERACTIONS, debug_mode=Fa
                     # if i < len(points) - 1:
                     #     time.sleep(random.uniform(0.05, 0.1))
 
-            # Increased delay between interactions - Handled by constants INTERACTION_DELAY_MIN/MAX
-            next_delay = random.uniform(INTERACTION_DELAY_MIN, INTERACTION_DELAY_MAX)
-            print(f"Waiting {next_delay:.2f} seconds before next interaction...")
-            time.sleep(next_delay)
+            # Wait for the page to settle, then pause like a person would
+            readiness.dom_quiet(page, replaces=INTERACTION_DELAY_SECONDS)
+            readiness.human_pause(HUMAN_PAUSE_MIN, HUMAN_PAUSE_MAX)
 
         except Exception as interact_err:
             print(f"Error during interaction {i+1}: {interact_err}")
@@ -1378,6 +1649,13 @@ def interact_with_website(page, num_interactions=NUM_INTERACTIONS, debug_mode=Fa
             # Add a small pause after an error before the next attempt
             time.sleep(random.uniform(1.0, 2.0))
 
+    elapsed = time.perf_counter() - interactions_started
+    if interactions_attempted:
+        print(f"Interaction rate: {interactions_attempted} interactions in {elapsed:.1f}s "
+              f"({interactions_attempted / max(elapsed / 60, 1e-6):.1f}/min), "
+              f"candidate discovery {discovery_seconds / interactions_attempted * 1000:.0f} ms/interaction, "
+              f"{window_cache.summary()}")
+
 def save_debug_screenshot(page, action_type, data, dpr=1, screen_size=None, visible_interactive_elements=None, visible_typing_elements=None):
     """Saves a screenshot with visual indicators for debugging purposes."""
     try:
@@ -1393,7 +1671,7 @@ def save_debug_screenshot(page, action_type, data, dpr=1, screen_size=None, visi
             print(f"Debug: Drawing {len(visible_interactive_elements)} interactive element boxes (DPR={dpr})...")
             for el in visible_interactive_elements:
                 try:
-                    el_bbox = el.bounding_box()
+                    el_bbox = el['bbox']
                     if el_bbox:
                         draw_x = el_bbox['x'] * dpr
                         draw_y = el_bbox['y'] * dpr
@@ -1408,7 +1686,7 @@ def save_debug_screenshot(page, action_type, data, dpr=1, screen_size=None, visi
             print(f"Debug: Drawing {len(visible_typing_elements)} typing element boxes (DPR={dpr})...")
             for el in visible_typing_elements:
                 try:
-                    el_bbox = el.bounding_box()
+                    el_bbox = el['bbox']
                     if el_bbox:
                         draw_x = el_bbox['x'] * dpr
                         draw_y = el_bbox['y'] * dpr
@@ -1428,7 +1706,7 @@ def save_debug_screenshot(page, action_type, data, dpr=1, screen_size=None, visi
             # Draw thicker red box for the chosen target element
             if target_element:
                 try:
-                    el_bbox = target_element.bounding_box()
+                    el_bbox = target_element['bbox']
                     if el_bbox:
                          draw_x = el_bbox['x'] * dpr
                          draw_y = el_bbox['y'] * dpr
@@ -1459,7 +1737,7 @@ def save_debug_screenshot(page, action_type, data, dpr=1, screen_size=None, visi
             if target_element:
                 # Highlight the element scrolled into view
                 try:
-                    el_bbox = target_element.bounding_box()
+                    el_bbox = target_element['bbox']
                     if el_bbox:
                         draw_x = el_bbox['x'] * dpr
                         draw_y = el_bbox['y'] * dpr
@@ -1539,7 +1817,7 @@ def save_debug_screenshot(page, action_type, data, dpr=1, screen_size=None, visi
             # Draw green box around the target typing element
             if target_element:
                 try:
-                    el_bbox = target_element.bounding_box()
+                    el_bbox = target_element['bbox']
                     if el_bbox:
                          draw_x = el_bbox['x'] * dpr
                          draw_y = el_bbox['y'] * dpr
@@ -1561,12 +1839,183 @@ def save_debug_screenshot(page, action_type, data, dpr=1, screen_size=None, visi
     except Exception as debug_e:
         print(f"Debug: General error saving screenshot for '{action_type}': {debug_e}")
 
+def set_window_state(page, state):
+    """Sets the state ('normal', 'minimized', ...) of the page's browser window. Chromium only."""
+    try:
+        cdp = page.context.new_cdp_session(page)
+        window_id = cdp.send('Browser.getWindowForTarget')['windowId']
+        cdp.send('Browser.setWindowBounds', {'windowId': window_id, 'bounds': {'windowState': state}})
+        cdp.detach()
+        return True
+    except PlaywrightError as e:
+        print(f"Warning: Could not set browser window state to '{state}': {e}")
+        return False
+
+def start_preload(browser, url):
+    """
+    Opens `url` in a new context whose window is minimized straight away, so it can load while
+    another session is being recorded. Returns the preload, or None if the window can't be hidden.
+    """
+    context = browser.new_context(no_viewport=True)
+    try:
+        page = context.new_page()
+        if not set_window_state(page, 'minimized'):
+            context.close()
+            return None
+        started = time.perf_counter()
+        # Only wait for the response; the browser keeps loading the page in the background
+        page.goto(url, timeout=INTERACTION_TIMEOUT_MS * 2, wait_until='commit')
+        print(f"Preloading next URL in the background: {url}")
+        return {'url': url, 'context': context, 'page': page, 'started': started}
+    except Exception as e:
+        print(f"Warning: Could not preload {url}: {e}")
+        try:
+            context.close()
+        except Exception:
+            pass
+        return None
+
+def finish_preload(preload):
+    """
+    Waits for a preloaded page to finish loading, brings it to the front and returns the
+    seconds saved compared to navigating to it now.
+    """
+    page = preload['page']
+    blocked_start = time.perf_counter()
+    page.wait_for_load_state('load', timeout=INTERACTION_TIMEOUT_MS * 2)
+    load_sec = page.evaluate("() => { const nav = performance.getEntriesByType('navigation')[0]; "
+                             "return nav ? nav.loadEventEnd / 1000 : 0; }")
+    set_window_state(page, 'normal')
+    page.bring_to_front()
+    blocked = time.perf_counter() - blocked_start
+    return max(load_sec - blocked, 0.0)
+
+def run_persistent_sessions(urls, debug_mode=False, restart_every=BROWSER_RESTART_EVERY, preload_next=False):
+    """
+    Runs recording sessions in one long-lived browser instead of launching one per URL.
+
+    Every session gets a fresh context and page, so no cookies or storage leak between sites,
+    and recording only starts once the new window is fullscreen. The browser is relaunched
+    every `restart_every` sessions to bound its memory growth, and whenever it has crashed.
+
+    With `preload_next`, the next session's URL is opened in a minimized context before the
+    current session starts recording, so it loads while the current one is being recorded.
+    """
+    with sync_playwright() as p:
+        browser = None
+        preload = None
+        sessions_in_browser = 0
+        sessions_done = 0
+        sessions_skipped = 0
+        launches = 0
+        total_saved = 0.0
+        started = time.perf_counter()
+        while True:
+            if browser is not None and not browser.is_connected():
+                print("Browser disconnected (crashed?), relaunching...")
+                browser = None
+                preload = None
+            elif browser is not None and sessions_in_browser >= restart_every:
+                print(f"Restarting browser after {sessions_in_browser} sessions...")
+                try:
+                    browser.close()
+                except Exception as close_err:
+                    print(f"Warning: Error closing browser for restart: {close_err}")
+                browser = None
+                preload = None
+            if browser is None:
+                print(f"Launching {BROWSER_TYPE} browser instance (reused for up to {restart_every} sessions)...")
+                try:
+                    browser = getattr(p, BROWSER_TYPE).launch(headless=False)
+                except Exception as launch_err:
+                    print(f"Failed to launch browser: {launch_err}. Retrying in {MAX_WAIT_SECONDS}s...")
+                    time.sleep(MAX_WAIT_SECONDS)
+                    continue
+                sessions_in_browser = 0
+                launches += 1
+
+            current, preload = preload, None
+            selected_url = current['url'] if current else random.choice(urls)
+            print("-" * 50)
+            print(f"Selected URL for this run: {selected_url}")
+
+            context = None
+            recording = False
+            sessions_in_browser += 1
+            readiness.reset()
+            try:
+                if current:
+                    context, page = current['context'], current['page']
+                    saved = finish_preload(current)
+                    total_saved += saved
+                    print(f"Switched to preloaded page, saved {saved:.1f}s.")
+                else:
+                    context = browser.new_context(no_viewport=True) # Use no_viewport
+                    page = context.new_page()
+                    print(f"Navigating page to: {selected_url}")
+                    page.goto(selected_url, timeout=INTERACTION_TIMEOUT_MS * 2, wait_until='load')
+                readiness.page_ready(page)  # Ensure page is fully loaded and stable
+
+                # Open the next page now; a new window appearing mid-recording would end up in the video
+                if preload_next and BROWSER_TYPE == 'chromium' and sessions_in_browser < restart_every:
+                    preload = start_preload(browser, random.choice(urls))
+                    page.bring_to_front()
+
+                # Every context opens a new window, which must be fullscreen before recording starts
+                if not enter_fullscreen(page):
+                    # Not recorded, but still counted and followed by the usual wait below
+                    print(f"Warning: Window did not become fullscreen, skipping {selected_url}.")
+                    sessions_skipped += 1
+                else:
+                    print("Starting recording...")
+                    # The acknowledgement also replaces the fixed pause that used to follow the hotkey
+                    used_control = control_recording('start', replaces=2 * HOTKEY_PAUSE_SECONDS)
+                    recording = True
+                    if not used_control:
+                        reactivate_browser_after_hotkey()
+
+                    interact_with_website(page, debug_mode=debug_mode, toggle_fullscreen=False)
+            except PlaywrightError as pe:
+                print(f"Playwright error during navigation/interaction for {selected_url}: {pe}")
+            except Exception as e:
+                print(f"An unexpected error occurred during interaction for {selected_url}: {e}")
+                traceback.print_exc()
+            finally:
+                # --- Close the session's window BEFORE stopping recording ---
+                if context is not None:
+                    try:
+                        context.close()
+                        time.sleep(0.5)
+                    except Exception as close_err:
+                        print(f"Warning: Error closing browser context: {close_err}")
+                if recording:
+                    print("Stopping recording...")
+                    try:
+                        control_recording('stop')
+                    except Exception as stop_err:
+                        print(f"Error stopping recording: {stop_err}")
+                print(readiness.summary())
+
+            sessions_done += 1
+            hours = (time.perf_counter() - started) / 3600
+            print(f"Session {sessions_done} finished ({sessions_skipped} skipped, {launches} browser launches, "
+                  f"{sessions_done / hours:.1f} sessions/hour, {total_saved:.1f}s saved by preloading).")
+
+            wait_time = random.uniform(MIN_WAIT_SECONDS, MAX_WAIT_SECONDS)
+            print(f"Waiting {wait_time:.2f} seconds before the next URL...")
+            time.sleep(wait_time)
+
 def main():
     """Main loop for the automation process."""
     parser = argparse.ArgumentParser(description="Automate website interaction and recording.")
     parser.add_argument('--debug', action='store_true', help='Enable debug mode to save screenshots of click targets.')
+    parser.add_argument('--human-pause-scale', type=float, default=1.0, help='Scale of the random human-like pauses (0 disables them).')
+    parser.add_argument('--reuse-browser', action='store_true', help='Keep one browser running across URLs, with a fresh context per session.')
+    parser.add_argument('--preload', action='store_true', help='Load the next URL in a minimized window during the current session (implies --reuse-browser).')
+    parser.add_argument('--restart-every', type=int, default=BROWSER_RESTART_EVERY, help='With --reuse-browser, relaunch the browser after this many sessions.')
     args = parser.parse_args()
     debug_mode = args.debug
+    readiness.human_pause_scale = args.human_pause_scale
 
     if debug_mode:
         print("!!! DEBUG MODE ENABLED: Click target screenshots will be saved. !!!")
@@ -1579,10 +2028,15 @@ def main():
 
     pyautogui.FAILSAFE = True
     print("PyAutoGUI Fail-Safe enabled: Move mouse to top-left corner to stop script.")
-    print("Ensure DuckTrack is running and ready to record (uses internal hotkeys).")
+    print("Ensure DuckTrack is running and ready to record (uses its control server, or hotkeys as a fallback).")
     time.sleep(3)
 
     try: # Outer loop for KeyboardInterrupt
+        if args.reuse_browser or args.preload:
+            run_persistent_sessions(urls, debug_mode=debug_mode, restart_every=args.restart_every,
+                                    preload_next=args.preload)
+            return
+
         while True:
             selected_url = random.choice(urls)
             print("-" * 50)
@@ -1605,32 +2059,17 @@ def main():
                         # Use wait_until='domcontentloaded' or 'load'? 'load' is generally safer for full interaction.
                         page.goto(selected_url, timeout=INTERACTION_TIMEOUT_MS * 2, wait_until='load')
                         
-                        # --- Pause before starting recording ---
-                        time.sleep(2.0)  # Ensure page is fully loaded and stable
+                        # --- Wait before starting recording ---
+                        readiness.reset()
+                        readiness.page_ready(page)  # Ensure page is fully loaded and stable
                         
                         # --- Trigger Start Recording (AFTER navigation) --- 
                         print("Starting recording...")
-                        trigger_hotkey(RECORD_HOTKEY)
-                        time.sleep(1.5)  # Increased recording start wait
+                        used_control = control_recording('start', replaces=2 * HOTKEY_PAUSE_SECONDS)
                         
-                        # --- Check if browser is still the active window ---
-                        if sys.platform == 'darwin':  # macOS
-                            # Try to reactivate the browser window through AppleScript
-                            browser_activate_script = f'''
-                                tell application "System Events"
-                                    tell application process "Chromium"
-                                        set frontmost to true
-                                    end tell
-                                end tell
-                                return "Browser reactivated"
-                            '''
-                            try:
-                                subprocess.run(['osascript', '-e', browser_activate_script], 
-                                              capture_output=True, text=True, check=False)
-                                print("Reactivated browser window after starting recording")
-                                time.sleep(0.5) # Reduced from 1.0
-                            except Exception as e:
-                                print(f"Error reactivating browser: {e}")
+                        # --- Check if browser is still the active window (only the hotkey moves focus) ---
+                        if not used_control:
+                            reactivate_browser_after_hotkey()
                         
                         # --- Now perform interactions ---
                         interact_with_website(page, debug_mode=debug_mode)
@@ -1647,8 +2086,7 @@ def main():
                         
                         # --- Trigger Stop Recording --- 
                         print("Stopping recording...")
-                        trigger_hotkey(STOP_HOTKEY)
-                        time.sleep(1.0)  # Increased stop recording wait
+                        control_recording('stop', replaces=HOTKEY_PAUSE_SECONDS + 1.0)
 
                     except PlaywrightError as pe:
                         print(f"Playwright error during navigation/interaction for {selected_url}: {pe}")
@@ -1663,7 +2101,7 @@ def main():
                             except Exception as close_err:
                                 print(f"Warning: Error closing browser before stopping recording (after error): {close_err}")
                         try:
-                            trigger_hotkey(STOP_HOTKEY)
+                            control_recording('stop')
                         except Exception as stop_err:
                             print(f"Error stopping recording after error: {stop_err}")
                     except Exception as e:
@@ -1680,10 +2118,11 @@ def main():
                             except Exception as close_err:
                                 print(f"Warning: Error closing browser before stopping recording (after error): {close_err}")
                         try:
-                            trigger_hotkey(STOP_HOTKEY)
+                            control_recording('stop')
                         except Exception as stop_err:
                             print(f"Error stopping recording after error: {stop_err}")
                     finally:
+                        print(readiness.summary())
                         print("Interaction cycle finished for this URL.")
             
             except Exception as browser_launch_err:
@@ -1691,7 +2130,7 @@ def main():
                  traceback.print_exc()
                  # Stop recording in case it's still running
                  try:
-                     trigger_hotkey(STOP_HOTKEY)
+                     control_recording('stop')
                  except Exception as stop_err:
                      print(f"Error stopping recording after browser launch error: {stop_err}")
             finally:
@@ -1713,7 +2152,7 @@ def main():
         print("Script interrupted by user. Exiting cleanly.")
         # Stop recording if interrupted
         try:
-            trigger_hotkey(STOP_HOTKEY)
+            control_recording('stop')
         except Exception as stop_err:
             print(f"Error stopping recording after user interruption: {stop_err}")
     except Exception as e:
@@ -1721,7 +2160,7 @@ def main():
         traceback.print_exc()
         # Stop recording if error
         try:
-            trigger_hotkey(STOP_HOTKEY)
+            control_recording('stop')
         except Exception as stop_err:
             print(f"Error stopping recording after critical error: {stop_err}")
     finally:
@@ -1 +1,6 @@
-from .app import MainInterface
+def __getattr__(name):
+    # Imported on first use: the GUI needs a display, the headless tools in this package don't
+    if name == "MainInterface":
+        from .app import MainInterface
+        return MainInterface
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
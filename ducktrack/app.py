@@ -17,6 +17,7 @@ from PyQt6.QtWidgets import (QApplication, QCheckBox, QDialog, QFileDialog,
                              QMessageBox, QPushButton, QSystemTrayIcon,
                              QTextEdit, QVBoxLayout, QWidget)
 
+from .control import ControlServer
 from .obs_client import close_obs, is_obs_running, open_obs
 from .playback import Player, get_latest_recording
 from .recorder import Recorder
@@ -145,6 +146,7 @@ class MainInterface(QWidget):
         self.init_tray()
         self.init_window()
         self.init_hotkeys()
+        self.init_control_server()
         
         if not is_obs_running():
             self.obs_process = open_obs()
@@ -251,6 +253,60 @@ class MainInterface(QWidget):
             print(f"Failed to initialize hotkey listener: {e}")
             self.hotkey_listener = None # Ensure attribute exists
 
+    def init_control_server(self):
+        """Starts the local control server that automation scripts use instead of hotkeys."""
+        self.control_server = ControlServer()
+        # Commands arrive on the server thread; the signal runs them on the GUI thread
+        self.control_server.command_received.connect(self.handle_control_command)
+        self.control_server.start()
+
+    @pyqtSlot(object)
+    def handle_control_command(self, pending):
+        recording = hasattr(self, "recorder_thread") and self.recorder_thread.isRunning()
+        paused = recording and self.recorder_thread._is_paused
+        error = None
+        try:
+            if pending.command == "start":
+                if recording:
+                    error = "Already recording"
+                else:
+                    self.toggle_record()
+            elif pending.command == "stop":
+                if not recording:
+                    error = "Not recording"
+                else:
+                    self.toggle_record()
+            elif pending.command == "pause":
+                if not recording or paused:
+                    error = "Already paused" if paused else "Not recording"
+                else:
+                    self.toggle_pause()
+            elif pending.command == "resume":
+                if not paused:
+                    error = "Not paused"
+                else:
+                    self.toggle_pause()
+        except Exception as e:
+            error = str(e)
+
+        response = {"ok": error is None, **self.control_status()}
+        if error:
+            response["error"] = error
+        pending.reply(response)
+
+    def control_status(self) -> dict:
+        """The recording state reported to control clients."""
+        if hasattr(self, "recorder_thread") and self.recorder_thread.isRunning():
+            recorder, recording = self.recorder_thread, True
+        else:
+            recorder, recording = getattr(self, "last_recorder", None), False
+        return {
+            "recording": recording,
+            "paused": recording and recorder._is_paused,
+            "recording_path": recorder.recording_path if recorder else None,
+            "obs_state": recorder.obs_client.output_state if recorder else None,
+        }
+
     @pyqtSlot()
     def replay_recording(self):
         player = Player()
@@ -287,6 +343,9 @@ class MainInterface(QWidget):
             self.hotkey_listener.join(timeout=0.5) # Wait briefly for thread to stop
             print("Hotkey listener should be stopped.")
 
+        if hasattr(self, "control_server"):
+            self.control_server.stop()
+
         if hasattr(self, "recorder_thread") and self.recorder_thread.isRunning():
             print("Stopping recorder thread...")
             # Ensure recording is stopped cleanly before quitting
@@ -361,7 +420,8 @@ class MainInterface(QWidget):
             recording_dir = self.recorder_thread.recording_path
             print(f"Recording saved to: {recording_dir}")
             
-            # Clean up the thread object
+            # Clean up the thread object, keeping it around for control status queries
+            self.last_recorder = self.recorder_thread
             del self.recorder_thread
             # Update UI state (needs to be called after thread cleanup)
             self.on_recording_stopped() 
@@ -0,0 +1,162 @@
+import argparse
+import contextlib
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from . import extract_frames, visualize_recording
+from .util import get_recordings_dir
+
+# --- Configuration ---
+# Each task: the function run on a recording directory and the output that marks it as done
+TASKS = {
+    "visualize": (visualize_recording.main, visualize_recording.OUTPUT_FILENAME),
+    "extract": (extract_frames.main, os.path.join(extract_frames.OUTPUT_DIRNAME, extract_frames.INDEX_FILENAME)),
+}
+INPUT_FILENAMES = (visualize_recording.EVENTS_FILENAME, visualize_recording.VIDEO_FILENAME, "metadata.json")
+MANIFEST_FILENAME = ".batch_{task}_manifest.jsonl"
+LOG_FILENAME = "{task}.log"
+
+
+def find_recordings(recordings_dir, required_files=INPUT_FILENAMES[:2]):
+    """Returns every recording directory containing `required_files` (events.jsonl and recording.mp4 by default), sorted by name."""
+    recordings = []
+    with os.scandir(recordings_dir) as entries:
+        for entry in entries:
+            if entry.is_dir() and all(os.path.isfile(os.path.join(entry.path, name)) for name in required_files):
+                recordings.append(entry.path)
+    return sorted(recordings)
+
+def is_up_to_date(recording_dir, task):
+    """Whether the task's output exists and is newer than all of the recording's inputs."""
+    try:
+        output_mtime = os.path.getmtime(os.path.join(recording_dir, TASKS[task][1]))
+    except OSError:
+        return False
+
+    for name in INPUT_FILENAMES:
+        try:
+            if os.path.getmtime(os.path.join(recording_dir, name)) > output_mtime:
+                return False
+        except OSError:
+            continue
+    return True
+
+def load_manifest(manifest_path):
+    """Returns the last recorded status for each recording in the manifest."""
+    statuses = {}
+    if not os.path.isfile(manifest_path):
+        return statuses
+
+    with open(manifest_path, 'r') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # A line cut short by a crash
+                continue
+            statuses[entry["recording"]] = entry["status"]
+    return statuses
+
+def _init_worker():
+    # Each process handles one recording; stop OpenCV from spawning a thread per core in each of them
+    import cv2
+    cv2.setNumThreads(1)
+
+def _process_recording(task, recording_dir, task_kwargs):
+    """Runs one task on one recording, logging its output next to the recording."""
+    start = time.perf_counter()
+    func = TASKS[task][0]
+    log_path = os.path.join(recording_dir, LOG_FILENAME.format(task=task))
+    error = None
+    try:
+        with open(log_path, 'w') as log, contextlib.redirect_stdout(log):
+            func(recording_dir, **task_kwargs)
+    except Exception:
+        error = traceback.format_exc()
+
+    if error is None and not is_up_to_date(recording_dir, task):
+        error = f"No up-to-date output produced, see {log_path}"
+    return recording_dir, error, time.perf_counter() - start
+
+def main(recordings_dir, task="visualize", num_workers=None, force=False, retry_failed=False, task_kwargs=None):
+    task_kwargs = task_kwargs or {}
+    num_workers = num_workers or os.cpu_count() or 1
+    manifest_path = os.path.join(recordings_dir, MANIFEST_FILENAME.format(task=task))
+
+    recordings = find_recordings(recordings_dir)
+    statuses = load_manifest(manifest_path)
+
+    pending = []
+    skipped_fresh = skipped_failed = 0
+    for recording_dir in recordings:
+        name = os.path.basename(recording_dir)
+        # An output is only trusted once the manifest says it was finished: a run killed
+        # mid-render leaves a partial output that is newer than its inputs
+        if not force and statuses.get(name) == "done" and is_up_to_date(recording_dir, task):
+            skipped_fresh += 1
+        elif not force and not retry_failed and statuses.get(name) == "failed":
+            skipped_failed += 1
+        else:
+            pending.append(recording_dir)
+
+    print(f"Found {len(recordings)} recordings: {len(pending)} to process, {skipped_fresh} up to date, "
+          f"{skipped_failed} previously failed (use --retry-failed to rerun).")
+    if not pending:
+        return
+
+    done = failed = 0
+    start = time.perf_counter()
+    with open(manifest_path, 'a') as manifest:
+        # Marks every pending recording as not done until its result comes in
+        for recording_dir in pending:
+            manifest.write(json.dumps({"recording": os.path.basename(recording_dir), "status": "started",
+                                       "started_at": time.time()}) + "\n")
+        manifest.flush()
+        executor = ProcessPoolExecutor(max_workers=min(num_workers, len(pending)), initializer=_init_worker)
+        try:
+            futures = [executor.submit(_process_recording, task, recording_dir, task_kwargs) for recording_dir in pending]
+            for future in as_completed(futures):
+                recording_dir, error, elapsed = future.result()
+                name = os.path.basename(recording_dir)
+                if error is None:
+                    done += 1
+                    status = "done"
+                else:
+                    failed += 1
+                    status = "failed"
+                    print(f"Failed: {name}\n{error}")
+
+                # Written as each recording finishes so an interrupted run resumes where it left off
+                manifest.write(json.dumps({"recording": name, "status": status, "seconds": round(elapsed, 3),
+                                           "finished_at": time.time()}) + "\n")
+                manifest.flush()
+
+                minutes = max(time.perf_counter() - start, 1e-6) / 60
+                print(f"[{done + failed}/{len(pending)}] {status}: {name} ({elapsed:.1f}s) - "
+                      f"{(done + failed) / minutes:.1f} recordings/min")
+        except KeyboardInterrupt:
+            print("Interrupted, rerun the same command to resume.")
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        executor.shutdown()
+
+    minutes = max(time.perf_counter() - start, 1e-6) / 60
+    print(f"Processed {done + failed} recordings ({done} done, {failed} failed) in {minutes:.1f} min "
+          f"using {min(num_workers, len(pending))} workers: {(done + failed) / minutes:.1f} recordings/min.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the visualizer or frame extractor over every recording in a directory.")
+    parser.add_argument("recordings_dir", nargs="?", default=get_recordings_dir(), help="Directory containing recording folders")
+    parser.add_argument("--task", choices=TASKS.keys(), default="visualize", help="What to run on each recording")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: all cores)")
+    parser.add_argument("--force", action="store_true", help="Reprocess recordings even if their outputs are up to date")
+    parser.add_argument("--retry-failed", action="store_true", help="Retry recordings that failed in a previous run")
+    parser.add_argument("--scale", type=float, default=None, help="Downscale factor passed to the task")
+    args = parser.parse_args()
+
+    task_kwargs = {"scale": args.scale} if args.scale is not None else {}
+    main(args.recordings_dir, task=args.task, num_workers=args.workers, force=args.force,
+         retry_failed=args.retry_failed, task_kwargs=task_kwargs)
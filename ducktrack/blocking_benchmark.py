@@ -0,0 +1,164 @@
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from .resource_blocker import DEFAULT_BLOCKED_DOMAINS, DEFAULT_BLOCKED_TYPES, ResourceBlocker
+from .session_engine import SessionEngine, async_playwright
+
+# --- Configuration ---
+NUM_FIXTURE_PAGES = 5
+SESSIONS_PER_RUN = 20
+IMAGES_PER_PAGE = 12
+IMAGE_BYTES = 150_000
+FONTS_PER_PAGE = 4
+FONT_BYTES = 120_000
+VIDEO_BYTES = 4_000_000
+AD_SCRIPT_BYTES = 40_000
+FIRST_PARTY_LATENCY_SEC = 0.02   # Added before every response from the fixture site itself
+THIRD_PARTY_LATENCY_SEC = 0.25   # Added before every response from the ad/tracker hosts
+BANDWIDTH_BYTES_PER_SEC = 8e6    # Per connection
+CHUNK_BYTES = 16_384
+# Ad/tracker hosts the fixture pages load from; the browser resolves them to the local server
+AD_HOSTS = ("securepubads.g.doubleclick.net", "pagead2.googlesyndication.com",
+            "www.googletagmanager.com", "static.criteo.net")
+CONTENT_TYPES = {"image": "image/jpeg", "font": "font/woff2", "media": "video/mp4", "script": "text/javascript"}
+
+
+def fixture_page(index, port):
+    """HTML of a heavy fixture page: images, web fonts, an autoplay video and ad/tracker scripts."""
+    fonts = "".join(f"@font-face {{ font-family: F{i}; src: url(/asset/font/p{index}f{i}.woff2?bytes={FONT_BYTES}); }}\n"
+                    f".f{i} {{ font-family: F{i}, sans-serif; }}\n" for i in range(FONTS_PER_PAGE))
+    ads = "".join(f'<script src="http://{host}:{port}/asset/script/p{index}ad{i}.js?bytes={AD_SCRIPT_BYTES}"></script>\n'
+                  for i, host in enumerate(AD_HOSTS))
+    text = "".join(f'<p class="f{i}">Paragraph in web font {i}. <a href="/page/{(index + i + 1) % NUM_FIXTURE_PAGES}">Next page</a></p>\n'
+                   for i in range(FONTS_PER_PAGE))
+    images = "".join(f'<img src="/asset/image/p{index}i{i}.jpg?bytes={IMAGE_BYTES}" width="200" height="150">\n'
+                     for i in range(IMAGES_PER_PAGE))
+    return (f"<!DOCTYPE html>\n<html><head><title>Fixture page {index}</title>\n<style>\n{fonts}</style>\n{ads}</head>\n"
+            f"<body>\n<h1>Fixture page {index}</h1>\n<input type=\"search\" placeholder=\"Search\">\n{text}"
+            f'<video autoplay muted loop preload="auto" src="/asset/media/p{index}.mp4?bytes={VIDEO_BYTES}"></video>\n'
+            f"{images}</body></html>\n")
+
+def ad_script(name, size, port):
+    """An ad script that also loads a tracking pixel from another ad host, padded to `size` bytes."""
+    pixel = f"new Image().src = 'http://{AD_HOSTS[len(name) % len(AD_HOSTS)]}:{port}/asset/image/{name}.gif?bytes=43';\n"
+    return (pixel + "/*" + "x" * max(0, size - len(pixel) - 4) + "*/").encode()
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        host = (self.headers.get("Host") or "").split(":")[0]
+        time.sleep(FIRST_PARTY_LATENCY_SEC if host in ("127.0.0.1", "localhost") else THIRD_PARTY_LATENCY_SEC)
+
+        port = self.server.server_address[1]
+        segments = parts.path.strip("/").split("/")
+        if segments[0] == "page" and len(segments) == 2 and segments[1].isdigit():
+            body, content_type = fixture_page(int(segments[1]), port).encode(), "text/html; charset=utf-8"
+        elif segments[0] == "asset" and len(segments) == 3 and segments[1] in CONTENT_TYPES:
+            size = int(parse_qs(parts.query).get("bytes", ["0"])[0])
+            kind, name = segments[1], segments[2].rsplit(".", 1)[0]
+            body = ad_script(name, size, port) if kind == "script" else bytes(size)
+            content_type = CONTENT_TYPES[kind]
+        else:
+            self.send_error(404)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        try:
+            for start in range(0, len(body), CHUNK_BYTES):
+                self.wfile.write(body[start:start + CHUNK_BYTES])
+                time.sleep(CHUNK_BYTES / BANDWIDTH_BYTES_PER_SEC)
+        except (BrokenPipeError, ConnectionResetError):
+            # Aborted by the browser, e.g. a video it stopped buffering
+            pass
+
+class FixtureServer:
+    """
+    Serves heavy fixture pages on localhost with added latency and limited bandwidth. Pages are
+    /page/<n>; their ad/tracker scripts come from real ad hostnames, so launch the browser with
+    `launch_args()` to resolve those to this server.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.server = ThreadingHTTPServer((host, port), _FixtureHandler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def urls(self, num_pages=NUM_FIXTURE_PAGES):
+        return [f"http://127.0.0.1:{self.port}/page/{i}" for i in range(num_pages)]
+
+    def launch_args(self):
+        return ["--host-resolver-rules=" + ", ".join(f"MAP {host} 127.0.0.1" for host in AD_HOSTS)]
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+def run_pages(server, blocker, num_sessions, max_concurrency, headless):
+    """Loads the fixture pages `num_sessions` times through the blocker and returns the session results."""
+    urls = server.urls()
+    engine = SessionEngine(max_concurrency=max_concurrency, num_interactions=0, headless=headless,
+                           context_hooks=[blocker.install], launch_args=server.launch_args())
+    return asyncio.run(engine.run([urls[i % len(urls)] for i in range(num_sessions)]))
+
+def describe(label, results):
+    loads = [r["load_sec"] for r in results if r["load_sec"] is not None]
+    if not loads:
+        return f"{label}: no page loaded"
+    blocked = [r["blocked"] for r in results]
+    return (f"{label}: page ready in {statistics.mean(loads):.2f}s mean, {statistics.median(loads):.2f}s median, "
+            f"{max(loads):.2f}s max over {len(loads)} loads; per session {statistics.mean(b['allowed_bytes'] for b in blocked) / 1e6:.2f} MB "
+            f"downloaded, {statistics.mean(b['blocked_requests'] for b in blocked):.1f} requests / "
+            f"{statistics.mean(b['blocked_bytes'] for b in blocked) / 1e6:.2f} MB blocked")
+
+def main(num_sessions=SESSIONS_PER_RUN, max_concurrency=1, blocked_types=DEFAULT_BLOCKED_TYPES,
+         blocked_domains=DEFAULT_BLOCKED_DOMAINS, headless=True):
+    if async_playwright is None:
+        print("Error: playwright is required for the benchmark (pip install playwright && playwright install chromium).")
+        return
+    with FixtureServer() as server:
+        print(f"Serving {NUM_FIXTURE_PAGES} fixture pages on port {server.port}.")
+        # The unblocked run learns every URL's size, so the blocked run can count the bytes it saves
+        baseline = ResourceBlocker((), ())
+        baseline_results = run_pages(server, baseline, num_sessions, max_concurrency, headless)
+        blocker = ResourceBlocker(blocked_types, blocked_domains, size_hints=baseline.size_hints)
+        blocked_results = run_pages(server, blocker, num_sessions, max_concurrency, headless)
+
+    print(describe("Without blocking", baseline_results))
+    print(describe(f"Blocking {', '.join(sorted(blocked_types)) or 'no types'} + {len(blocked_domains)} domains", blocked_results))
+    print(blocker.summary())
+    before = [r["load_sec"] for r in baseline_results if r["load_sec"] is not None]
+    after = [r["load_sec"] for r in blocked_results if r["load_sec"] is not None]
+    if before and after:
+        print(f"Median page-ready time {statistics.median(before) / statistics.median(after):.2f}x faster with blocking.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure page-ready time on local heavy fixture pages with and without resource blocking.")
+    parser.add_argument("--sessions", type=int, default=SESSIONS_PER_RUN, help="Page loads per run")
+    parser.add_argument("--concurrency", type=int, default=1, help="Sessions running at once")
+    parser.add_argument("--block-types", nargs="*", default=list(DEFAULT_BLOCKED_TYPES), help="Resource types to block")
+    parser.add_argument("--no-domains", action="store_true", help="Don't block the ad/tracker domain list")
+    parser.add_argument("--headed", action="store_true", help="Show the browser windows")
+    args = parser.parse_args()
+
+    main(num_sessions=args.sessions, max_concurrency=args.concurrency, blocked_types=args.block_types,
+         blocked_domains=() if args.no_domains else DEFAULT_BLOCKED_DOMAINS, headless=not args.headed)
@@ -0,0 +1,240 @@
+import argparse
+import json
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime
+
+from .util import get_recordings_dir
+
+CATALOG_FILENAME = "catalog.sqlite3"
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"  # Matches MetadataManager._get_time_stamp
+
+ACTION_PATTERN = re.compile(r'"action":\s*"(\w+)"')
+VIDEO_EXTENSIONS = (".mp4", ".mkv", ".mov")
+GENERATED_VIDEOS = ("visualization.mp4",)  # Videos written by our own tools, not OBS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recordings (
+    path TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    dir_mtime REAL NOT NULL,
+    start_time TEXT,
+    stop_time TEXT,
+    duration_sec REAL,
+    event_count INTEGER NOT NULL,
+    move_count INTEGER NOT NULL,
+    click_count INTEGER NOT NULL,
+    scroll_count INTEGER NOT NULL,
+    key_count INTEGER NOT NULL,
+    screen_width INTEGER,
+    screen_height INTEGER,
+    system TEXT,
+    has_video INTEGER NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS recordings_created_at ON recordings (created_at);
+CREATE INDEX IF NOT EXISTS recordings_start_time ON recordings (start_time);
+CREATE INDEX IF NOT EXISTS recordings_system ON recordings (system);
+CREATE TABLE IF NOT EXISTS scans (
+    root TEXT PRIMARY KEY,
+    root_mtime REAL NOT NULL
+);
+"""
+
+
+class RecordingCatalog:
+    """
+    SQLite catalog with one row per recording, so finding and filtering recordings
+    doesn't need a directory scan.
+    """
+
+    def __init__(self, recordings_dir: str = None, db_path: str = None):
+        self.recordings_dir = recordings_dir or get_recordings_dir()
+        self.db_path = db_path or os.path.join(self.recordings_dir, CATALOG_FILENAME)
+        self.connection = sqlite3.connect(self.db_path)
+        self.connection.row_factory = sqlite3.Row
+        # Keep the journal file around between transactions; creating and deleting it would
+        # bump the recordings directory's mtime and defeat the rescan shortcut
+        self.connection.execute("PRAGMA journal_mode=PERSIST")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add_recording(self, recording_path: str, commit: bool = True):
+        """Indexes (or re-indexes) a single recording directory."""
+        self.connection.execute(
+            "INSERT OR REPLACE INTO recordings VALUES (:path, :name, :created_at, :dir_mtime, :start_time, "
+            ":stop_time, :duration_sec, :event_count, :move_count, :click_count, :scroll_count, :key_count, "
+            ":screen_width, :screen_height, :system, :has_video, :indexed_at)",
+            _describe_recording(recording_path))
+        if commit:
+            self.connection.commit()
+
+    def rescan(self, force: bool = False) -> int:
+        """
+        Brings the catalog in line with the recordings directory and returns how many
+        recordings were (re-)indexed.
+
+        Nothing is listed if the directory's mtime is unchanged since the last scan (adding or
+        removing a recording changes it), and only recordings whose own mtime changed are re-read.
+        """
+        root = os.path.abspath(self.recordings_dir)
+        root_mtime = os.stat(root).st_mtime
+        row = self.connection.execute("SELECT root_mtime FROM scans WHERE root = ?", (root,)).fetchone()
+        if not force and row is not None and row["root_mtime"] == root_mtime:
+            return 0
+
+        known = {r["path"]: r["dir_mtime"] for r in self.connection.execute("SELECT path, dir_mtime FROM recordings")}
+        seen = set()
+        indexed = 0
+        with os.scandir(root) as entries:
+            for entry in entries:
+                if not entry.is_dir():
+                    continue
+                seen.add(entry.path)
+                if force or known.get(entry.path) != entry.stat().st_mtime:
+                    self.add_recording(entry.path, commit=False)
+                    indexed += 1
+
+        removed = [(path,) for path in known if path not in seen and os.path.dirname(path) == root]
+        self.connection.executemany("DELETE FROM recordings WHERE path = ?", removed)
+        self.connection.commit()
+
+        # Read the mtime after committing, in case the catalog file itself was just created
+        self.connection.execute("INSERT OR REPLACE INTO scans VALUES (?, ?)", (root, os.stat(root).st_mtime))
+        self.connection.commit()
+        return indexed
+
+    def latest(self) -> dict | None:
+        """The most recently created recording."""
+        row = self.connection.execute("SELECT * FROM recordings ORDER BY created_at DESC LIMIT 1").fetchone()
+        return dict(row) if row else None
+
+    def between(self, start: str, end: str) -> list[dict]:
+        """Recordings started within [start, end], given as 'YYYY-MM-DD[ HH:MM:SS]'."""
+        return self.query(start=start, end=end)
+
+    def query(self, start: str = None, end: str = None, system: str = None, has_video: bool = None,
+              min_duration: float = None, max_duration: float = None, min_events: int = None,
+              screen_width: int = None, screen_height: int = None, limit: int = None) -> list[dict]:
+        """Recordings matching all of the given attributes, newest first."""
+        clauses, params = [], []
+
+        def where(clause, value):
+            clauses.append(clause)
+            params.append(value)
+
+        if start is not None:
+            where("start_time >= ?", start)
+        if end is not None:
+            # A bare date includes the whole day
+            where("start_time <= ?", end if len(end) > 10 else end + " 23:59:59")
+        if system is not None:
+            where("system = ?", system)
+        if has_video is not None:
+            where("has_video = ?", int(has_video))
+        if min_duration is not None:
+            where("duration_sec >= ?", min_duration)
+        if max_duration is not None:
+            where("duration_sec <= ?", max_duration)
+        if min_events is not None:
+            where("event_count >= ?", min_events)
+        if screen_width is not None:
+            where("screen_width = ?", screen_width)
+        if screen_height is not None:
+            where("screen_height = ?", screen_height)
+
+        sql = "SELECT * FROM recordings"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY created_at DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [dict(row) for row in self.connection.execute(sql, params)]
+
+def _describe_recording(recording_path: str) -> dict:
+    """Collects the catalog row for a recording from its metadata and events."""
+    try:
+        with open(os.path.join(recording_path, "metadata.json"), "r") as f:
+            metadata = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        # Recordings that were interrupted before stopping have no metadata
+        metadata = {}
+
+    counts = {}
+    event_count = 0
+    try:
+        with open(os.path.join(recording_path, "events.jsonl"), "r") as f:
+            for line in f:
+                match = ACTION_PATTERN.search(line)
+                if match:
+                    counts[match.group(1)] = counts.get(match.group(1), 0) + 1
+                    event_count += 1
+    except OSError:
+        pass
+
+    start_time, stop_time = metadata.get("start_time"), metadata.get("stop_time")
+    duration_sec = None
+    if start_time and stop_time:
+        duration_sec = (datetime.strptime(stop_time, TIME_FORMAT) - datetime.strptime(start_time, TIME_FORMAT)).total_seconds()
+
+    return {
+        "path": recording_path,
+        "name": os.path.basename(recording_path),
+        "created_at": os.path.getctime(recording_path),
+        "dir_mtime": os.stat(recording_path).st_mtime,
+        "start_time": start_time,
+        "stop_time": stop_time,
+        "duration_sec": duration_sec,
+        "event_count": event_count,
+        "move_count": counts.get("move", 0),
+        "click_count": counts.get("click", 0),
+        "scroll_count": counts.get("scroll", 0),
+        "key_count": counts.get("press", 0),
+        "screen_width": metadata.get("screen_width"),
+        "screen_height": metadata.get("screen_height"),
+        "system": metadata.get("system"),
+        "has_video": int(any(name.endswith(VIDEO_EXTENSIONS) and name not in GENERATED_VIDEOS
+                             for name in os.listdir(recording_path))),
+        "indexed_at": time.time(),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the DuckTrack recording catalog.")
+    parser.add_argument("--recordings-dir", default=get_recordings_dir(), help="Directory containing recording folders")
+    parser.add_argument("--force-rescan", action="store_true", help="Re-index every recording")
+    parser.add_argument("--latest", action="store_true", help="Only show the latest recording")
+    parser.add_argument("--since", help="Started on or after this date/time (YYYY-MM-DD[ HH:MM:SS])")
+    parser.add_argument("--until", help="Started on or before this date/time (YYYY-MM-DD[ HH:MM:SS])")
+    parser.add_argument("--system", help="Recorded on this OS (e.g. Darwin, Windows, Linux)")
+    parser.add_argument("--with-video", action="store_true", help="Only recordings with a video file")
+    parser.add_argument("--min-duration", type=float, help="Minimum duration in seconds")
+    parser.add_argument("--limit", type=int, help="Maximum number of recordings to list")
+    args = parser.parse_args()
+
+    with RecordingCatalog(args.recordings_dir) as catalog:
+        start = time.perf_counter()
+        indexed = catalog.rescan(force=args.force_rescan)
+        print(f"Indexed {indexed} recordings in {time.perf_counter() - start:.2f}s.")
+
+        if args.latest:
+            rows = [catalog.latest()] if catalog.latest() else []
+        else:
+            rows = catalog.query(start=args.since, end=args.until, system=args.system,
+                                 has_video=True if args.with_video else None,
+                                 min_duration=args.min_duration, limit=args.limit)
+        for row in rows:
+            print(f"{row['name']}  start={row['start_time']}  duration={row['duration_sec']}s  "
+                  f"events={row['event_count']}  screen={row['screen_width']}x{row['screen_height']}  "
+                  f"system={row['system']}  video={'yes' if row['has_video'] else 'no'}")
@@ -0,0 +1,118 @@
+import json
+import socket
+import socketserver
+import threading
+import time
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+# Local control API: one JSON object per line in each direction, on localhost only
+CONTROL_HOST = "127.0.0.1"
+CONTROL_PORT = 47283
+COMMANDS = ("start", "stop", "pause", "resume", "status")
+
+REPLY_TIMEOUT_SEC = 15.0   # Stopping waits for the recorder thread to finish writing its files
+OBS_ACK_TIMEOUT_SEC = 5.0  # How long a command waits for OBS to report the matching output state
+
+# OBS output state each command waits for before it is acknowledged
+EXPECTED_OBS_STATES = {
+    "start": "OBS_WEBSOCKET_OUTPUT_STARTED",
+    "stop": "OBS_WEBSOCKET_OUTPUT_STOPPED",
+    "pause": "OBS_WEBSOCKET_OUTPUT_PAUSED",
+    "resume": "OBS_WEBSOCKET_OUTPUT_RESUMED",
+}
+
+
+class PendingReply:
+    """A command handed to the GUI thread, and the reply it fills in."""
+
+    def __init__(self, command: str):
+        self.command = command
+        self.response = None
+        self.done = threading.Event()
+
+    def reply(self, response: dict):
+        self.response = response
+        self.done.set()
+
+class _ControlTCPServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+class _ControlHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                command = json.loads(line).get("command")
+            except (json.JSONDecodeError, AttributeError):
+                command = None
+            response = self.server.control.execute(command)
+            self.wfile.write((json.dumps(response) + "\n").encode())
+
+class ControlServer(threading.Thread, QObject):
+    """
+    Serves start/stop/pause/resume/status commands on a localhost socket, so scripts can drive
+    recordings without sending hotkeys (which would also end up in events.jsonl).
+
+    Commands are run on the GUI thread through `command_received`; the connected slot must
+    call `PendingReply.reply` with a dict containing at least "ok", "recording_path" and
+    "obs_state". Commands that change the recording state are only acknowledged once OBS
+    reports the matching output state, or after OBS_ACK_TIMEOUT_SEC.
+    """
+
+    command_received = pyqtSignal(object)
+
+    def __init__(self, host: str = CONTROL_HOST, port: int = CONTROL_PORT):
+        threading.Thread.__init__(self, daemon=True)
+        QObject.__init__(self)
+        self.host = host
+        self.port = port
+        self.server = None
+
+    def run(self):
+        try:
+            with _ControlTCPServer((self.host, self.port), _ControlHandler) as self.server:
+                self.server.control = self
+                print(f"ControlServer: Listening on {self.host}:{self.port}")
+                self.server.serve_forever()
+        except OSError as e:
+            print(f"ControlServer: Could not listen on {self.host}:{self.port}: {e}")
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+
+    def execute(self, command) -> dict:
+        """Runs a command on the GUI thread and waits for OBS to confirm it."""
+        if command not in COMMANDS:
+            return {"ok": False, "command": command, "error": f"Unknown command, expected one of {COMMANDS}"}
+
+        response = self._dispatch(command)
+        expected = EXPECTED_OBS_STATES.get(command)
+        if response.get("ok") and expected:
+            deadline = time.perf_counter() + OBS_ACK_TIMEOUT_SEC
+            while response.get("obs_state") != expected and time.perf_counter() < deadline:
+                time.sleep(0.05)
+                response = {**self._dispatch("status"), "command": command}
+            response["obs_acknowledged"] = response.get("obs_state") == expected
+        return response
+
+    def _dispatch(self, command: str) -> dict:
+        pending = PendingReply(command)
+        self.command_received.emit(pending)
+        if not pending.done.wait(REPLY_TIMEOUT_SEC):
+            return {"ok": False, "command": command, "error": "Timed out waiting for DuckTrack"}
+        return {**pending.response, "command": command}
+
+def send_command(command: str, host: str = CONTROL_HOST, port: int = CONTROL_PORT,
+                 timeout: float = REPLY_TIMEOUT_SEC + OBS_ACK_TIMEOUT_SEC) -> dict:
+    """
+    Sends a command to a running DuckTrack and returns its acknowledgement. Raises OSError
+    if DuckTrack isn't listening.
+    """
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        sock.sendall((json.dumps({"command": command}) + "\n").encode())
+        line = sock.makefile("rb").readline()
+    if not line:
+        raise ConnectionError("DuckTrack closed the control connection without replying")
+    return json.loads(line)
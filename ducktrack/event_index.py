@@ -0,0 +1,175 @@
+import argparse
+import json
+import os
+import struct
+
+import numpy as np
+
+# --- Configuration ---
+EVENTS_FILENAME = "events.jsonl"
+INDEX_FILENAME = "events.idx"
+INDEX_STRIDE = 256  # Events between index entries
+INDEX_MAGIC = b"DTEVIDX1"
+INDEX_HEADER = struct.Struct('<8sq')  # magic, stride
+INDEX_ENTRY = struct.Struct('<dq')    # max time_stamp before the entry, byte offset
+INDEX_DTYPE = np.dtype([('time', '<f8'), ('offset', '<i8')])
+
+
+class EventIndexWriter:
+    """
+    Writes the sidecar index of an events.jsonl file while it is being written.
+
+    Every `stride` events one entry is stored: the byte offset of that event's line and the
+    largest time_stamp of all events before it. Events are written in arrival order, which can
+    be very slightly out of time order across listener threads; using the running maximum
+    means every event before an entry is guaranteed to be earlier than the entry's time.
+    """
+
+    def __init__(self, recording_dir, stride=INDEX_STRIDE):
+        self.stride = stride
+        self.events_written = 0
+        self._max_time = float('-inf')
+        self._file = open(os.path.join(recording_dir, INDEX_FILENAME), 'wb')
+        self._file.write(INDEX_HEADER.pack(INDEX_MAGIC, stride))
+
+    def add(self, time_stamp, offset):
+        """
+        Records an event about to be written at `offset`. `offset` may be a callable
+        (e.g. the events file's `tell`), so it is only evaluated for indexed events.
+        """
+        if self.events_written % self.stride == 0:
+            self._file.write(INDEX_ENTRY.pack(self._max_time, offset() if callable(offset) else offset))
+        self._max_time = max(self._max_time, time_stamp)
+        self.events_written += 1
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+class EventIndex:
+    """Seeks within an events.jsonl file using its sidecar index."""
+
+    def __init__(self, recording_dir):
+        index_path = os.path.join(recording_dir, INDEX_FILENAME)
+        with open(index_path, 'rb') as f:
+            magic, self.stride = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+            if magic != INDEX_MAGIC:
+                raise ValueError(f"Not an events index: {index_path}")
+            data = f.read()
+        # Drop a trailing entry cut short by a crash
+        entries = np.frombuffer(data[:len(data) - len(data) % INDEX_DTYPE.itemsize], dtype=INDEX_DTYPE)
+        self.times = entries['time']
+        self.offsets = entries['offset']
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def seek(self, time_stamp):
+        """
+        Returns (byte offset, event index) of the latest indexed event that no event at or
+        after `time_stamp` precedes, in O(log n).
+        """
+        pos = int(np.searchsorted(self.times, time_stamp, side='left')) - 1
+        if pos < 0:
+            return 0, 0
+        return int(self.offsets[pos]), pos * self.stride
+
+def open_index(recording_dir):
+    """Returns the recording's EventIndex, or None if it has no usable index."""
+    try:
+        index = EventIndex(recording_dir)
+    except (OSError, ValueError, struct.error):
+        return None
+    events_size = os.path.getsize(os.path.join(recording_dir, EVENTS_FILENAME))
+    if len(index) == 0 or index.offsets[-1] > events_size:
+        # Written for a different (rewritten) events file
+        return None
+    return index
+
+def read_first_event(recording_dir):
+    """Returns the first valid event of the recording without reading the rest of the file."""
+    with open(os.path.join(recording_dir, EVENTS_FILENAME), 'rb') as f:
+        for line in f:
+            try:
+                return json.loads(line)
+            except json.JSONDecodeError:
+                continue
+    return None
+
+def read_events(recording_dir, start_time=None, end_time=None):
+    """
+    Parses the events with `start_time <= time_stamp <= end_time` (raw time stamps, either
+    bound optional) and returns them with the index of the first one in the full file.
+
+    With an index only the lines from the nearest entry before `start_time` are read, and
+    reading stops at the first event after `end_time`. The events returned are a contiguous
+    run of the file, so event `i` of the result is event `first_index + i` of the recording.
+    """
+    offset, event_idx = 0, 0
+    if start_time is not None:
+        index = open_index(recording_dir)
+        if index is not None:
+            offset, event_idx = index.seek(start_time)
+
+    events = []
+    first_index = None
+    with open(os.path.join(recording_dir, EVENTS_FILENAME), 'rb') as f:
+        f.seek(offset)
+        for line in f:
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                print(f"Warning: Skipping invalid JSON line: {line.decode(errors='replace').strip()}")
+                continue
+            t = event['time_stamp']
+            if end_time is not None and t > end_time:
+                break
+            if first_index is None:
+                if start_time is not None and t < start_time:
+                    event_idx += 1
+                    continue
+                first_index = event_idx
+            events.append(event)
+    return events, first_index if first_index is not None else event_idx
+
+def build_index(recording_dir, stride=INDEX_STRIDE):
+    """Builds the index for an existing recording and returns the number of events indexed."""
+    writer = EventIndexWriter(recording_dir, stride)
+    try:
+        with open(os.path.join(recording_dir, EVENTS_FILENAME), 'rb') as f:
+            offset = 0
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    offset += len(line)
+                    continue
+                writer.add(event['time_stamp'], offset)
+                offset += len(line)
+    finally:
+        writer.close()
+    return writer.events_written
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the time-range index of events.jsonl for recordings made before it existed.")
+    parser.add_argument("path", help="A recording directory, or a directory of recordings")
+    parser.add_argument("--stride", type=int, default=INDEX_STRIDE, help="Events between index entries")
+    parser.add_argument("--force", action="store_true", help="Rebuild indexes that already exist")
+    args = parser.parse_args()
+
+    if os.path.isfile(os.path.join(args.path, EVENTS_FILENAME)):
+        recordings = [args.path]
+    else:
+        recordings = sorted(entry.path for entry in os.scandir(args.path)
+                            if entry.is_dir() and os.path.isfile(os.path.join(entry.path, EVENTS_FILENAME)))
+
+    built = 0
+    for recording_dir in recordings:
+        if not args.force and open_index(recording_dir) is not None:
+            continue
+        count = build_index(recording_dir, args.stride)
+        built += 1
+        print(f"Indexed {count} events in {recording_dir}")
+    print(f"Built {built} indexes ({len(recordings) - built} already indexed).")
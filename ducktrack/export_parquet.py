@@ -0,0 +1,255 @@
+import argparse
+import json
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+from .batch_process import find_recordings
+from .util import get_recordings_dir
+
+# --- Configuration ---
+EVENTS_FILENAME = "events.jsonl"
+METADATA_FILENAME = "metadata.json"  # Written when a recording stops, so it marks a finished recording
+MANIFEST_FILENAME = "_manifest.jsonl"
+MAX_ROWS_PER_SHARD = 5_000_000   # Events per Parquet shard before rolling over to a new one
+BATCH_TARGET_BYTES = 256 << 20   # events.jsonl bytes handed to one worker task
+ROW_GROUP_ROWS = 250_000         # Events buffered before a row group is written
+
+# Flattened event columns; every action fills the subset of fields it records
+EVENT_FIELDS = {
+    "time_stamp": "float64",
+    "action": "string",
+    "x": "float64",
+    "y": "float64",
+    "dx": "int32",
+    "dy": "int32",
+    "button": "string",
+    "pressed": "bool",
+    "name": "string",
+}
+METADATA_FIELDS = {
+    "system": "string",
+    "release": "string",
+    "machine": "string",
+    "model": "string",
+    "screen_width": "int32",
+    "screen_height": "int32",
+    "scroll_direction": "int8",
+    "start_time": "string",
+    "stop_time": "string",
+    "obs_output_started": "float64",
+    "event_count": "int64",
+}
+
+
+def _schema(fields):
+    columns = [pa.field("recording_id", pa.string())]
+    for name, type_name in fields.items():
+        columns.append(pa.field(name, pa.dictionary(pa.int32(), pa.string()) if name == "action" else pa.type_for_alias(type_name)))
+    return pa.schema(columns)
+
+class ShardWriter:
+    """Writes event rows to Parquet shards, starting a new shard every `max_rows` rows."""
+
+    def __init__(self, output_dir, prefix, max_rows=MAX_ROWS_PER_SHARD):
+        self.output_dir = output_dir
+        self.prefix = prefix
+        self.max_rows = max_rows
+        self.schema = _schema(EVENT_FIELDS)
+        self.shards = []  # (filename, rows)
+        self._writer = None
+        self._rows_in_shard = 0
+        self._columns = {name: [] for name in self.schema.names}
+
+    def add(self, recording_id, event):
+        columns = self._columns
+        columns["recording_id"].append(recording_id)
+        for name in EVENT_FIELDS:
+            columns[name].append(event.get(name))
+        if len(columns["recording_id"]) >= ROW_GROUP_ROWS or \
+                self._rows_in_shard + len(columns["recording_id"]) >= self.max_rows:
+            self._write_row_group()
+
+    def close(self):
+        """Finishes the last shard and gives every shard its final name."""
+        self._write_row_group()
+        self._close_shard()
+        # Shards are only renamed once the whole batch is written, so a crash mid-batch leaves
+        # nothing but .tmp files behind and the batch is redone on the next run
+        for filename, _ in self.shards:
+            os.replace(os.path.join(self.output_dir, filename + ".tmp"), os.path.join(self.output_dir, filename))
+        return self.shards
+
+    def _write_row_group(self):
+        n = len(self._columns["recording_id"])
+        if n == 0:
+            return
+        if self._writer is None:
+            filename = f"{self.prefix}-{len(self.shards):03d}.parquet"
+            self._writer = pq.ParquetWriter(os.path.join(self.output_dir, filename + ".tmp"), self.schema,
+                                            compression="zstd")
+            self.shards.append([filename, 0])
+        self._writer.write_table(pa.table(self._columns, schema=self.schema))
+        self._rows_in_shard += n
+        self.shards[-1][1] = self._rows_in_shard
+        self._columns = {name: [] for name in self.schema.names}
+        if self._rows_in_shard >= self.max_rows:
+            self._close_shard()
+
+    def _close_shard(self):
+        if self._writer is None:
+            return
+        self._writer.close()
+        self._writer = None
+        self._rows_in_shard = 0
+
+def _read_metadata_row(recording_dir, event_count):
+    try:
+        with open(os.path.join(recording_dir, METADATA_FILENAME), "r") as f:
+            metadata = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        metadata = {}
+    row = {name: metadata.get(name) for name in METADATA_FIELDS}
+    row["obs_output_started"] = (metadata.get("obs_record_state_timings") or {}).get("OBS_WEBSOCKET_OUTPUT_STARTED", [None])[0]
+    row["event_count"] = event_count
+    row["recording_id"] = os.path.basename(recording_dir)
+    return row
+
+def export_batch(recording_dirs, output_dir, prefix, max_rows_per_shard=MAX_ROWS_PER_SHARD):
+    """Converts a batch of recordings into event shards. Runs in a worker process."""
+    writer = ShardWriter(output_dir, prefix, max_rows_per_shard)
+    metadata_rows = []
+    for recording_dir in recording_dirs:
+        recording_id = os.path.basename(recording_dir)
+        event_count = 0
+        with open(os.path.join(recording_dir, EVENTS_FILENAME), "r") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                writer.add(recording_id, event)
+                event_count += 1
+        metadata_rows.append(_read_metadata_row(recording_dir, event_count))
+    return writer.close(), metadata_rows
+
+def load_manifest(output_dir):
+    """Returns the ids of recordings that have already been exported."""
+    exported = set()
+    manifest_path = os.path.join(output_dir, MANIFEST_FILENAME)
+    if os.path.isfile(manifest_path):
+        with open(manifest_path, "r") as f:
+            for line in f:
+                try:
+                    exported.update(json.loads(line)["recordings"])
+                except (json.JSONDecodeError, KeyError):
+                    continue
+    return exported
+
+def open_export(output_dir):
+    """
+    Opens an export as (events dataset, recordings table), limited to shards in the manifest.
+
+    For example, the events of one week::
+
+        import pyarrow.compute as pc
+
+        events, recordings = open_export("parquet_export")
+        week = recordings.filter((pc.field("start_time") >= "2024-05-06") & (pc.field("start_time") < "2024-05-13"))
+        table = events.to_table(filter=pc.field("recording_id").isin(week["recording_id"]))
+    """
+    import pyarrow.dataset as ds
+
+    event_shards, metadata_shards = [], []
+    with open(os.path.join(output_dir, MANIFEST_FILENAME), "r") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            event_shards.extend(os.path.join(output_dir, name) for name in entry["event_shards"])
+            metadata_shards.append(os.path.join(output_dir, entry["metadata_shard"]))
+
+    events = ds.dataset(event_shards, schema=_schema(EVENT_FIELDS), format="parquet")
+    recordings = ds.dataset(metadata_shards, schema=_schema(METADATA_FIELDS), format="parquet")
+    return events, recordings.to_table()
+
+def make_batches(recording_dirs, target_bytes=BATCH_TARGET_BYTES):
+    """Groups recordings into batches of roughly `target_bytes` of events.jsonl each."""
+    batches, batch, batch_bytes = [], [], 0
+    for recording_dir in recording_dirs:
+        batch.append(recording_dir)
+        batch_bytes += os.path.getsize(os.path.join(recording_dir, EVENTS_FILENAME))
+        if batch_bytes >= target_bytes:
+            batches.append(batch)
+            batch, batch_bytes = [], 0
+    if batch:
+        batches.append(batch)
+    return batches
+
+def main(recordings_dir, output_dir, num_workers=None, max_rows_per_shard=MAX_ROWS_PER_SHARD):
+    if pa is None:
+        print("Error: pyarrow is required for Parquet export (pip install pyarrow).")
+        return
+
+    os.makedirs(output_dir, exist_ok=True)
+    num_workers = num_workers or os.cpu_count() or 1
+    exported = load_manifest(output_dir)
+    # Recordings still in progress have no metadata yet; exporting them now would export them
+    # half-written and then skip them forever as already exported
+    recordings = [r for r in find_recordings(recordings_dir, required_files=(EVENTS_FILENAME,))
+                  if os.path.basename(r) not in exported]
+    in_progress = [r for r in recordings if not os.path.isfile(os.path.join(r, METADATA_FILENAME))]
+    recordings = [r for r in recordings if r not in in_progress]
+    print(f"{len(recordings)} new recordings to export ({len(exported)} already exported, "
+          f"{len(in_progress)} without {METADATA_FILENAME} skipped as still recording).")
+    if not recordings:
+        return
+
+    run_id = time.strftime("%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:6]
+    batches = make_batches(recordings)
+    start = time.perf_counter()
+    total_rows = 0
+    with ProcessPoolExecutor(max_workers=min(num_workers, len(batches))) as executor, \
+            open(os.path.join(output_dir, MANIFEST_FILENAME), "a") as manifest:
+        futures = {executor.submit(export_batch, batch, output_dir, f"events-{run_id}-{i:05d}", max_rows_per_shard): i
+                   for i, batch in enumerate(batches)}
+        for future in as_completed(futures):
+            i = futures[future]
+            shards, metadata_rows = future.result()
+
+            # One metadata side table per batch, next to its event shards
+            metadata_file = f"recordings-{run_id}-{i:05d}.parquet"
+            pq.write_table(pa.Table.from_pylist(metadata_rows, schema=_schema(METADATA_FIELDS)),
+                           os.path.join(output_dir, metadata_file))
+
+            # Recordings only count as exported once all of their files are in place
+            manifest.write(json.dumps({"recordings": [row["recording_id"] for row in metadata_rows],
+                                       "event_shards": [name for name, _ in shards],
+                                       "metadata_shard": metadata_file}) + "\n")
+            manifest.flush()
+
+            rows = sum(rows for _, rows in shards)
+            total_rows += rows
+            print(f"Exported batch {i} ({len(metadata_rows)} recordings, {rows} events, {len(shards)} shards).")
+
+    elapsed = time.perf_counter() - start
+    print(f"Exported {len(recordings)} recordings ({total_rows} events) in {elapsed:.1f}s "
+          f"({total_rows / max(elapsed, 1e-6):,.0f} events/s) to {output_dir}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export recordings to columnar Parquet shards (events plus a recordings side table).")
+    parser.add_argument("recordings_dir", nargs="?", default=get_recordings_dir(), help="Directory containing recording folders")
+    parser.add_argument("--output-dir", default="parquet_export", help="Directory for the shards and the export manifest")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: all cores)")
+    parser.add_argument("--max-rows-per-shard", type=int, default=MAX_ROWS_PER_SHARD, help="Maximum events per Parquet shard")
+    args = parser.parse_args()
+
+    main(args.recordings_dir, args.output_dir, num_workers=args.workers, max_rows_per_shard=args.max_rows_per_shard)
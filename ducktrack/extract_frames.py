@@ -0,0 +1,145 @@
+import argparse
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+from .segmenter import segment_events
+from .visualize_recording import (EVENTS_FILENAME, SEEK_MIN_GAP_SEC,
+                                  VIDEO_FILENAME, FramePump,
+                                  build_frame_index, ensure_dir_exists,
+                                  load_events_window)
+
+# --- Configuration ---
+OUTPUT_DIRNAME = "action_frames"
+FRAMES_DIRNAME = "frames"
+INDEX_FILENAME = "index.jsonl"
+ARRAY_FILENAME = "frames.npy"
+OUTPUT_FORMATS = ("jpg", "png", "npy")
+BEFORE_OFFSET_SEC = 0.05  # How far before an action the "before" frame is taken
+AFTER_OFFSET_SEC = 0.5    # How far after an action the "after" frame is taken (lets the UI react)
+
+
+def main(recording_dir, output_format="jpg", quality=90, scale=1.0,
+         before_sec=BEFORE_OFFSET_SEC, after_sec=AFTER_OFFSET_SEC, start_sec=None, end_sec=None):
+    if output_format not in OUTPUT_FORMATS:
+        print(f"Error: Unsupported output format: {output_format}")
+        return
+
+    events_path = os.path.join(recording_dir, EVENTS_FILENAME)
+    video_path = os.path.join(recording_dir, VIDEO_FILENAME)
+    output_dir = os.path.join(recording_dir, OUTPUT_DIRNAME)
+
+    if not os.path.isfile(video_path):
+        print(f"Error: Video file not found: {video_path}")
+        return
+
+    # Only the events of the requested time window are parsed
+    events, _, first_event_index = load_events_window(events_path, start_sec, end_sec)
+    if not events:
+        return
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        print(f"Error: Could not open video file {video_path}")
+        return
+
+    start = time.perf_counter()
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    if fps <= 0:
+        print(f"Error: Invalid video FPS: {fps}")
+        cap.release()
+        return
+
+    frame_index = build_frame_index(events, fps, total_frames)
+    actions = list(segment_events(events, time_key='relative_time_sec'))
+    for action in actions:
+        action['event_range'] = [i + first_event_index for i in action['event_range']]
+    last_frame = total_frames - 1 if total_frames > 0 else frame_index.num_frames - 1
+
+    # Resolve the before/after frame of every action up front
+    starts = np.array([a['start_time'] for a in actions], dtype=np.float64)
+    ends = np.array([a['end_time'] for a in actions], dtype=np.float64)
+    before_frames = np.clip(frame_index.frame_for_time(starts - before_sec), 0, last_frame)
+    after_frames = np.clip(frame_index.frame_for_time(ends + after_sec), 0, last_frame)
+    for action, before, after in zip(actions, before_frames, after_frames):
+        action['before_frame'] = int(before)
+        action['after_frame'] = int(after)
+
+    needed_frames = sorted({a['before_frame'] for a in actions} | {a['after_frame'] for a in actions})
+    print(f"Found {len(actions)} actions needing {len(needed_frames)} of {total_frames} frames.")
+
+    if not ensure_dir_exists(output_dir):
+        cap.release()
+        return
+
+    pump = FramePump(cap, seek_threshold=int(SEEK_MIN_GAP_SEC * fps))
+
+    # Each distinct frame is decoded once, in increasing order so the pump only ever grabs
+    # or seeks forward, and stored as an image file or as a slot in one .npy array
+    frame_refs = {}
+    frames_array = None
+    if output_format == "npy":
+        slots = {frame_num: slot for slot, frame_num in enumerate(needed_frames)}
+    else:
+        frames_dir = os.path.join(output_dir, FRAMES_DIRNAME)
+        if not ensure_dir_exists(frames_dir):
+            cap.release()
+            return
+        if output_format == "jpg":
+            encode_params = [cv2.IMWRITE_JPEG_QUALITY, quality]
+        else:
+            encode_params = [cv2.IMWRITE_PNG_COMPRESSION, 3]
+
+    for frame_num in needed_frames:
+        frame = pump.read(frame_num)
+        if frame is None:
+            # The video ended early; later frames cannot be read either
+            break
+        if scale != 1.0:
+            frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+        if output_format == "npy":
+            if frames_array is None:
+                frames_array = np.lib.format.open_memmap(os.path.join(output_dir, ARRAY_FILENAME), mode='w+',
+                                                         dtype=np.uint8, shape=(len(needed_frames),) + frame.shape)
+            ref = slots[frame_num]
+            frames_array[ref] = frame
+        else:
+            ref = os.path.join(FRAMES_DIRNAME, f"frame_{frame_num:06d}.{output_format}")
+            cv2.imwrite(os.path.join(output_dir, ref), frame, encode_params)
+        frame_refs[frame_num] = ref
+
+    cap.release()
+    if frames_array is not None:
+        frames_array.flush()
+
+    index_path = os.path.join(output_dir, INDEX_FILENAME)
+    with open(index_path, 'w') as f:
+        for action in actions:
+            action['before'] = frame_refs.get(action['before_frame'])
+            action['after'] = frame_refs.get(action['after_frame'])
+            f.write(json.dumps(action) + "\n")
+
+    elapsed = time.perf_counter() - start
+    print(f"Extracted {len(frame_refs)} frames for {len(actions)} actions in {elapsed:.2f}s "
+          f"({pump.summary()}).")
+    print(f"Action index saved to: {index_path}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract the frames just before and after each action in a DuckTrack recording.")
+    parser.add_argument("recording_dir", help="Path to the recording directory containing events.jsonl and recording.mp4")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="jpg", help="Save frames as image files or as a single .npy array")
+    parser.add_argument("--quality", type=int, default=90, help="JPEG quality (0-100)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Downscale factor applied to extracted frames")
+    parser.add_argument("--before", type=float, default=BEFORE_OFFSET_SEC, help="Seconds before an action to take the 'before' frame")
+    parser.add_argument("--after", type=float, default=AFTER_OFFSET_SEC, help="Seconds after an action to take the 'after' frame")
+    parser.add_argument("--start", type=float, default=None, help="Only extract actions from this many seconds into the video")
+    parser.add_argument("--end", type=float, default=None, help="Only extract actions up to this many seconds into the video")
+    args = parser.parse_args()
+
+    main(args.recording_dir, output_format=args.format, quality=args.quality, scale=args.scale,
+         before_sec=args.before, after_sec=args.after, start_sec=args.start, end_sec=args.end)
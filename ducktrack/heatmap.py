@@ -0,0 +1,163 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import cv2
+import numpy as np
+
+from .batch_process import find_recordings
+from .util import get_recordings_dir
+from .visualize_recording import EVENTS_FILENAME
+
+# --- Configuration ---
+HEATMAP_ACTIONS = ("move", "click", "scroll")
+DEFAULT_BINS = (320, 200)  # Histogram bins along (x, y) of the normalized screen
+POINT_BUFFER_SIZE = 65536  # Points buffered per action before being folded into the histogram
+RECORDINGS_PER_TASK = 32   # Recordings handled by a worker before it hands back its histograms
+OUTPUT_WIDTH = 1280        # Width of the rendered heatmap images
+COUNTS_FILENAME = "heatmaps.npz"
+
+
+class HistogramAccumulator:
+    """
+    Accumulates normalized (x, y) points into one fixed-size 2D histogram per action.
+
+    Points are buffered in small fixed-size arrays and folded into the histograms whenever a
+    buffer fills, so memory stays bounded by the histogram and buffer sizes.
+    """
+
+    def __init__(self, bins=DEFAULT_BINS, actions=HEATMAP_ACTIONS):
+        self.bins = bins
+        self.histograms = {action: np.zeros((bins[1], bins[0]), dtype=np.int64) for action in actions}
+        self.out_of_bounds = {action: 0 for action in actions}
+        self._buffers = {action: np.empty((POINT_BUFFER_SIZE, 2), dtype=np.float64) for action in actions}
+        self._filled = {action: 0 for action in actions}
+
+    def add(self, action, x, y):
+        n = self._filled[action]
+        self._buffers[action][n] = (x, y)
+        self._filled[action] = n + 1
+        if n + 1 == POINT_BUFFER_SIZE:
+            self._fold(action)
+
+    def merge(self, histograms, out_of_bounds):
+        for action, histogram in histograms.items():
+            self.histograms[action] += histogram
+            self.out_of_bounds[action] += out_of_bounds[action]
+
+    def flush(self):
+        for action in self.histograms:
+            self._fold(action)
+
+    def _fold(self, action):
+        n = self._filled[action]
+        if n == 0:
+            return
+        points = self._buffers[action][:n]
+        histogram, _, _ = np.histogram2d(points[:, 1], points[:, 0], bins=(self.bins[1], self.bins[0]),
+                                         range=[[0, 1], [0, 1]])
+        self.histograms[action] += histogram.astype(np.int64)
+        self.out_of_bounds[action] += n - int(histogram.sum())
+        self._filled[action] = 0
+
+def read_screen_size(recording_dir):
+    with open(os.path.join(recording_dir, "metadata.json"), 'r') as f:
+        metadata = json.load(f)
+    width, height = metadata["screen_width"], metadata["screen_height"]
+    if not (width > 0 and height > 0):
+        raise ValueError(f"Invalid screen size {width}x{height}")
+    return width, height
+
+def accumulate_recordings(recording_dirs, bins=DEFAULT_BINS):
+    """
+    Streams the events of each recording into one set of histograms. Runs in a worker process.
+    Recordings without a usable screen size or events file are skipped and counted.
+    """
+    accumulator = HistogramAccumulator(bins)
+    skipped = 0
+    for recording_dir in recording_dirs:
+        try:
+            width, height = read_screen_size(recording_dir)
+            f = open(os.path.join(recording_dir, EVENTS_FILENAME), 'r')
+        except (OSError, KeyError, TypeError, ValueError):  # ValueError includes invalid JSON
+            skipped += 1
+            continue
+
+        with f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                action = event.get("action")
+                if action not in accumulator.histograms or "x" not in event:
+                    continue
+                if action == "click" and not event.get("pressed"):
+                    continue
+                accumulator.add(action, event["x"] / width, event["y"] / height)
+
+    accumulator.flush()
+    return accumulator.histograms, accumulator.out_of_bounds, skipped
+
+def render_heatmap(histogram, output_width=OUTPUT_WIDTH):
+    """Renders a count histogram as a log-scaled colour image."""
+    density = np.log1p(histogram.astype(np.float64))
+    if density.max() > 0:
+        density /= density.max()
+    image = cv2.applyColorMap((density * 255).astype(np.uint8), cv2.COLORMAP_INFERNO)
+    output_height = int(round(output_width * histogram.shape[0] / histogram.shape[1]))
+    return cv2.resize(image, (output_width, output_height), interpolation=cv2.INTER_LINEAR)
+
+def main(recordings_dir, output_dir, bins=DEFAULT_BINS, num_workers=None):
+    num_workers = num_workers or os.cpu_count() or 1
+    recordings = find_recordings(recordings_dir, required_files=(EVENTS_FILENAME, "metadata.json"))
+    if not recordings:
+        print(f"Error: No recordings found in {recordings_dir}")
+        return
+
+    start = time.perf_counter()
+    batches = [recordings[i:i + RECORDINGS_PER_TASK] for i in range(0, len(recordings), RECORDINGS_PER_TASK)]
+    total = HistogramAccumulator(bins)
+    skipped = 0
+    num_workers = min(num_workers, len(batches))
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        # Keep at most two batches per worker in flight, so memory is bounded by the number of
+        # histograms in flight rather than by the size of the corpus
+        pending_batches = iter(batches)
+        in_flight = set()
+        while True:
+            for batch in pending_batches:
+                in_flight.add(executor.submit(accumulate_recordings, batch, bins))
+                if len(in_flight) >= 2 * num_workers:
+                    break
+            if not in_flight:
+                break
+
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                histograms, out_of_bounds, batch_skipped = future.result()
+                total.merge(histograms, out_of_bounds)
+                skipped += batch_skipped
+
+    os.makedirs(output_dir, exist_ok=True)
+    np.savez_compressed(os.path.join(output_dir, COUNTS_FILENAME), **total.histograms)
+    for action, histogram in total.histograms.items():
+        image_path = os.path.join(output_dir, f"heatmap_{action}.png")
+        cv2.imwrite(image_path, render_heatmap(histogram))
+        print(f"{action}: {int(histogram.sum())} points ({total.out_of_bounds[action]} off-screen) -> {image_path}")
+
+    elapsed = time.perf_counter() - start
+    print(f"Aggregated {len(recordings) - skipped} recordings ({skipped} skipped without a screen size or events) "
+          f"in {elapsed:.1f}s using {num_workers} workers.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render cursor heatmaps per action type across many recordings.")
+    parser.add_argument("recordings_dir", nargs="?", default=get_recordings_dir(), help="Directory containing recording folders")
+    parser.add_argument("--output-dir", default="heatmaps", help="Where to write the heatmap images and raw counts")
+    parser.add_argument("--bins", type=int, nargs=2, default=DEFAULT_BINS, metavar=("X", "Y"), help="Histogram bins along x and y")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    main(args.recordings_dir, args.output_dir, bins=tuple(args.bins), num_workers=args.workers)
@@ -88,10 +88,12 @@ class OBSClient:
         self.event_client = obs.EventClient()
         
         self.record_state_events = {}
+        self.output_state = None  # Latest record output state reported by OBS
         
         def on_record_state_changed(data):
             output_state = data.output_state
             print("record state changed:", output_state)
+            self.output_state = output_state
             if output_state not in self.record_state_events:
                 self.record_state_events[output_state] = []
             self.record_state_events[output_state].append(time.perf_counter())
@@ -0,0 +1,165 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+
+try:
+    from playwright.async_api import Error as PlaywrightError
+except ImportError:
+    PlaywrightError = None
+
+# --- Configuration ---
+DEFAULT_CACHE_DIR = "page_cache"
+CACHE_MODES = ("record", "fallback", "offline")
+# The cached body is stored decoded, so headers describing the wire encoding no longer apply
+DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+CACHED_METHODS = {"GET", "HEAD"}
+
+
+def cache_key(method, url):
+    return hashlib.sha1(f"{method} {url}".encode()).hexdigest()
+
+def replayable_headers(headers):
+    return {k: v for k, v in headers.items() if k.lower() not in DROPPED_HEADERS}
+
+class PageCache:
+    """
+    Serves an automation browser context's requests from responses stored on disk, so
+    sessions don't wait on the network and see the same pages on every run.
+
+    Modes:
+        record   - every request goes to the network and its response is (re)written to the cache
+        fallback - cached responses are served from disk, misses go to the network and are cached
+        offline  - only cached responses are served, misses are aborted as if offline
+
+    Each response is stored as <sha1 of method and URL>.json (URL, status, headers) next to
+    <key>.body. Only GET and HEAD responses are cached; other requests go to the network except
+    in offline mode. Redirects are not followed when fetching: the 3xx response is stored and
+    replayed with its Location header, so the browser requests (and caches) the target itself.
+    Disk reads and writes run in a worker thread to keep the event loop free for other sessions.
+    Install on a context with `install(context, result)`, which also records the session's
+    counters under result["cache"].
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, mode="fallback"):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"mode must be one of {CACHE_MODES}, got {mode!r}")
+        self.cache_dir = cache_dir
+        self.mode = mode
+        self.stats = self._new_stats()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def _new_stats():
+        return {"hits": 0, "misses": 0, "network": 0, "stored": 0, "aborted": 0, "bytes_served": 0}
+
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return base + ".json", base + ".body"
+
+    def load(self, method, url):
+        """Returns (metadata, body) of a cached response, or None."""
+        meta_path, body_path = self._paths(cache_key(method, url))
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                return meta, f.read()
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def store(self, method, url, status, headers, body):
+        meta_path, body_path = self._paths(cache_key(method, url))
+        meta = {"method": method, "url": url, "status": status,
+                "headers": replayable_headers(headers)}
+        # Write under temporary names first: other engine processes may share the cache
+        for path, data in ((body_path, body), (meta_path, json.dumps(meta).encode())):
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+    async def install(self, context, result=None):
+        """Routes all of the context's requests through the cache."""
+        session = self._new_stats()
+        if result is not None:
+            result["cache"] = session
+
+        def count(name, amount=1):
+            session[name] += amount
+            self.stats[name] += amount
+
+        async def handle(route):
+            request = route.request
+            method, url = request.method, request.url
+            cacheable = method in CACHED_METHODS and not url.startswith(("data:", "blob:"))
+            try:
+                if cacheable and self.mode != "record":
+                    cached = await asyncio.to_thread(self.load, method, url)
+                    if cached is not None:
+                        meta, body = cached
+                        count("hits")
+                        count("bytes_served", len(body))
+                        await route.fulfill(status=meta["status"], headers=meta["headers"], body=body)
+                        return
+                    count("misses")
+
+                if self.mode == "offline":
+                    count("aborted")
+                    await route.abort("internetdisconnected")
+                    return
+
+                count("network")
+                # Following redirects here would fulfill the original URL with the target's content
+                response = await route.fetch(max_redirects=0)
+                body = await response.body()
+                if cacheable:
+                    await asyncio.to_thread(self.store, method, url, response.status, response.headers, body)
+                    count("stored")
+                await route.fulfill(status=response.status, headers=replayable_headers(response.headers), body=body)
+            except PlaywrightError:
+                # The request failed on the network, or the page/context went away meanwhile
+                try:
+                    await route.abort()
+                except PlaywrightError:
+                    pass
+
+        await context.route("**/*", handle)
+
+    def size(self):
+        """Returns (number of cached responses, total bytes on disk)."""
+        entries, total = 0, 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith((".json", ".body")):
+                total += entry.stat().st_size
+                entries += entry.name.endswith(".json")
+        return entries, total
+
+    def summary(self):
+        entries, total = self.size()
+        looked_up = self.stats["hits"] + self.stats["misses"]
+        hit_rate = self.stats["hits"] / looked_up if looked_up else 0.0
+        return (f"Page cache ({self.mode}): {entries} responses, {total / 1e6:.1f} MB in {self.cache_dir}; "
+                f"{self.stats['hits']} hits / {self.stats['misses']} misses ({hit_rate:.0%} hit rate), "
+                f"{self.stats['bytes_served'] / 1e6:.1f} MB served from disk, {self.stats['network']} network requests, "
+                f"{self.stats['stored']} stored, {self.stats['aborted']} aborted")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report the size of a page cache and the URLs it holds.")
+    parser.add_argument("cache_dir", nargs="?", default=DEFAULT_CACHE_DIR, help="Page cache directory")
+    parser.add_argument("--list", action="store_true", help="List the cached URLs")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.cache_dir):
+        print(f"Error: No page cache at {args.cache_dir}")
+    else:
+        cache = PageCache(args.cache_dir)
+        entries, total = cache.size()
+        print(f"{entries} cached responses, {total / 1e6:.1f} MB in {args.cache_dir}")
+        if args.list:
+            for entry in sorted(os.scandir(args.cache_dir), key=lambda e: e.name):
+                if entry.name.endswith(".json"):
+                    with open(entry.path, "r", encoding="utf-8") as f:
+                        meta = json.load(f)
+                    print(f"{meta['status']} {meta['method']} {meta['url']}")
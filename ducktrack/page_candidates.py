@@ -0,0 +1,110 @@
+# Input types that should trigger typing instead of just clicking
+TYPING_INPUT_TYPES = ['text', 'email', 'password', 'search', 'url', 'tel', 'number']
+
+# Define selectors
+INTERACTIVE_SELECTOR = (
+    'a:visible, button:visible, select:visible, ' # Links, buttons, dropdowns
+    'input:visible[type="button"], input:visible[type="submit"], ' # Input buttons
+    'input:visible[type="checkbox"], input:visible[type="radio"], '   # Checkboxes, Radio buttons
+    '[role="button"]:visible, [role="link"]:visible, [role="checkbox"]:visible, ' # ARIA roles
+    '[role="radio"]:visible, [role="combobox"]:visible, [role="option"]:visible, ' # More ARIA roles
+    '[role="menuitem"]:visible, [role="tab"]:visible, [onclick]:visible' # ARIA roles + elements with explicit onclick handlers
+)
+TYPING_SELECTOR = (
+    # Standard input types
+    'textarea:visible, ' +
+    ', '.join([f'input:visible[type="{t}"]' for t in TYPING_INPUT_TYPES]) + ', ' +
+    # Input elements defaulting to type="text"
+    'input:visible:not([type]), ' +
+    # Common ARIA roles for text input
+    '[role="textbox"]:visible, [role="searchbox"]:visible, ' +
+    # Elements made editable via attribute
+    '[contenteditable="true"]:visible'
+)
+# Plain CSS versions of the selectors (':visible' is a Playwright extension), used in-page
+INTERACTIVE_CSS_SELECTOR = INTERACTIVE_SELECTOR.replace(':visible', '')
+TYPING_CSS_SELECTOR = TYPING_SELECTOR.replace(':visible', '')
+
+# In-page script that describes every candidate element in a single round trip.
+# Elements are kept on `window` so a candidate can later be scrolled to by its index.
+CANDIDATES_SCRIPT = """
+([interactiveSelector, typingSelector]) => {
+    const describe = (el) => {
+        const rect = el.getBoundingClientRect();
+        const visible = rect.width > 0 && rect.height > 0 && window.getComputedStyle(el).visibility !== 'hidden';
+        const enabled = !(el.disabled === true || el.getAttribute('aria-disabled') === 'true');
+        let occluded = null, occludedBy = null;
+        const cx = rect.left + rect.width / 2, cy = rect.top + rect.height / 2;
+        if (visible && cx >= 0 && cy >= 0 && cx < window.innerWidth && cy < window.innerHeight) {
+            const topmost = document.elementFromPoint(cx, cy);
+            occluded = !(topmost && (topmost === el || el.contains(topmost) || topmost.contains(el)));
+            if (occluded && topmost) occludedBy = topmost.tagName.toLowerCase();
+        }
+        return {
+            visible, enabled, occluded, occluded_by: occludedBy,
+            bbox: {x: rect.left, y: rect.top, width: rect.width, height: rect.height},
+            tag: el.tagName.toLowerCase(),
+            href: el.getAttribute('href'),
+            text: (el.innerText || '').slice(0, 100),
+            value: el.getAttribute('value'),
+            aria_label: el.getAttribute('aria-label'),
+            placeholder: el.getAttribute('placeholder'),
+            name: el.getAttribute('name'),
+        };
+    };
+    const elements = [], candidates = [];
+    for (const [kind, selector] of [['interactive', interactiveSelector], ['typing', typingSelector], ['image', 'img']]) {
+        for (const el of document.querySelectorAll(selector)) {
+            candidates.push(Object.assign({index: elements.length, kind}, describe(el)));
+            elements.push(el);
+        }
+    }
+    window.__ducktrackCandidates = elements;
+    window.__ducktrackDescribe = describe;
+    return candidates;
+}
+"""
+# Scrolls a candidate found by CANDIDATES_SCRIPT into view (if needed) and describes it again
+SCROLL_CANDIDATE_SCRIPT = """
+(index) => {
+    const el = (window.__ducktrackCandidates || [])[index];
+    if (!el || !el.isConnected) return null;
+    const rect = el.getBoundingClientRect();
+    if (rect.top < 0 || rect.left < 0 || rect.bottom > window.innerHeight || rect.right > window.innerWidth) {
+        el.scrollIntoView({block: 'center', inline: 'center'});
+    }
+    return window.__ducktrackDescribe(el);
+}
+"""
+
+# Relative weights of the random actions taken on a page (click/type only when a candidate exists)
+ACTION_WEIGHTS = {'scroll': 15, 'move': 15, 'click': 35, 'type': 35}
+
+
+def split_candidates(candidates):
+    """Splits CANDIDATES_SCRIPT's result into visible/enabled interactive and typing elements and visible images."""
+    interactive = [c for c in candidates if c['kind'] == 'interactive' and c['visible'] and c['enabled']]
+    typing = [c for c in candidates if c['kind'] == 'typing' and c['visible'] and c['enabled']]
+    images = [c for c in candidates if c['kind'] == 'image' and c['visible']]
+    return interactive, typing, images
+
+def find_candidates(page):
+    """Returns the visible/enabled interactive and typing elements and the visible images, from one in-page script."""
+    return split_candidates(page.evaluate(CANDIDATES_SCRIPT, [INTERACTIVE_CSS_SELECTOR, TYPING_CSS_SELECTOR]))
+
+async def find_candidates_async(page):
+    """find_candidates for a page of Playwright's async API."""
+    return split_candidates(await page.evaluate(CANDIDATES_SCRIPT, [INTERACTIVE_CSS_SELECTOR, TYPING_CSS_SELECTOR]))
+
+def _refreshed_candidate(candidate, refreshed):
+    if refreshed:
+        refreshed.update(index=candidate['index'], kind=candidate['kind'])
+    return refreshed
+
+def scroll_candidate_into_view(page, candidate):
+    """Scrolls a candidate into view if needed and returns its refreshed description, or None if it is gone."""
+    return _refreshed_candidate(candidate, page.evaluate(SCROLL_CANDIDATE_SCRIPT, candidate['index']))
+
+async def scroll_candidate_into_view_async(page, candidate):
+    """scroll_candidate_into_view for a page of Playwright's async API."""
+    return _refreshed_candidate(candidate, await page.evaluate(SCROLL_CANDIDATE_SCRIPT, candidate['index']))
@@ -1,5 +1,4 @@
 import json
-import math
 import os
 import sys
 import time
@@ -10,7 +9,9 @@ from pynput.keyboard import Key
 from pynput.mouse import Button
 from pynput.mouse import Controller as MouseController
 
+from .catalog import RecordingCatalog
 from .keycomb import KeyCombinationListener
+from .segmenter import segment_events
 from .util import (fix_windows_dpi_scaling, get_recordings_dir, name_to_button,
                    name_to_key)
 
@@ -57,6 +58,9 @@ class Player:
         releases_to_skip = 0
         
         in_click_sequence = False
+        # Double/triple clicks, keyed by the index of their first press
+        click_counts = {action["event_range"][0]: action["count"]
+                        for action in segment_events(events) if action["type"] == "click"}
         
         for i, event in enumerate(events):
             start_time = time.perf_counter()
@@ -64,38 +68,6 @@ class Player:
             if self.stop_playback:
                 return
             
-            def do_mouse_press(button):
-                for j, second_event in enumerate(events[i+1:]):
-                    # make sure the time between mouse clicks is less than 500ms
-                    if second_event["time_stamp"] - event["time_stamp"] > 0.5:
-                        break
-                    
-                    if "x" in second_event and "y" in second_event:
-                        # if the mouse moves out of the click radius/rectangle, it is not a click sequence
-                        if math.sqrt((second_event["y"] - event["y"]) ** 2 +
-                                    (second_event["x"] - event["x"]) ** 2) > 4:
-                            break
-                    
-                    if second_event["action"] == "click" and second_event["pressed"]:
-                        for k, third_event in enumerate(events[i+j+2:]):
-                            if third_event["time_stamp"] - second_event["time_stamp"] > 0.5:
-                                break
-                            
-                            if "x" in third_event and "y" in third_event:
-                                if math.sqrt((third_event["y"] - event["y"]) ** 2 +
-                                            (third_event["x"] - event["x"]) ** 2) > 5:
-                                    break
-                            
-                            if third_event["action"] == "click" and third_event["pressed"]:
-                                mouse_controller.click(button, 3)                            
-                                return 2, 2
-
-                        mouse_controller.click(button, 2)
-                        return 1, 1
-                
-                mouse_controller.press(button)
-                return 0, 0
-
             if event["action"] == "move":
                 mouse_controller.position = (event["x"], event["y"])
 
@@ -104,12 +76,14 @@ class Player:
                 
                 if event["pressed"]:
                     if presses_to_skip == 0:
-                        presses, releases = do_mouse_press(button)                    
-                        presses_to_skip += presses
-                        releases_to_skip += releases
-                        
-                        if presses > 0:
+                        count = click_counts.get(i, 1)
+                        if count > 1:
+                            mouse_controller.click(button, count)
+                            presses_to_skip += count - 1
+                            releases_to_skip += count - 1
                             in_click_sequence = True
+                        else:
+                            mouse_controller.press(button)
                     else:
                         presses_to_skip -= 1
                 else:
@@ -161,14 +135,14 @@ def get_latest_recording() -> str:
     if not os.path.exists(recordings_dir):
         raise Exception("The recordings directory does not exist")
     
-    recordings = [os.path.join(recordings_dir, f) for f in os.listdir(recordings_dir) if os.path.isdir(os.path.join(recordings_dir, f))]
+    with RecordingCatalog(recordings_dir) as catalog:
+        catalog.rescan()
+        latest_recording = catalog.latest()
     
-    if len(recordings) == 0:
+    if latest_recording is None:
         raise Exception("You have no recordings to play back")
-    
-    latest_recording = max(recordings, key=os.path.getctime)
 
-    return latest_recording
+    return latest_recording["path"]
 
 def main():
     player = Player()
@@ -9,6 +9,8 @@ from pynput import keyboard, mouse
 from pynput.keyboard import KeyCode
 from PyQt6.QtCore import QThread, pyqtSignal
 
+from .catalog import RecordingCatalog
+from .event_index import EventIndexWriter
 from .metadata import MetadataManager
 from .obs_client import OBSClient
 from .util import fix_windows_dpi_scaling, get_recordings_dir
@@ -34,7 +36,9 @@ class Recorder(QThread):
         self._is_paused = False
         
         self.event_queue = Queue()
-        self.events_file = open(os.path.join(self.recording_path, "events.jsonl"), "a")
+        # Binary so that tell() gives the byte offsets the event index stores
+        self.events_file = open(os.path.join(self.recording_path, "events.jsonl"), "ab")
+        self.event_index = EventIndexWriter(self.recording_path)
         
         self.metadata_manager = MetadataManager(
             recording_path=self.recording_path, 
@@ -110,7 +114,12 @@ class Recorder(QThread):
         while self._is_recording:
             event = self.event_queue.get()
             # print(f"[Recorder] Got event from queue: {event['action']}") # Optional: uncomment for very verbose logging
-            self.events_file.write(json.dumps(event) + "\n")
+            self.event_index.add(event["time_stamp"], self.events_file.tell)
+            self.events_file.write((json.dumps(event) + "\n").encode())
+            if self.event_queue.empty():
+                # Caught up: put the events on disk, then the index entries pointing into them
+                self.events_file.flush()
+                self.event_index.flush()
         print("[Recorder] Exited main event loop.")
 
     def stop_recording(self):
@@ -125,7 +134,9 @@ class Recorder(QThread):
             self.obs_client.stop_recording()
             self.metadata_manager.add_obs_record_state_timings(self.obs_client.record_state_events)
             self.events_file.close()
+            self.event_index.close()
             self.metadata_manager.save_metadata()
+            self._add_to_catalog()
             
             self.recording_stopped.emit()
     
@@ -143,6 +154,14 @@ class Recorder(QThread):
             self.event_queue.put({"time_stamp": time.perf_counter(),
                                   "action": "resume"}, block=False)
 
+    def _add_to_catalog(self):
+        try:
+            with RecordingCatalog(os.path.dirname(self.recording_path)) as catalog:
+                catalog.add_recording(self.recording_path)
+        except Exception as e:
+            # The catalog is only an index; a rescan will pick the recording up later
+            print(f"[Recorder] Warning: could not add recording to catalog: {e}")
+
     def _get_recording_path(self) -> str:
         recordings_dir = get_recordings_dir()
 
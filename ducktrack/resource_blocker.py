@@ -0,0 +1,115 @@
+from urllib.parse import urlsplit
+
+try:
+    from playwright.async_api import Error as PlaywrightError
+except ImportError:
+    PlaywrightError = None
+
+# --- Configuration ---
+# Playwright resource types: document, stylesheet, image, media, font, script, texttrack,
+# xhr, fetch, eventsource, websocket, manifest, other
+DEFAULT_BLOCKED_TYPES = ("media", "font")
+# Ad, tracker and analytics hosts; a domain also matches all of its subdomains
+DEFAULT_BLOCKED_DOMAINS = (
+    "doubleclick.net", "googlesyndication.com", "googleadservices.com", "google-analytics.com",
+    "googletagmanager.com", "googletagservices.com", "adservice.google.com", "amazon-adsystem.com",
+    "adnxs.com", "criteo.com", "criteo.net", "taboola.com", "outbrain.com", "scorecardresearch.com",
+    "quantserve.com", "moatads.com", "rubiconproject.com", "pubmatic.com", "openx.net", "casalemedia.com",
+    "facebook.net", "hotjar.com", "segment.io", "newrelic.com", "nr-data.net",
+    "chartbeat.com", "optimizely.com", "adsrvr.org", "bat.bing.com", "clarity.ms",
+)
+
+
+def load_domains(path):
+    """Reads a domain list file: one domain per line, blank lines and # comments ignored."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.split("#", 1)[0].strip() for line in f if line.split("#", 1)[0].strip()]
+
+class ResourceBlocker:
+    """
+    Aborts an automation context's requests by resource type and by host, to cut the page
+    weight that delays `load` and slows in-page candidate queries.
+
+    Install on a context with `install(context, result)`; the session's counters are kept in
+    result["blocked"]: blocked requests and bytes (in total, per type and per domain) and the
+    requests and bytes that were let through. A blocked request is never downloaded, so its
+    size is taken from `size_hints`, the body sizes of URLs seen let through before (e.g. in a
+    run without blocking); blocked requests of unseen URLs are counted as "unsized".
+
+    Allowed requests fall back to routes installed on the context before this one (such as a
+    PageCache), so install the blocker last.
+    """
+
+    def __init__(self, blocked_types=DEFAULT_BLOCKED_TYPES, blocked_domains=DEFAULT_BLOCKED_DOMAINS,
+                 size_hints=None):
+        self.blocked_types = set(blocked_types)
+        self.blocked_domains = tuple(d.lower().lstrip(".") for d in blocked_domains)
+        self.size_hints = size_hints if size_hints is not None else {}
+        self.stats = self._new_stats()
+
+    @staticmethod
+    def _new_stats():
+        return {"blocked_requests": 0, "blocked_bytes": 0, "blocked_unsized": 0,
+                "allowed_requests": 0, "allowed_bytes": 0, "by_type": {}, "by_domain": {}}
+
+    def match(self, resource_type, url):
+        """Returns why a request is blocked ("type:<type>" or "domain:<domain>"), or None."""
+        if resource_type in self.blocked_types:
+            return f"type:{resource_type}"
+        host = (urlsplit(url).hostname or "").lower()
+        for domain in self.blocked_domains:
+            if host == domain or host.endswith("." + domain):
+                return f"domain:{domain}"
+        return None
+
+    async def install(self, context, result=None):
+        """Routes all of the context's requests through the blocker."""
+        session = self._new_stats()
+        if result is not None:
+            result["blocked"] = session
+
+        def count(name, amount=1, key=None):
+            for stats in (session, self.stats):
+                if key is None:
+                    stats[name] += amount
+                else:
+                    stats[name][key] = stats[name].get(key, 0) + amount
+
+        async def handle(route):
+            request = route.request
+            reason = self.match(request.resource_type, request.url)
+            try:
+                if reason is None:
+                    await route.fallback()
+                    return
+                await route.abort("blockedbyclient")
+            except PlaywrightError:
+                # The page or context went away meanwhile
+                return
+            size = self.size_hints.get(request.url)
+            count("blocked_requests")
+            count("by_type", key=request.resource_type)
+            if reason.startswith("domain:"):
+                count("by_domain", key=reason[len("domain:"):])
+            if size is None:
+                count("blocked_unsized")
+            else:
+                count("blocked_bytes", size)
+
+        async def on_finished(request):
+            try:
+                size = (await request.sizes())["responseBodySize"]
+            except PlaywrightError:
+                return
+            self.size_hints[request.url] = size
+            count("allowed_requests")
+            count("allowed_bytes", size)
+
+        context.on("requestfinished", on_finished)
+        await context.route("**/*", handle)
+
+    def summary(self):
+        return (f"Blocked {self.stats['blocked_requests']} requests "
+                f"({self.stats['blocked_bytes'] / 1e6:.1f} MB, {self.stats['blocked_unsized']} of unknown size), "
+                f"let through {self.stats['allowed_requests']} ({self.stats['allowed_bytes'] / 1e6:.1f} MB); by type: "
+                + (", ".join(f"{t} {n}" for t, n in sorted(self.stats["by_type"].items())) or "none"))
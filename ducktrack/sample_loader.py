@@ -0,0 +1,253 @@
+import argparse
+import contextlib
+import io
+import multiprocessing as mp
+import os
+import queue
+import random
+import time
+
+import cv2
+import numpy as np
+
+from .batch_process import find_recordings
+from .extract_frames import BEFORE_OFFSET_SEC
+from .segmenter import segment_events
+from .util import get_recordings_dir
+from .visualize_recording import (EVENTS_FILENAME, SEEK_MIN_GAP_SEC,
+                                  VIDEO_FILENAME, FramePump,
+                                  build_frame_index, load_events)
+
+# --- Configuration ---
+DEFAULT_WORKERS = 4                 # Decoding processes
+PREFETCH_SIZE = 256                 # Encoded samples waiting in the queue before workers block
+SHUFFLE_BUFFER_BYTES = 256 * 2**20  # Encoded frame bytes mixed across recordings before being handed out
+FRAME_FORMAT = ".jpg"               # How frames cross the process boundary (".png" to keep them lossless)
+JPEG_QUALITY = 95
+WORKER_POLL_SEC = 5.0               # Wait for a sample before checking whether workers died
+REPORT_EVERY = 1000                 # Samples between throughput reports in the CLI
+
+_DONE = "done"  # Sent by a worker, as (_DONE, worker number), once it has no recordings left
+
+
+def recording_samples(recording_dir, scale=1.0, before_sec=BEFORE_OFFSET_SEC):
+    """
+    Yields (frame, action) training samples for one recording: for every action, the frame
+    shown just before it started, aligned to the video with the OBS start time.
+    """
+    # load_events reports its alignment on stdout, which is just noise for every recording here
+    with contextlib.redirect_stdout(io.StringIO()):
+        events, _ = load_events(os.path.join(recording_dir, EVENTS_FILENAME))
+    if not events:
+        return
+
+    cap = cv2.VideoCapture(os.path.join(recording_dir, VIDEO_FILENAME))
+    if not cap.isOpened():
+        return
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        if fps <= 0:
+            return
+
+        frame_index = build_frame_index(events, fps, total_frames)
+        last_frame = total_frames - 1 if total_frames > 0 else frame_index.num_frames - 1
+        actions = list(segment_events(events, time_key='relative_time_sec'))
+        if not actions:
+            return
+        starts = np.array([a['start_time'] for a in actions], dtype=np.float64)
+        frames = np.clip(frame_index.frame_for_time(starts - before_sec), 0, last_frame)
+
+        # Actions come out in time order, so the pump only ever grabs or seeks forward
+        pump = FramePump(cap, seek_threshold=int(SEEK_MIN_GAP_SEC * fps))
+        name = os.path.basename(recording_dir)
+        frame_num, frame = None, None
+        for action, action_frame in zip(actions, frames):
+            if action_frame != frame_num:
+                frame_num = int(action_frame)
+                frame = pump.read(frame_num)
+                if frame is None:
+                    break
+                if scale != 1.0:
+                    frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            yield {'recording': name, 'frame_num': frame_num, 'frame': frame, 'action': action}
+    finally:
+        cap.release()
+
+def encode_frame(frame, frame_format=FRAME_FORMAT):
+    params = [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY] if frame_format == ".jpg" else []
+    ok, encoded = cv2.imencode(frame_format, frame, params)
+    if not ok:
+        raise ValueError(f"Could not encode frame as {frame_format}")
+    return encoded.tobytes()
+
+def decode_frame(data):
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+def _decode_worker(worker_num, task_queue, sample_queue, scale, before_sec, frame_format):
+    """
+    Decodes recordings from `task_queue` into `sample_queue` until it receives None. Frames are
+    sent encoded: a full 1080p frame is ~6 MB to pickle through the queue, its JPEG ~0.3 MB.
+    """
+    cv2.setNumThreads(1)
+    while True:
+        recording_dir = task_queue.get()
+        if recording_dir is None:
+            break
+        try:
+            last_frame, encoded = None, None
+            for sample in recording_samples(recording_dir, scale, before_sec):
+                # Consecutive actions often share a frame; encode it once
+                if sample['frame'] is not last_frame:
+                    last_frame, encoded = sample['frame'], encode_frame(sample['frame'], frame_format)
+                sample['frame'] = encoded
+                sample_queue.put(sample)
+        except Exception as e:
+            print(f"Warning: Skipping {recording_dir} ({e}).")
+    sample_queue.put((_DONE, worker_num))
+
+class SampleLoader:
+    """
+    Iterates (frame, next action) samples from many recordings on CPU.
+
+    Recordings are split deterministically across `num_shards` consumers (consumer
+    `shard_index` gets every `num_shards`-th recording in name order), then decoded by
+    `num_workers` processes into a bounded prefetch queue. A shuffle buffer of up to
+    `shuffle_buffer_bytes` of encoded frames mixes samples from different recordings before
+    they are yielded (0 disables shuffling). Each sample is a dict with the recording name,
+    frame number, frame and action (as produced by the segmenter). Frames stay encoded
+    (`frame_format`) until handed out, so memory scales with the compressed size; the frame is
+    a BGR array, or the encoded bytes with `decode=False`.
+    """
+
+    def __init__(self, recordings, num_workers=DEFAULT_WORKERS, prefetch=PREFETCH_SIZE,
+                 shuffle_buffer_bytes=SHUFFLE_BUFFER_BYTES, seed=0, shard_index=0, num_shards=1,
+                 scale=1.0, before_sec=BEFORE_OFFSET_SEC, frame_format=FRAME_FORMAT, decode=True):
+        if not 0 <= shard_index < num_shards:
+            raise ValueError(f"shard_index must be in [0, {num_shards}), got {shard_index}")
+        self.recordings = sorted(recordings)[shard_index::num_shards]
+        self.num_workers = max(1, min(num_workers, len(self.recordings)))
+        self.prefetch = prefetch
+        self.shuffle_buffer_bytes = shuffle_buffer_bytes
+        self.seed = seed
+        self.scale = scale
+        self.before_sec = before_sec
+        self.frame_format = frame_format
+        self.decode = decode
+        self.samples = 0
+        self.elapsed = 0.0
+
+    def __iter__(self):
+        rng = random.Random(self.seed)
+        recordings = list(self.recordings)
+        if self.shuffle_buffer_bytes:
+            rng.shuffle(recordings)
+        if not recordings:
+            return
+
+        task_queue = mp.Queue()
+        sample_queue = mp.Queue(maxsize=self.prefetch)
+        for recording_dir in recordings:
+            task_queue.put(recording_dir)
+        for _ in range(self.num_workers):
+            task_queue.put(None)
+
+        workers = [mp.Process(target=_decode_worker, args=(i, task_queue, sample_queue, self.scale, self.before_sec,
+                                                           self.frame_format),
+                              daemon=True) for i in range(self.num_workers)]
+        for worker in workers:
+            worker.start()
+
+        start = time.perf_counter()
+        buffer = []
+        buffer_bytes = 0
+        finished = set()
+        try:
+            while len(finished) < len(workers):
+                try:
+                    sample = sample_queue.get(timeout=WORKER_POLL_SEC)
+                except queue.Empty:
+                    # A worker killed outright (OOM killer, a crash in a native decoder) never sends _DONE
+                    for i, worker in enumerate(workers):
+                        if i not in finished and not worker.is_alive() and worker.exitcode != 0:
+                            print(f"Warning: Decoding worker {i} died (exit code {worker.exitcode}), "
+                                  f"the recording it was decoding is incomplete.")
+                            finished.add(i)
+                    continue
+                if isinstance(sample, tuple) and sample[0] == _DONE:
+                    finished.add(sample[1])
+                    continue
+                # Samples sharing a frame are counted once per sample; it only makes the bound conservative
+                size = len(sample['frame'])
+                if self.shuffle_buffer_bytes and (not buffer or buffer_bytes + size <= self.shuffle_buffer_bytes):
+                    buffer.append(sample)
+                    buffer_bytes += size
+                    continue
+                if buffer:
+                    # Hand out a random buffered sample and keep the new one in its place
+                    j = rng.randrange(len(buffer))
+                    buffer[j], sample = sample, buffer[j]
+                    buffer_bytes += size - len(sample['frame'])
+                yield self._hand_out(sample, start)
+
+            rng.shuffle(buffer)
+            for sample in buffer:
+                yield self._hand_out(sample, start)
+        finally:
+            # Also reached when the consumer stops early; workers may be blocked on a full queue
+            for worker in workers:
+                if worker.is_alive():
+                    worker.terminate()
+                worker.join()
+
+    def _hand_out(self, sample, start):
+        if self.decode:
+            sample['frame'] = decode_frame(sample['frame'])
+        self.samples += 1
+        self.elapsed = time.perf_counter() - start
+        return sample
+
+    def samples_per_sec(self):
+        return self.samples / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self):
+        return f"{self.samples} samples in {self.elapsed:.1f}s ({self.samples_per_sec():.1f} samples/s)"
+
+def main(recordings_dir, num_workers=DEFAULT_WORKERS, shard_index=0, num_shards=1, seed=0,
+         scale=1.0, limit=None, shuffle_mb=SHUFFLE_BUFFER_BYTES / 2**20, frame_format=FRAME_FORMAT):
+    recordings = find_recordings(recordings_dir)
+    if not recordings:
+        print(f"Error: No recordings found in {recordings_dir}")
+        return
+
+    loader = SampleLoader(recordings, num_workers=num_workers, seed=seed, shard_index=shard_index,
+                          num_shards=num_shards, scale=scale, shuffle_buffer_bytes=int(shuffle_mb * 2**20),
+                          frame_format=frame_format)
+    print(f"Shard {shard_index}/{num_shards}: {len(loader.recordings)} of {len(recordings)} recordings, "
+          f"{loader.num_workers} workers.")
+    for sample in loader:
+        if loader.samples % REPORT_EVERY == 0:
+            print(f"{loader.summary()} - last: {sample['recording']} frame {sample['frame_num']} "
+                  f"{sample['action']['type']}")
+        if limit is not None and loader.samples >= limit:
+            break
+    print(f"Loaded {loader.summary()}.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Iterate (frame, next action) training samples and report loader throughput.")
+    parser.add_argument("recordings_dir", nargs="?", default=get_recordings_dir(), help="Directory containing recording folders")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Number of decoding processes")
+    parser.add_argument("--shard", type=int, default=0, help="Index of this consumer's shard")
+    parser.add_argument("--num-shards", type=int, default=1, help="Number of consumers the recordings are split across")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the recording order and shuffle buffer")
+    parser.add_argument("--scale", type=float, default=1.0, help="Downscale factor applied to frames")
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many samples")
+    parser.add_argument("--shuffle-mb", type=float, default=SHUFFLE_BUFFER_BYTES / 2**20,
+                        help="Encoded frame megabytes held in the shuffle buffer (0 disables shuffling)")
+    parser.add_argument("--frame-format", choices=[".jpg", ".png"], default=FRAME_FORMAT,
+                        help="Encoding of frames between the workers and the consumer")
+    args = parser.parse_args()
+
+    main(args.recordings_dir, num_workers=args.workers, shard_index=args.shard, num_shards=args.num_shards,
+         seed=args.seed, scale=args.scale, limit=args.limit, shuffle_mb=args.shuffle_mb,
+         frame_format=args.frame_format)
@@ -0,0 +1,274 @@
+import argparse
+import json
+import math
+import os
+
+# --- Configuration ---
+EVENTS_FILENAME = "events.jsonl"
+ACTIONS_FILENAME = "actions.jsonl"
+CLICK_MULTI_INTERVAL_SEC = 0.5  # Max time between presses of a double/triple click (as in Player.playback)
+CLICK_RADIUS_PX = 5             # Max distance between presses of a double/triple click
+DRAG_THRESHOLD_PX = 5           # Movement while a button is held that turns a click into a drag
+MAX_DRAG_PATH_POINTS = 64       # Drag paths are decimated to stay within this many points
+TYPING_GAP_SEC = 1.0            # Pause that ends a typed text span
+SCROLL_BURST_GAP_SEC = 0.5      # Pause that ends a scroll burst
+
+MODIFIER_KEYS = {
+    "shift": "shift", "shift_l": "shift", "shift_r": "shift",
+    "ctrl": "ctrl", "ctrl_l": "ctrl", "ctrl_r": "ctrl",
+    "alt": "alt", "alt_l": "alt", "alt_r": "alt", "alt_gr": "alt",
+    "cmd": "cmd", "cmd_l": "cmd", "cmd_r": "cmd",
+}
+CHORD_MODIFIERS = {"ctrl", "alt", "cmd"}  # Modifiers that turn a key press into a hotkey
+TEXT_KEYS = {"space": " ", "enter": "\n", "tab": "\t"}
+
+
+def _distance(x0, y0, x1, y1):
+    return math.hypot(x1 - x0, y1 - y0)
+
+class ActionSegmenter:
+    """
+    Turns a stream of raw events into high-level actions in a single pass.
+
+    Emits clicks (with multiplicity), drags (with a decimated path), typed text spans (with
+    shift/caps lock and backspace applied), hotkey chords, other single key presses and
+    coalesced scroll bursts. Every action carries start/end times and the inclusive
+    `event_range` of the events it was built from. Only the action currently being built is
+    kept, so memory stays constant however long the recording is.
+    """
+
+    def __init__(self, time_key="time_stamp"):
+        self.time_key = time_key
+        self._held_modifiers = {}  # key: modifier, value: event index of its press
+        self._caps_lock = False
+        self._presses = {}         # key: mouse button currently held, value: its click or drag in progress
+        self._clicks = None        # Last click, waiting to see whether it becomes a double/triple click
+        self._typing = None
+        self._scroll = None
+
+    def feed(self, idx, event):
+        """Processes one event and returns the actions it completed."""
+        emitted = []
+        action = event.get("action")
+        t = event[self.time_key]
+
+        # Close anything that has timed out
+        if self._clicks and t - self._clicks["last_press_time"] > CLICK_MULTI_INTERVAL_SEC:
+            emitted.append(self._take_clicks())
+        if self._typing and t - self._typing["end_time"] > TYPING_GAP_SEC:
+            emitted.append(self._take("_typing"))
+        if self._scroll and t - self._scroll["end_time"] > SCROLL_BURST_GAP_SEC:
+            emitted.append(self._take("_scroll"))
+
+        if action == "move":
+            for press in self._presses.values():
+                self._on_drag_move(press, idx, t, event)
+        elif action == "click":
+            emitted.extend(self._take_all(keep_clicks=True))
+            if event.get("pressed"):
+                emitted.extend(self._on_mouse_press(idx, t, event))
+            elif event.get("button") in self._presses:
+                emitted.extend(self._on_mouse_release(event.get("button"), idx, t, event.get("x"), event.get("y")))
+        elif action == "scroll":
+            if event.get("dx") == 0 and event.get("dy") == 0:
+                return emitted
+            if not self._scroll:
+                emitted.extend(self._take_all())
+                self._scroll = {"type": "scroll", "start_time": t, "end_time": t, "event_range": [idx, idx],
+                                "x": event.get("x"), "y": event.get("y"), "dx": 0, "dy": 0, "count": 0}
+            self._scroll["end_time"] = t
+            self._scroll["event_range"][1] = idx
+            self._scroll["dx"] += event.get("dx", 0)
+            self._scroll["dy"] += event.get("dy", 0)
+            self._scroll["count"] += 1
+        elif action == "press":
+            emitted.extend(self._on_key_press(idx, t, event.get("name")))
+        elif action == "release":
+            modifier = MODIFIER_KEYS.get(event.get("name"))
+            if modifier:
+                self._held_modifiers.pop(modifier, None)
+            if self._typing:
+                self._typing["end_time"] = t
+                self._typing["event_range"][1] = idx
+        elif action in ("pause", "resume"):
+            emitted.extend(self._take_all())
+            self._held_modifiers.clear()
+
+        return emitted
+
+    def finish(self):
+        """Returns the actions still being built once the stream ends."""
+        emitted = []
+        # Presses whose release was never recorded still count as clicks (or drags)
+        for button, press in sorted(self._presses.items(), key=lambda item: item[1]["start_time"]):
+            emitted.extend(self._on_mouse_release(button, press["last_idx"], press["last_time"], *press["path"][-1]))
+        return emitted + self._take_all()
+
+    def _on_mouse_press(self, idx, t, event):
+        emitted = []
+        x, y, button = event.get("x"), event.get("y"), event.get("button")
+        clicks = self._clicks
+        if clicks and not self._continues_clicks(button, x, y):
+            emitted.append(self._take_clicks())
+        if button in self._presses:
+            # A second press of a held button means its release was lost; close it here
+            press = self._presses[button]
+            emitted.extend(self._on_mouse_release(button, press["last_idx"], press["last_time"], *press["path"][-1]))
+        self._presses[button] = {"button": button, "x": x, "y": y, "start_time": t, "start_idx": idx,
+                                 "path": [[x, y]], "stride": 1, "moves": 0, "dragging": False,
+                                 "last_idx": idx, "last_time": t}
+        return emitted
+
+    def _continues_clicks(self, button, x, y):
+        """Whether a press of `button` at (x, y) can extend the pending click into a double/triple click."""
+        clicks = self._clicks
+        return clicks["button"] == button and _distance(clicks["x"], clicks["y"], x, y) <= CLICK_RADIUS_PX
+
+    def _on_drag_move(self, press, idx, t, event):
+        x, y = event.get("x"), event.get("y")
+        if not press["dragging"] and _distance(press["x"], press["y"], x, y) > DRAG_THRESHOLD_PX:
+            press["dragging"] = True
+        press["moves"] += 1
+        press["last_idx"], press["last_time"] = idx, t
+        if press["moves"] % press["stride"] == 0:
+            press["path"].append([x, y])
+            if len(press["path"]) > MAX_DRAG_PATH_POINTS:
+                # Keep every other point and sample half as often from now on
+                press["path"] = press["path"][::2]
+                press["stride"] *= 2
+
+    def _on_mouse_release(self, button, idx, t, x, y):
+        press = self._presses.pop(button)
+        if self._clicks and not self._continues_clicks(button, press["x"], press["y"]):
+            # Another button was clicked while this one was held
+            emitted = [self._take_clicks()]
+        else:
+            emitted = []
+        if press["dragging"]:
+            if self._clicks:
+                emitted.append(self._take_clicks())
+            path = press["path"]
+            end = [x, y]
+            if path[-1] != end:
+                path.append(end)
+            return emitted + [{"type": "drag", "start_time": press["start_time"], "end_time": t,
+                               "event_range": [press["start_idx"], idx], "button": press["button"],
+                               "start": path[0], "end": end, "path": path}]
+
+        if self._clicks:
+            # Continues the pending click (same button, close by, soon enough)
+            self._clicks["count"] += 1
+            self._clicks["end_time"] = t
+            self._clicks["event_range"][1] = idx
+            self._clicks["last_press_time"] = press["start_time"]
+        else:
+            self._clicks = {"type": "click", "start_time": press["start_time"], "end_time": t,
+                            "event_range": [press["start_idx"], idx], "button": press["button"],
+                            "x": press["x"], "y": press["y"], "count": 1,
+                            "last_press_time": press["start_time"]}
+        if self._clicks["count"] >= 3:
+            emitted.append(self._take_clicks())
+        return emitted
+
+    def _on_key_press(self, idx, t, name):
+        emitted = []
+        modifier = MODIFIER_KEYS.get(name)
+        if modifier:
+            self._held_modifiers.setdefault(modifier, idx)
+            return emitted
+        if name == "caps_lock":
+            self._caps_lock = not self._caps_lock
+            return emitted
+
+        chord = CHORD_MODIFIERS & self._held_modifiers.keys()
+        text = TEXT_KEYS.get(name, name if name and len(name) == 1 else None)
+        if chord or (text is None and name != "backspace"):
+            emitted.extend(self._take_all())
+            modifiers = sorted(self._held_modifiers)
+            first_idx = min([idx] + list(self._held_modifiers.values()))
+            emitted.append({"type": "hotkey" if chord else "key", "start_time": t, "end_time": t,
+                            "event_range": [first_idx, idx], "key": name, "modifiers": modifiers})
+            return emitted
+
+        if not self._typing:
+            emitted.extend(self._take_all())
+            first_idx = min([idx] + list(self._held_modifiers.values()))
+            self._typing = {"type": "type", "start_time": t, "end_time": t, "event_range": [first_idx, idx],
+                            "text": "", "keystrokes": 0}
+        typing = self._typing
+        typing["end_time"] = t
+        typing["event_range"][1] = idx
+        typing["keystrokes"] += 1
+        if name == "backspace":
+            typing["text"] = typing["text"][:-1]
+        else:
+            if len(text) == 1 and text.isalpha() and ("shift" in self._held_modifiers) != self._caps_lock:
+                text = text.upper()
+            typing["text"] += text
+        return emitted
+
+    def _take(self, attr):
+        action = getattr(self, attr)
+        setattr(self, attr, None)
+        return action
+
+    def _take_clicks(self):
+        clicks = self._take("_clicks")
+        del clicks["last_press_time"]
+        return clicks
+
+    def _take_all(self, keep_clicks=False):
+        """Flushes every pending action (except a click that may still repeat), oldest first."""
+        pending = [self._take("_typing"), self._take("_scroll")]
+        if not keep_clicks and self._clicks:
+            pending.append(self._take_clicks())
+        return sorted((a for a in pending if a), key=lambda a: a["start_time"])
+
+def segment_events(events, time_key="time_stamp"):
+    """Yields high-level actions from an iterable of raw events."""
+    segmenter = ActionSegmenter(time_key)
+    for idx, event in enumerate(events):
+        yield from segmenter.feed(idx, event)
+    yield from segmenter.finish()
+
+def iter_events(events_path):
+    """Lazily parses events.jsonl, skipping invalid lines."""
+    with open(events_path, "r") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+def load_actions(recording_dir, refresh=False):
+    """
+    Returns the recording's actions, segmenting events.jsonl only if the cached
+    actions.jsonl is missing or older than it.
+    """
+    events_path = os.path.join(recording_dir, EVENTS_FILENAME)
+    actions_path = os.path.join(recording_dir, ACTIONS_FILENAME)
+    if not refresh and os.path.isfile(actions_path) and \
+            os.path.getmtime(actions_path) >= os.path.getmtime(events_path):
+        with open(actions_path, "r") as f:
+            return [json.loads(line) for line in f]
+
+    actions = []
+    with open(actions_path + ".tmp", "w") as f:
+        for action in segment_events(iter_events(events_path)):
+            f.write(json.dumps(action) + "\n")
+            actions.append(action)
+    os.replace(actions_path + ".tmp", actions_path)
+    return actions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Segment a recording's raw events into clicks, drags, typing, hotkeys and scrolls.")
+    parser.add_argument("recording_dir", help="Path to the recording directory containing events.jsonl")
+    parser.add_argument("--refresh", action="store_true", help="Ignore the cached actions.jsonl")
+    args = parser.parse_args()
+
+    actions = load_actions(args.recording_dir, refresh=args.refresh)
+    counts = {}
+    for action in actions:
+        counts[action["type"]] = counts.get(action["type"], 0) + 1
+    print(f"{len(actions)} actions: " + ", ".join(f"{count} {kind}" for kind, count in sorted(counts.items())))
+    print(f"Saved to: {os.path.join(args.recording_dir, ACTIONS_FILENAME)}")
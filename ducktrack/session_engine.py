@@ -0,0 +1,250 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+try:
+    from playwright.async_api import Error as PlaywrightError
+    from playwright.async_api import async_playwright
+except ImportError:
+    PlaywrightError = None
+    async_playwright = None
+
+from .page_cache import CACHE_MODES, PageCache
+from .page_candidates import ACTION_WEIGHTS, find_candidates_async, scroll_candidate_into_view_async
+from .resource_blocker import DEFAULT_BLOCKED_DOMAINS, DEFAULT_BLOCKED_TYPES, ResourceBlocker, load_domains
+from .synthetic_recorder import (CLICK_HOLD_MAX, CLICK_HOLD_MIN, KEY_INTERVAL_MAX, KEY_INTERVAL_MIN,
+                                 MOVE_DURATION_MAX, MOVE_DURATION_MIN, MOVE_STEP_SEC, NAVIGATION_TIMEOUT_MS,
+                                 PAUSE_MAX, PAUSE_MIN, SCROLL_PIXELS_PER_TICK, SCROLL_TICK_INTERVAL,
+                                 VIEWPORT_HEIGHT, VIEWPORT_WIDTH, candidate_point, describe_error, load_urls,
+                                 random_text)
+
+# --- Configuration ---
+MAX_CONCURRENT_SESSIONS = 8   # Sessions running at once in the process
+SESSION_TIMEOUT_SEC = 120.0   # A session still running after this long is cancelled
+NUM_INTERACTIONS = 20         # Actions per session
+
+
+def plan_actions(rng, num_actions):
+    """
+    Draws a session's action plan with the scroll/move/click/type weights. A planned click or
+    type falls back to a scroll or move when the page has nothing to click or type into.
+    """
+    kinds = list(ACTION_WEIGHTS)
+    return rng.choices(kinds, weights=[ACTION_WEIGHTS[k] for k in kinds], k=num_actions)
+
+class SessionEngine:
+    """
+    Runs many independent automation sessions concurrently in one process with Playwright's
+    async API: one browser, and a fresh context, page and seeded action plan per session.
+
+    At most `max_concurrency` sessions run at once, each is cancelled after `session_timeout`
+    seconds, and every session returns a result dict with its status ("ok", "timeout" or
+    "error"), page load time, duration and the actions it performed. `context_hooks` are
+    awaited as hook(context, result) on every new context before its page is opened, so
+    request routing can be added per session and report into its result. `launch_args` are
+    extra Chromium command line arguments.
+    """
+
+    def __init__(self, max_concurrency=MAX_CONCURRENT_SESSIONS, session_timeout=SESSION_TIMEOUT_SEC,
+                 num_interactions=NUM_INTERACTIONS, viewport=(VIEWPORT_WIDTH, VIEWPORT_HEIGHT),
+                 headless=True, context_hooks=(), launch_args=()):
+        self.max_concurrency = max_concurrency
+        self.session_timeout = session_timeout
+        self.num_interactions = num_interactions
+        self.viewport = viewport
+        self.headless = headless
+        self.context_hooks = list(context_hooks)
+        self.launch_args = list(launch_args)
+
+    async def run(self, urls, seed=0):
+        """Runs one session per URL and returns their results in the same order."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=self.headless, args=self.launch_args)
+            try:
+                return await asyncio.gather(*(self._run_limited(semaphore, browser, i, url, seed + i)
+                                              for i, url in enumerate(urls)))
+            finally:
+                await browser.close()
+
+    async def _run_limited(self, semaphore, browser, index, url, seed):
+        async with semaphore:
+            return await self.run_session(browser, index, url, seed)
+
+    async def run_session(self, browser, index, url, seed):
+        result = {"index": index, "url": url, "seed": seed, "status": "ok", "error": None,
+                  "load_sec": None, "duration_sec": None, "actions": []}
+        started = time.perf_counter()
+        context = None
+        try:
+            context = await browser.new_context(viewport={"width": self.viewport[0], "height": self.viewport[1]})
+            for hook in self.context_hooks:
+                await hook(context, result)
+            await asyncio.wait_for(self._drive(context, url, random.Random(seed), result), self.session_timeout)
+        except asyncio.TimeoutError:
+            result["status"] = "timeout"
+        except Exception as e:
+            # Any failure ends only this session, never the whole batch
+            result["status"] = "error"
+            result["error"] = describe_error(e)
+        finally:
+            result["duration_sec"] = time.perf_counter() - started
+            if context is not None:
+                try:
+                    await context.close()
+                except PlaywrightError:
+                    pass  # The browser is already gone
+        return result
+
+    async def _drive(self, context, url, rng, result):
+        page = await context.new_page()
+        # Links opening new tabs would leave the session; keep everything in one page
+        context.on("page", lambda popup: asyncio.ensure_future(popup.close()))
+        load_start = time.perf_counter()
+        await page.goto(url, wait_until="load", timeout=NAVIGATION_TIMEOUT_MS)
+        result["load_sec"] = time.perf_counter() - load_start
+
+        for planned in plan_actions(rng, self.num_interactions):
+            action_start = time.perf_counter()
+            action = {"planned": planned, "type": planned, "ok": True}
+            try:
+                interactive, typing, _ = await find_candidates_async(page)
+                candidates = interactive if planned == "click" else typing if planned == "type" else None
+                if candidates is not None and not candidates:
+                    action["type"] = rng.choices(["scroll", "move"], weights=[ACTION_WEIGHTS["scroll"], ACTION_WEIGHTS["move"]])[0]
+                await self._perform(page, action, candidates, rng)
+            except PlaywrightError as e:
+                # Usually a click that navigated while the page was being inspected
+                action["ok"] = False
+                action["error"] = describe_error(e)
+                try:
+                    await page.wait_for_load_state("load", timeout=NAVIGATION_TIMEOUT_MS)
+                except PlaywrightError as load_error:
+                    # Navigated again or closed meanwhile; that fails this action, not the session
+                    action["load_error"] = describe_error(load_error)
+            action["duration_sec"] = time.perf_counter() - action_start
+            result["actions"].append(action)
+            if page.is_closed():
+                break
+            await asyncio.sleep(rng.uniform(PAUSE_MIN, PAUSE_MAX))
+
+    async def _perform(self, page, action, candidates, rng):
+        kind = action["type"]
+        if kind == "scroll":
+            ticks = rng.randint(1, 5)
+            direction = rng.choice([-1, 1])
+            for _ in range(ticks):
+                await page.mouse.wheel(0, direction * SCROLL_PIXELS_PER_TICK)
+                await asyncio.sleep(SCROLL_TICK_INTERVAL)
+            action["ticks"] = direction * ticks
+            return
+
+        if kind == "move":
+            target = (rng.uniform(0, self.viewport[0] - 1), rng.uniform(0, self.viewport[1] - 1))
+        else:
+            element = await scroll_candidate_into_view_async(page, rng.choice(candidates))
+            if not element or element["occluded"] is not False:
+                action["ok"] = False
+                action["error"] = "target gone or occluded"
+                return
+            action["target"] = {"tag": element["tag"], "text": element["text"][:40]}
+            target = candidate_point(element, rng)
+
+        duration = rng.uniform(MOVE_DURATION_MIN, MOVE_DURATION_MAX)
+        await page.mouse.move(*target, steps=max(1, int(duration / MOVE_STEP_SEC)))
+        if kind == "move":
+            return
+
+        await page.mouse.down()
+        await asyncio.sleep(rng.uniform(CLICK_HOLD_MIN, CLICK_HOLD_MAX))
+        await page.mouse.up()
+        if kind == "type":
+            text = random_text(rng)
+            await page.keyboard.type(text, delay=rng.uniform(KEY_INTERVAL_MIN, KEY_INTERVAL_MAX) * 1000)
+            action["text"] = text
+
+def summarize(results, elapsed):
+    """One-line summary of a run's session results."""
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    loads = [r["load_sec"] for r in results if r["load_sec"] is not None]
+    actions = sum(len(r["actions"]) for r in results)
+    return (f"{len(results)} sessions in {elapsed:.1f}s ({len(results) / max(elapsed / 60, 1e-6):.1f}/min): "
+            + ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+            + f"; {actions} actions ({actions / max(elapsed, 1e-6):.1f}/s)"
+            + (f", mean load {sum(loads) / len(loads):.2f}s" if loads else ""))
+
+def main(sources, num_sessions, max_concurrency=MAX_CONCURRENT_SESSIONS, session_timeout=SESSION_TIMEOUT_SEC,
+         num_interactions=NUM_INTERACTIONS, seed=0, headless=True, results_path=None, context_hooks=(),
+         cache_dir=None, cache_mode="fallback", block_types=None, block_domains=None):
+    if async_playwright is None:
+        print("Error: playwright is required for the session engine (pip install playwright && playwright install chromium).")
+        return None
+    urls = load_urls(sources)
+    if not urls:
+        print("Error: No URLs to run.")
+        return None
+
+    cache = None
+    if cache_dir:
+        cache = PageCache(cache_dir, cache_mode)
+        context_hooks = [cache.install, *context_hooks]
+    blocker = None
+    if block_types or block_domains:
+        # Installed after the cache so blocked requests never reach it
+        blocker = ResourceBlocker(block_types or (), block_domains or ())
+        context_hooks = [*context_hooks, blocker.install]
+
+    rng = random.Random(seed)
+    session_urls = [rng.choice(urls) for _ in range(num_sessions)]
+    engine = SessionEngine(max_concurrency=max_concurrency, session_timeout=session_timeout,
+                           num_interactions=num_interactions, headless=headless, context_hooks=context_hooks)
+    print(f"Running {num_sessions} sessions, at most {max_concurrency} at once.")
+    start = time.perf_counter()
+    results = asyncio.run(engine.run(session_urls, seed=seed))
+    elapsed = time.perf_counter() - start
+
+    for result in results:
+        print(f"Session {result['index']} {result['status']}: {result['url']} "
+              f"({len(result['actions'])} actions, {result['duration_sec']:.1f}s)"
+              + (f" - {result['error']}" if result["error"] else ""))
+    print(summarize(results, elapsed))
+    if cache:
+        print(cache.summary())
+    if blocker:
+        print(blocker.summary())
+    if results_path:
+        with open(results_path, "w") as f:
+            for result in results:
+                f.write(json.dumps(result) + "\n")
+        print(f"Results saved to: {results_path}")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run many automation sessions concurrently with Playwright's async API.")
+    parser.add_argument("sources", nargs="+", help="URLs, local HTML files, or seed website JSON files")
+    parser.add_argument("--sessions", type=int, default=MAX_CONCURRENT_SESSIONS, help="Number of sessions to run")
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENT_SESSIONS, help="Maximum sessions running at once")
+    parser.add_argument("--timeout", type=float, default=SESSION_TIMEOUT_SEC, help="Per-session timeout in seconds")
+    parser.add_argument("--interactions", type=int, default=NUM_INTERACTIONS, help="Actions per session")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for URL choice and action plans")
+    parser.add_argument("--headed", action="store_true", help="Show the browser windows")
+    parser.add_argument("--cache", help="Serve requests through a page cache in this directory")
+    parser.add_argument("--cache-mode", choices=CACHE_MODES, default="fallback",
+                        help="record: refresh the cache from the network; fallback: serve from the cache, fetch and store misses; "
+                             "offline: serve only from the cache")
+    parser.add_argument("--block", action="store_true",
+                        help=f"Block the default resource types ({', '.join(DEFAULT_BLOCKED_TYPES)}) and ad/tracker domains")
+    parser.add_argument("--block-types", nargs="*", help="Resource types to block (e.g. image media font), instead of the defaults")
+    parser.add_argument("--block-domains", help="File of domains to block (one per line), instead of the default ad/tracker list")
+    parser.add_argument("--results", help="Write per-session results to this JSON lines file")
+    args = parser.parse_args()
+
+    block_types = args.block_types if args.block_types is not None else DEFAULT_BLOCKED_TYPES if args.block else None
+    block_domains = load_domains(args.block_domains) if args.block_domains else DEFAULT_BLOCKED_DOMAINS if args.block else None
+    main(args.sources, args.sessions, max_concurrency=args.concurrency, session_timeout=args.timeout,
+         num_interactions=args.interactions, seed=args.seed, headless=not args.headed, results_path=args.results,
+         cache_dir=args.cache, cache_mode=args.cache_mode, block_types=block_types, block_domains=block_domains)
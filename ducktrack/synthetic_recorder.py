@@ -0,0 +1,448 @@
+import argparse
+import base64
+import json
+import os
+import platform
+import random
+import string
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+try:
+    from playwright.sync_api import Error as PlaywrightError
+    from playwright.sync_api import sync_playwright
+except ImportError:
+    PlaywrightError = None
+    sync_playwright = None
+
+from .catalog import RecordingCatalog
+from .event_index import EventIndexWriter
+from .page_candidates import ACTION_WEIGHTS, find_candidates, scroll_candidate_into_view
+from .util import get_recordings_dir
+from .visualize_recording import EVENTS_FILENAME, VIDEO_FILENAME
+
+# --- Configuration ---
+VIEWPORT_WIDTH = 1280
+VIEWPORT_HEIGHT = 720
+FRAME_RATE = 15                # Frames per second of the written video
+JPEG_QUALITY = 80              # Quality of the screencast frames sent by the browser
+NUM_INTERACTIONS = 20          # Actions per session
+NAVIGATION_TIMEOUT_MS = 20000
+FIRST_FRAME_TIMEOUT_SEC = 5.0  # Wait for the first screencast frame before giving up on the video
+FRAME_POLL_SEC = 0.05
+MOVE_STEP_SEC = 1 / 60         # Mouse move events are dispatched (and logged) at this interval
+MOVE_DURATION_MIN = 0.3
+MOVE_DURATION_MAX = 0.8
+CLICK_HOLD_MIN = 0.05
+CLICK_HOLD_MAX = 0.12
+KEY_INTERVAL_MIN = 0.05
+KEY_INTERVAL_MAX = 0.15
+SCROLL_TICK_INTERVAL = 0.05
+SCROLL_PIXELS_PER_TICK = 100   # Wheel delta of one scroll tick, as Chromium scrolls for a mouse wheel notch
+PAUSE_MIN = 0.2                # Pause after each action
+PAUSE_MAX = 0.6
+SCREEN_BACKGROUND = 48         # Gray level of the virtual screen around the viewport
+
+# Characters typed as named keys, with the names pynput (and so Recorder) gives them
+SPECIAL_KEYS = {' ': ('Space', 'space'), '\n': ('Enter', 'enter'), '\t': ('Tab', 'tab')}
+
+
+class ConstantRateVideo:
+    """
+    Writes frames that arrive at irregular times (a CDP screencast only sends a frame when the
+    page changes) as a constant-rate video of the virtual screen, repeating the latest frame for
+    every tick in between. The viewport is drawn at `offset` on a screen of `screen_size`.
+    """
+
+    def __init__(self, path, fps, screen_size, viewport_size, offset):
+        self.fps = fps
+        self.viewport_size = viewport_size
+        self.offset = offset
+        self._writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, screen_size)
+        self._canvas = np.full((screen_size[1], screen_size[0], 3), SCREEN_BACKGROUND, dtype=np.uint8)
+        self.start_time = None
+        self.frames_written = 0
+
+    def add(self, t, jpeg):
+        """Adds a frame shown from time `t` on."""
+        frame = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if frame is None:
+            return
+        if self.start_time is None:
+            self.start_time = t
+        else:
+            self._write_until(t)
+        width, height = self.viewport_size
+        if frame.shape[1] != width or frame.shape[0] != height:
+            frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+        x, y = self.offset
+        self._canvas[y:y + height, x:x + width] = frame
+
+    def _write_until(self, t):
+        while self.start_time + self.frames_written / self.fps < t:
+            self._writer.write(self._canvas)
+            self.frames_written += 1
+
+    def close(self, t):
+        """Writes the latest frame up to time `t` and finishes the file."""
+        if self.start_time is not None:
+            self._write_until(t)
+        self._writer.release()
+
+class SyntheticRecorder:
+    """
+    Records one headless session as a DuckTrack recording: events.jsonl in Recorder's schema,
+    its index, metadata.json and recording.mp4 from a CDP screencast.
+
+    Input is dispatched with Playwright's mouse and keyboard and logged as it is sent. Event
+    x/y are screen-equivalent coordinates (page coordinates plus the offset at which the viewport
+    sits on the virtual screen, which is what the video shows); page_x/page_y are the page
+    coordinates. Time stamps use time.perf_counter, as Recorder does, and the video start is
+    stored as the OBS start time so the existing tools align events and frames unchanged.
+    """
+
+    def __init__(self, page, recording_path, fps=FRAME_RATE, screen_offset=(0, 0)):
+        self.page = page
+        self.recording_path = recording_path
+        self.fps = fps
+        self.screen_offset = screen_offset
+        viewport = page.viewport_size
+        self.viewport_size = (viewport['width'], viewport['height'])
+        self.screen_size = (self.viewport_size[0] + screen_offset[0], self.viewport_size[1] + screen_offset[1])
+        self.mouse = (self.viewport_size[0] / 2, self.viewport_size[1] / 2)
+        self.events_written = 0
+        self.metadata = platform.uname()._asdict()
+        self.metadata["id"] = uuid.getnode()
+        self.metadata["screen_width"], self.metadata["screen_height"] = self.screen_size
+        self.metadata["model"] = f"Synthetic (headless {page.context.browser.browser_type.name})"
+        self.metadata["scroll_direction"] = 1
+        # Screencast frames carry wall-clock time stamps; events use perf_counter
+        self._clock_offset = time.perf_counter() - time.time()
+        self.events_file = None
+        self.event_index = None
+        self.video = None
+        self._cdp = None
+
+    def start(self):
+        os.makedirs(self.recording_path)
+        self.metadata["start_time"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            # Binary so that tell() gives the byte offsets the event index stores
+            self.events_file = open(os.path.join(self.recording_path, EVENTS_FILENAME), "ab")
+            self.event_index = EventIndexWriter(self.recording_path)
+            self.video = ConstantRateVideo(os.path.join(self.recording_path, VIDEO_FILENAME), self.fps,
+                                           self.screen_size, self.viewport_size, self.screen_offset)
+
+            self._cdp = self.page.context.new_cdp_session(self.page)
+            self._cdp.on("Page.screencastFrame", self._on_frame)
+            self._cdp.send("Page.startScreencast", {"format": "jpeg", "quality": JPEG_QUALITY,
+                                                    "maxWidth": self.viewport_size[0],
+                                                    "maxHeight": self.viewport_size[1]})
+        except Exception as e:
+            # Close whatever was opened and still leave a metadata.json saying what went wrong
+            self.metadata["error"] = describe_error(e)
+            self.stop()
+            raise
+        deadline = time.perf_counter() + FIRST_FRAME_TIMEOUT_SEC
+        while self.video.start_time is None and time.perf_counter() < deadline:
+            self.wait(FRAME_POLL_SEC)
+        if self.video.start_time is None:
+            print(f"Warning: No screencast frame received for {self.recording_path}.")
+
+    def stop(self):
+        """Finishes the recording; also closes a recording whose start() failed part way."""
+        stop_time = time.perf_counter()
+        if self._cdp is not None:
+            try:
+                self._cdp.send("Page.stopScreencast")
+                self._cdp.detach()
+            except PlaywrightError:
+                pass  # The page or browser is already gone
+        frames_written = 0
+        if self.video is not None:
+            self.video.close(stop_time)
+            frames_written = self.video.frames_written
+        video_start = self.video.start_time if self.video is not None else None
+        for handle in (self.events_file, self.event_index):
+            if handle is not None:
+                handle.close()
+
+        self.metadata["stop_time"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.metadata["obs_record_state_timings"] = {
+            "OBS_WEBSOCKET_OUTPUT_STARTED": [video_start if video_start is not None else stop_time],
+            "OBS_WEBSOCKET_OUTPUT_STOPPING": [stop_time],
+        }
+        self.metadata["synthetic"] = {"url": self.page.url, "viewport": list(self.viewport_size),
+                                      "screen_offset": list(self.screen_offset), "fps": self.fps,
+                                      "frames": frames_written}
+        with open(os.path.join(self.recording_path, "metadata.json"), "w") as f:
+            json.dump(self.metadata, f, indent=4)
+        try:
+            with RecordingCatalog(os.path.dirname(self.recording_path)) as catalog:
+                catalog.add_recording(self.recording_path)
+        except Exception as e:
+            # The catalog is only an index; a rescan will pick the recording up later
+            print(f"Warning: could not add recording to catalog: {e}")
+
+    def _on_frame(self, params):
+        self.video.add(params["metadata"]["timestamp"] + self._clock_offset, base64.b64decode(params["data"]))
+        self._cdp.send("Page.screencastFrameAck", {"sessionId": params["sessionId"]})
+
+    def _log(self, event):
+        event = {"time_stamp": time.perf_counter(), **event}
+        self.event_index.add(event["time_stamp"], self.events_file.tell)
+        self.events_file.write((json.dumps(event) + "\n").encode())
+        # Events come at most every MOVE_STEP_SEC, so both files can be kept on disk as they grow
+        self.events_file.flush()
+        self.event_index.flush()
+        self.events_written += 1
+
+    def _mouse_event(self, action, **fields):
+        x, y = self.mouse
+        self._log({"action": action, "x": x + self.screen_offset[0], "y": y + self.screen_offset[1],
+                   **fields, "page_x": x, "page_y": y})
+
+    def wait(self, seconds):
+        """Waits while still handling screencast frames (time.sleep would hold them back)."""
+        self.page.wait_for_timeout(seconds * 1000)
+
+    def move_to(self, x, y, duration):
+        x0, y0 = self.mouse
+        steps = max(1, int(duration / MOVE_STEP_SEC))
+        for i in range(1, steps + 1):
+            t = i / steps
+            t = t * t * (3 - 2 * t)  # Ease in and out
+            self.mouse = (x0 + (x - x0) * t, y0 + (y - y0) * t)
+            self.page.mouse.move(*self.mouse)
+            self._mouse_event("move")
+            self.wait(MOVE_STEP_SEC)
+
+    def click(self, hold):
+        self._mouse_event("click", button="left", pressed=True)
+        self.page.mouse.down()
+        self.wait(hold)
+        self._mouse_event("click", button="left", pressed=False)
+        self.page.mouse.up()
+
+    def scroll(self, ticks):
+        """Scrolls down (positive) or up (negative) by whole wheel ticks."""
+        direction = 1 if ticks > 0 else -1
+        for _ in range(abs(ticks)):
+            self.page.mouse.wheel(0, direction * SCROLL_PIXELS_PER_TICK)
+            # pynput reports a notch down as dy=-1 (without natural scrolling)
+            self._mouse_event("scroll", dx=0, dy=-direction)
+            self.wait(SCROLL_TICK_INTERVAL)
+
+    def press_key(self, key, name):
+        self._log({"action": "press", "name": name})
+        self.page.keyboard.down(key)
+        self._log({"action": "release", "name": name})
+        self.page.keyboard.up(key)
+
+    def type_text(self, text, rng):
+        for char in text:
+            if char in SPECIAL_KEYS:
+                self.press_key(*SPECIAL_KEYS[char])
+            elif char.isupper():
+                self._log({"action": "press", "name": "shift"})
+                self.page.keyboard.down("Shift")
+                self.press_key(char, char)
+                self._log({"action": "release", "name": "shift"})
+                self.page.keyboard.up("Shift")
+            else:
+                self.press_key(char, char)
+            self.wait(rng.uniform(KEY_INTERVAL_MIN, KEY_INTERVAL_MAX))
+
+def random_text(rng):
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 8))) for _ in range(rng.randint(1, 4))]
+    if rng.random() < 0.3:
+        words[0] = words[0].capitalize()
+    return " ".join(words)
+
+def candidate_point(candidate, rng):
+    """A random point near the middle of a candidate's bounding box."""
+    bbox = candidate["bbox"]
+    return (bbox["x"] + bbox["width"] * rng.uniform(0.3, 0.7),
+            bbox["y"] + bbox["height"] * rng.uniform(0.3, 0.7))
+
+def run_interactions(recorder, num_interactions, rng):
+    """Performs random scroll/move/click/type actions, weighted as in automate_recording."""
+    page = recorder.page
+    width, height = recorder.viewport_size
+    for _ in range(num_interactions):
+        try:
+            interactive, typing, _ = find_candidates(page)
+            actions = ["scroll", "move"] + (["click"] if interactive else []) + (["type"] if typing else [])
+            action = rng.choices(actions, weights=[ACTION_WEIGHTS[a] for a in actions], k=1)[0]
+
+            if action == "scroll":
+                recorder.scroll(rng.choice([-1, 1]) * rng.randint(1, 5))
+            elif action == "move":
+                recorder.move_to(rng.uniform(0, width - 1), rng.uniform(0, height - 1),
+                                 rng.uniform(MOVE_DURATION_MIN, MOVE_DURATION_MAX))
+            else:
+                target = scroll_candidate_into_view(page, rng.choice(interactive if action == "click" else typing))
+                if not target or target["occluded"] is not False:
+                    continue
+                recorder.move_to(*candidate_point(target, rng), rng.uniform(MOVE_DURATION_MIN, MOVE_DURATION_MAX))
+                recorder.click(rng.uniform(CLICK_HOLD_MIN, CLICK_HOLD_MAX))
+                if action == "type":
+                    recorder.type_text(random_text(rng), rng)
+            recorder.wait(rng.uniform(PAUSE_MIN, PAUSE_MAX))
+        except PlaywrightError as e:
+            # Usually a click that navigated while the page was being inspected
+            print(f"Warning: {e.message.splitlines()[0] if e.message else e}")
+            try:
+                page.wait_for_load_state("load", timeout=NAVIGATION_TIMEOUT_MS)
+            except PlaywrightError:
+                break
+
+def describe_error(e):
+    """First line of an exception's message, prefixed with its type unless it is a Playwright error."""
+    lines = str(e).splitlines()
+    message = lines[0] if lines else ""
+    if PlaywrightError is not None and isinstance(e, PlaywrightError):
+        return message or type(e).__name__
+    return f"{type(e).__name__}: {message}" if message else type(e).__name__
+
+def record_session(browser, url, recording_path, seed, num_interactions=NUM_INTERACTIONS, fps=FRAME_RATE,
+                   viewport=(VIEWPORT_WIDTH, VIEWPORT_HEIGHT), screen_offset=(0, 0)):
+    """
+    Records one synthetic session of `url` into `recording_path` and returns a summary dict.
+    Any error ends only this session; it is returned under "error", with "recording" set if
+    a (partial) recording was written.
+    """
+    rng = random.Random(seed)
+    context = None
+    recorder = None
+    try:
+        context = browser.new_context(viewport={"width": viewport[0], "height": viewport[1]}, device_scale_factor=1)
+        page = context.new_page()
+        # Links opening new tabs would take the session off screen; keep everything in one page
+        context.on("page", lambda popup: popup.close())
+        page.goto(url, wait_until="load", timeout=NAVIGATION_TIMEOUT_MS)
+
+        recorder = SyntheticRecorder(page, recording_path, fps=fps, screen_offset=screen_offset)
+        started = time.perf_counter()
+        recorder.start()  # Closes its files itself if it fails
+        try:
+            run_interactions(recorder, num_interactions, rng)
+        except Exception as e:
+            # Kept in the metadata so the partial recording can be told apart later
+            recorder.metadata["error"] = describe_error(e)
+            raise
+        finally:
+            recorder.stop()
+        return {"recording": recording_path, "url": url, "events": recorder.events_written,
+                "frames": recorder.video.frames_written, "duration": time.perf_counter() - started}
+    except Exception as e:
+        # A recorder that got as far as opening its events file left a (partial) recording behind
+        written = recorder is not None and recorder.events_file is not None
+        return {"recording": recording_path if written else None, "url": url, "error": describe_error(e)}
+    finally:
+        if context is not None:
+            try:
+                context.close()
+            except PlaywrightError:
+                pass  # The browser is already gone
+
+def record_sessions(sessions, options):
+    """Records (recording_path, url, seed) sessions one after another in one headless browser. Runs in a worker process."""
+    cv2.setNumThreads(1)
+    results = []
+    with sync_playwright() as p:
+        browser = None
+        try:
+            for recording_path, url, seed in sessions:
+                try:
+                    if browser is None or not browser.is_connected():
+                        # First session, or the browser crashed during the previous one
+                        browser = p.chromium.launch(headless=True)
+                    results.append(record_session(browser, url, recording_path, seed, **options))
+                except Exception as e:
+                    results.append({"recording": None, "url": url, "error": describe_error(e)})
+        finally:
+            if browser is not None and browser.is_connected():
+                browser.close()
+    return results
+
+def load_urls(sources):
+    """
+    Collects session URLs from URLs, local HTML files (as file:// URLs, for offline runs) and
+    seed website JSON files in the {category: {name: url}} format of seed_websites.json.
+    """
+    urls = []
+    for source in sources:
+        if source.endswith(".json") and os.path.isfile(source):
+            with open(source, "r", encoding="utf-8") as f:
+                urls.extend(url for category in json.load(f).values() if isinstance(category, dict)
+                            for url in category.values())
+        elif os.path.exists(source):
+            urls.append(Path(source).resolve().as_uri())
+        else:
+            urls.append(source)
+    return urls
+
+def main(sources, output_dir, num_sessions, num_workers=None, seed=0, num_interactions=NUM_INTERACTIONS,
+         fps=FRAME_RATE, viewport=(VIEWPORT_WIDTH, VIEWPORT_HEIGHT), screen_offset=(0, 0)):
+    if sync_playwright is None:
+        print("Error: playwright is required for synthetic recordings (pip install playwright && playwright install chromium).")
+        return
+    urls = load_urls(sources)
+    if not urls:
+        print("Error: No URLs to record.")
+        return
+
+    os.makedirs(output_dir, exist_ok=True)
+    rng = random.Random(seed)
+    run_time = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    sessions = [(os.path.join(output_dir, f"recording-{run_time}-{i:05d}"), rng.choice(urls), seed + i)
+                for i in range(num_sessions)]
+    num_workers = max(1, min(num_workers or os.cpu_count() or 1, num_sessions))
+    options = {"num_interactions": num_interactions, "fps": fps, "viewport": viewport, "screen_offset": screen_offset}
+    print(f"Recording {num_sessions} synthetic sessions of {len(set(s[1] for s in sessions))} URLs "
+          f"with {num_workers} headless browsers.")
+
+    start = time.perf_counter()
+    recorded, failed, recorded_sec = 0, 0, 0.0
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        futures = [executor.submit(record_sessions, sessions[w::num_workers], options) for w in range(num_workers)]
+        for future in as_completed(futures):
+            for result in future.result():
+                if result.get("error"):
+                    failed += 1
+                    partial = f" (partial recording {os.path.basename(result['recording'])})" if result.get("recording") else ""
+                    print(f"Failed {result['url']}{partial}: {result['error']}")
+                    continue
+                recorded += 1
+                recorded_sec += result["duration"]
+                print(f"Recorded {os.path.basename(result['recording'])} ({result['url']}): "
+                      f"{result['events']} events, {result['frames']} frames, {result['duration']:.1f}s")
+
+    elapsed = time.perf_counter() - start
+    print(f"Recorded {recorded} sessions ({failed} failed) in {elapsed:.1f}s: {recorded_sec:.0f}s of recordings, "
+          f"{recorded_sec / max(elapsed, 1e-6):.1f}x real time.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record synthetic DuckTrack sessions in headless browsers, without OBS or real input.")
+    parser.add_argument("sources", nargs="+", help="URLs, local HTML files, or seed website JSON files")
+    parser.add_argument("--output-dir", default=get_recordings_dir(), help="Directory the recordings are written to")
+    parser.add_argument("--sessions", type=int, default=1, help="Number of sessions to record")
+    parser.add_argument("--workers", type=int, default=None, help="Number of browser processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for URL choice and actions")
+    parser.add_argument("--interactions", type=int, default=NUM_INTERACTIONS, help="Actions per session")
+    parser.add_argument("--fps", type=int, default=FRAME_RATE, help="Frame rate of the recorded video")
+    parser.add_argument("--viewport", type=int, nargs=2, default=[VIEWPORT_WIDTH, VIEWPORT_HEIGHT], metavar=("WIDTH", "HEIGHT"))
+    parser.add_argument("--screen-offset", type=int, nargs=2, default=[0, 0], metavar=("X", "Y"),
+                        help="Where the viewport sits on the virtual screen (e.g. below a browser toolbar)")
+    args = parser.parse_args()
+
+    main(args.sources, args.output_dir, args.sessions, num_workers=args.workers, seed=args.seed,
+         num_interactions=args.interactions, fps=args.fps, viewport=tuple(args.viewport),
+         screen_offset=tuple(args.screen_offset))
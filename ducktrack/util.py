@@ -1,19 +1,27 @@
+from __future__ import annotations
+
 import os
 import platform
 import subprocess
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from pynput.keyboard import Key, KeyCode
-from pynput.mouse import Button
+# pynput needs a display to import, so it is only imported where keys and buttons are used;
+# headless tools (catalog, synthetic recordings, batch processing) only need get_recordings_dir
+if TYPE_CHECKING:
+    from pynput.keyboard import Key, KeyCode
+    from pynput.mouse import Button
 
 
 def name_to_key(name: str) -> Key | KeyCode:
+    from pynput.keyboard import Key, KeyCode
     try:
         return getattr(Key, name)
     except AttributeError:
         return KeyCode.from_char(name)
 
 def name_to_button(name: str) -> Button:
+    from pynput.mouse import Button
     return getattr(Button, name)
 
 def get_recordings_dir() -> str:
@@ -2,7 +2,18 @@ import cv2
 import json
 import argparse
 import os
+import struct
+import threading
 from collections import deque
+from queue import Queue
+
+import numpy as np
+
+if __package__:
+    from .event_index import read_events, read_first_event
+else:
+    # Run directly as a script (python ducktrack/visualize_recording.py), with ducktrack/ on sys.path
+    from event_index import read_events, read_first_event
 
 # --- Configuration ---
 TEXT_COLOR = (255, 255, 255)  # White text
@@ -12,11 +23,20 @@ FONT_THICKNESS = 1
 TEXT_POSITION = (30, 30)  # Starting position for text
 LINE_HEIGHT = 25  # Space between lines of text
 TEXT_DURATION_FRAMES = 1  # How many frames the text persists
+TEXT_BOX_COLOR = (0, 0, 0)  # Background of the text box
+TEXT_BOX_ALPHA = 0.7  # Opacity of the text box background
 VIDEO_FILENAME = "recording.mp4"
 EVENTS_FILENAME = "events.jsonl"
 OUTPUT_FILENAME = "visualization.mp4"
+FRAME_ACTION_MAP_FILENAME = "frame_action_map.ndjson"
+FRAME_ACTION_INDEX_FILENAME = "frame_action_map.idx"
 FRAMES_DEBUG_DIR = "frames_debug"
+DEBUG_FRAME_FORMATS = ("jpg", "png")
+DEBUG_FRAME_WORKERS = 4  # Background threads encoding debug frames
+DEBUG_FRAME_QUEUE_SIZE = 32  # Max frames waiting to be written before the visualizer blocks
 OUTPUT_FPS = 30.0
+SEEK_MIN_GAP_SEC = 2.0  # Seek instead of grabbing when the next needed frame is this far ahead
+WINDOW_LEAD_SEC = 1.0  # Events loaded before the start of a time window
 
 # --- Mouse visualization settings ---
 CLICK_COLOR = (0, 0, 255)    # Red for clicks
@@ -27,26 +47,29 @@ CLICK_HIGHLIGHT_FRAMES = 5   # How many frames to highlight a click
 
 def load_events(jsonl_path):
     """Loads events from the JSONL file and normalizes timestamps."""
-    events = []
+    events, t_start_sec, _ = load_events_window(jsonl_path)
+    return events, t_start_sec
+
+def load_events_window(jsonl_path, start_sec=None, end_sec=None):
+    """
+    Like `load_events`, but only parses the events between `start_sec` and `end_sec`
+    (relative to the baseline, either optional), seeking through the events index when the
+    recording has one. Also returns the index of the first loaded event in the full file.
+    A window without events returns an empty list rather than None.
+    """
     recording_dir = os.path.dirname(jsonl_path)
     metadata_path = os.path.join(recording_dir, "metadata.json")
 
-    try:
-        with open(jsonl_path, 'r') as f:
-            for line in f:
-                try:
-                    events.append(json.loads(line.strip()))
-                except json.JSONDecodeError:
-                    print(f"Warning: Skipping invalid JSON line: {line.strip()}")
-    except FileNotFoundError:
+    if not os.path.isfile(jsonl_path):
         print(f"Error: Events file not found at {jsonl_path}")
-        return None, None
+        return None, None, 0
 
-    if not events:
+    first_event = read_first_event(recording_dir)
+    if first_event is None:
         print("Error: No events found in the file.")
-        return None, None
+        return None, None, 0
 
-    first_event_time = events[0]['time_stamp']
+    first_event_time = first_event['time_stamp']
     baseline_timestamp_sec = None
 
     try:
@@ -65,6 +88,18 @@ def load_events(jsonl_path):
         print(f"Falling back to first event timestamp ({first_event_time:.3f}s) as baseline.")
         baseline_timestamp_sec = first_event_time
 
+    events, first_index = read_events(
+        recording_dir,
+        start_time=baseline_timestamp_sec + start_sec if start_sec is not None else None,
+        end_time=baseline_timestamp_sec + end_sec if end_sec is not None else None)
+    if not events:
+        if start_sec is None and end_sec is None:
+            print("Error: No events found in the file.")
+            return None, None, first_index
+        # A quiet stretch of the recording is still a valid window
+        print("Warning: No events found in the requested time window.")
+        return [], 0, first_index
+
     for event in events:
         event['relative_time_sec'] = event['time_stamp'] - baseline_timestamp_sec
         
@@ -79,9 +114,343 @@ def load_events(jsonl_path):
             print(f"Action recording starts around {t_start_sec:.2f} seconds.")
             break
              
-    return events, t_start_sec
-
-def create_visualization(event, expiry_frame):
+    return events, t_start_sec, first_index
+
+# Compact integer codes for the NumPy event table (0 = no action)
+ACTION_CODES = {
+    'move': 1,
+    'click': 2,
+    'scroll': 3,
+    'press': 4,
+    'release': 5,
+    'pause': 6,
+    'resume': 7,
+}
+
+def build_event_table(events):
+    """Packs events into NumPy arrays (relative time, action code, x, y) for vectorized lookups."""
+    n = len(events)
+    table = {
+        'time': np.empty(n, dtype=np.float64),
+        'action': np.zeros(n, dtype=np.int8),
+        'x': np.full(n, np.nan, dtype=np.float64),
+        'y': np.full(n, np.nan, dtype=np.float64),
+    }
+    for i, event in enumerate(events):
+        table['time'][i] = event['relative_time_sec']
+        table['action'][i] = ACTION_CODES.get(event.get('action'), 0)
+        if 'x' in event and 'y' in event:
+            table['x'][i] = event['x']
+            table['y'][i] = event['y']
+    return table
+
+class FrameEventIndex:
+    """
+    Maps every event to the video frame it falls in, so each frame gets its events as an O(1) slice.
+
+    An event belongs to frame `f` when `f / fps <= t < (f + 1) / fps`; events before the
+    start of the video are assigned to frame 0. Events must be sorted by `relative_time_sec`
+    (as returned by `load_events`).
+    """
+
+    def __init__(self, events, fps, num_frames=None):
+        self.events = events
+        self.fps = fps
+        self.table = build_event_table(events)
+
+        times = self.table['time']
+        last_event_frame = int(times[-1] * fps) + 2 if len(times) else 0
+        self.num_frames = max(num_frames or 0, last_event_frame, 1)
+
+        self.frame_end_times = np.arange(1, self.num_frames + 1, dtype=np.float64) / fps
+        self.event_frames = np.searchsorted(self.frame_end_times, times, side='right')
+        counts = np.bincount(self.event_frames, minlength=self.num_frames)
+        self.frame_offsets = np.concatenate(([0], np.cumsum(counts)))
+
+    def frame_slice(self, frame_num):
+        """Returns the slice of `events` that falls within `frame_num`."""
+        if frame_num < 0 or frame_num >= self.num_frames:
+            return slice(0, 0)
+        return slice(int(self.frame_offsets[frame_num]), int(self.frame_offsets[frame_num + 1]))
+
+    def events_for_frame(self, frame_num):
+        return self.events[self.frame_slice(frame_num)]
+
+    def frame_of_event(self, event_idx):
+        return int(self.event_frames[event_idx])
+
+    def frame_for_time(self, time_sec):
+        """Returns the frame (or array of frames) covering the given relative time(s)."""
+        return np.searchsorted(self.frame_end_times, time_sec, side='right')
+
+    def next_event_frame(self, frame_num):
+        """Returns the first frame at or after `frame_num` that has events, or None if there is none."""
+        first_event = int(self.frame_offsets[min(max(frame_num, 0), self.num_frames)])
+        if first_event >= len(self.events):
+            return None
+        return int(self.event_frames[first_event])
+
+    def frame_range_slice(self, start_frame, end_frame):
+        """Returns the slice of events within frames [start_frame, end_frame)."""
+        start_frame = min(max(start_frame, 0), self.num_frames)
+        end_frame = min(max(end_frame, start_frame), self.num_frames)
+        return slice(int(self.frame_offsets[start_frame]), int(self.frame_offsets[end_frame]))
+
+def build_frame_index(events, fps, num_frames=None):
+    """Builds a reusable frame-aligned event index for a sorted event list."""
+    return FrameEventIndex(events, fps, num_frames)
+
+class OverlayCompositor:
+    """
+    Blends the translucent text box onto frames in place.
+
+    Only the rectangle covered by the box is blended, against a fill buffer that is
+    allocated once per frame size and reused for every frame.
+    """
+
+    def __init__(self, frame_width, frame_height, color=TEXT_BOX_COLOR, alpha=TEXT_BOX_ALPHA):
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self.alpha = alpha
+        self._fill = np.empty((frame_height, frame_width, 3), dtype=np.uint8)
+        self._fill[:] = color
+
+    def blend_box(self, frame, top_left, bottom_right):
+        """Darkens the (inclusive) rectangle between the two corners, clipped to the frame."""
+        x0, y0 = max(top_left[0], 0), max(top_left[1], 0)
+        x1 = min(bottom_right[0] + 1, self.frame_width)
+        y1 = min(bottom_right[1] + 1, self.frame_height)
+        if x1 <= x0 or y1 <= y0:
+            return frame
+
+        roi = frame[y0:y1, x0:x1]
+        cv2.addWeighted(roi, 1 - self.alpha, self._fill[y0:y1, x0:x1], self.alpha, 0, dst=roi)
+        return frame
+
+class FramePump:
+    """
+    Reads only the frames that are actually needed from a `cv2.VideoCapture`.
+
+    Frames in between are skipped with `grab()` (no retrieve/colour conversion), and gaps
+    larger than `seek_threshold` frames are skipped with a seek instead. Frames must be
+    requested in increasing order for grabbing to apply; going backwards always seeks.
+    """
+
+    def __init__(self, cap, seek_threshold=None):
+        self.cap = cap
+        self.seek_threshold = seek_threshold
+        self.position = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+        self.frames_retrieved = 0
+        self.frames_grabbed = 0
+        self.seeks = 0
+
+    def read(self, frame_num):
+        """Returns the decoded frame `frame_num`, or None if the video ends before it."""
+        gap = frame_num - self.position
+        if gap < 0 or (self.seek_threshold is not None and gap > self.seek_threshold):
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
+            self.position = frame_num
+            self.seeks += 1
+        else:
+            for _ in range(gap):
+                if not self.cap.grab():
+                    return None
+                self.position += 1
+                self.frames_grabbed += 1
+
+        ret, frame = self.cap.read()
+        if not ret:
+            return None
+        self.position += 1
+        self.frames_retrieved += 1
+        return frame
+
+    def summary(self):
+        return f"{self.frames_retrieved} frames decoded, {self.frames_grabbed} grabbed without decoding, {self.seeks} seeks"
+
+class DebugFrameWriter:
+    """
+    Writes debug frames from a pool of background threads.
+
+    Frames go through a bounded queue, so a slow disk throttles the visualizer instead of
+    growing memory. Frames handed to `submit` must not be modified afterwards.
+    """
+
+    def __init__(self, output_dir, image_format="jpg", quality=90, png_compression=3,
+                 every_n=1, events_only=False,
+                 num_workers=DEBUG_FRAME_WORKERS, queue_size=DEBUG_FRAME_QUEUE_SIZE):
+        if image_format not in DEBUG_FRAME_FORMATS:
+            raise ValueError(f"Unsupported debug frame format: {image_format}")
+
+        self.output_dir = output_dir
+        self.image_format = image_format
+        self.every_n = max(every_n, 1)
+        self.events_only = events_only
+        if image_format == "jpg":
+            self.encode_params = [cv2.IMWRITE_JPEG_QUALITY, quality]
+        else:
+            self.encode_params = [cv2.IMWRITE_PNG_COMPRESSION, png_compression]
+
+        self.frames_written = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._queue = Queue(maxsize=queue_size)
+        self._workers = [threading.Thread(target=self._work, daemon=True) for _ in range(max(num_workers, 1))]
+        for worker in self._workers:
+            worker.start()
+
+    def should_write(self, output_frame_num, has_events):
+        if self.events_only and not has_events:
+            return False
+        return output_frame_num % self.every_n == 0
+
+    def submit(self, output_frame_num, frame):
+        self._queue.put((output_frame_num, frame))
+
+    def close(self):
+        """Waits for all queued frames to be written and stops the workers."""
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            output_frame_num, frame = item
+            path = os.path.join(self.output_dir, f"frame_{output_frame_num:06d}.{self.image_format}")
+            try:
+                ok = cv2.imwrite(path, frame, self.encode_params)
+            except Exception as e:
+                print(f"Error saving debug frame {output_frame_num}: {e}")
+                ok = False
+            with self._lock:
+                if ok:
+                    self.frames_written += 1
+                else:
+                    self.errors += 1
+
+def window_suffix(start_sec=None, end_sec=None):
+    """Filename suffix for the outputs of a time-window run ("" for the full recording)."""
+    if start_sec is None and end_sec is None:
+        return ""
+    return f"_{start_sec or 0:g}-{end_sec:g}s" if end_sec is not None else f"_{start_sec:g}s-end"
+
+def suffixed(filename, suffix):
+    root, ext = os.path.splitext(filename)
+    return root + suffix + ext
+
+class FrameActionMapWriter:
+    """
+    Streams the frame-action map to disk while frames are processed.
+
+    Each line of the NDJSON file is `{"frame": N, "events": [...]}` where every entry
+    references `events` by index (an `[press, release]` index pair for merged
+    press/release events) instead of copying the event data. A binary sidecar stores one
+    `(frame, byte offset)` int64 pair per line so `FrameActionMap` can seek straight to a frame.
+    `index_offset` is added to every reference when only part of the events was loaded, and
+    `suffix` (see `window_suffix`) keeps the map of a time window apart from the full one.
+    """
+
+    def __init__(self, recording_dir, index_offset=0, suffix=""):
+        self.map_path = os.path.join(recording_dir, suffixed(FRAME_ACTION_MAP_FILENAME, suffix))
+        self.index_path = os.path.join(recording_dir, suffixed(FRAME_ACTION_INDEX_FILENAME, suffix))
+        self._map_file = open(self.map_path, 'wb')
+        self._index_file = open(self.index_path, 'wb')
+        self.frames_written = 0
+        self.index_offset = index_offset
+
+    def write(self, frame_num, event_refs):
+        if self.index_offset:
+            event_refs = [[i + self.index_offset for i in ref] if isinstance(ref, list) else ref + self.index_offset
+                          for ref in event_refs]
+        offset = self._map_file.tell()
+        self._map_file.write(json.dumps({'frame': frame_num, 'events': event_refs}).encode() + b"\n")
+        self._index_file.write(struct.pack('<qq', frame_num, offset))
+        self.frames_written += 1
+
+    def flush(self):
+        self._map_file.flush()
+        self._index_file.flush()
+
+    def close(self):
+        self._map_file.close()
+        self._index_file.close()
+
+class FrameActionMap:
+    """Random access by frame number to a frame-action map written by `FrameActionMapWriter`."""
+
+    def __init__(self, recording_dir, events=None, suffix=""):
+        self.map_path = os.path.join(recording_dir, suffixed(FRAME_ACTION_MAP_FILENAME, suffix))
+        index = np.fromfile(os.path.join(recording_dir, suffixed(FRAME_ACTION_INDEX_FILENAME, suffix)),
+                            dtype='<i8').reshape(-1, 2)
+        self.frames = index[:, 0]
+        self.offsets = index[:, 1]
+        self.recording_dir = recording_dir
+        self._events = events
+
+    @property
+    def events(self):
+        if self._events is None:
+            self._events, _ = load_events(os.path.join(self.recording_dir, EVENTS_FILENAME))
+        return self._events
+
+    def __len__(self):
+        return len(self.frames)
+
+    def event_refs(self, frame_num):
+        """Returns the event references stored for `frame_num`, or None if the frame has no actions."""
+        pos = np.searchsorted(self.frames, frame_num)
+        if pos >= len(self.frames) or self.frames[pos] != frame_num:
+            return None
+        with open(self.map_path, 'rb') as f:
+            f.seek(int(self.offsets[pos]))
+            return json.loads(f.readline())['events']
+
+    def actions(self, frame_num):
+        """Returns the full event dicts for `frame_num`, rebuilding merged press/release events."""
+        refs = self.event_refs(frame_num)
+        if refs is None:
+            return []
+        events = self.events
+        return [merge_press_release(events[ref[0]], events[ref[1]]) if isinstance(ref, list) else events[ref]
+                for ref in refs]
+
+def format_event_text(event_data):
+    """Creates the overlay text line for an event."""
+    action_type = event_data.get('action', 'unknown')
+    if action_type == 'click':
+        return f"Click: {event_data.get('name')} at ({event_data.get('x')}, {event_data.get('y')})"
+    elif action_type == 'click_complete':
+        return f"Click COMPLETE: {event_data.get('name')} at ({event_data.get('x')}, {event_data.get('y')}) [Duration: {event_data.get('duration'):.3f}s]"
+    elif action_type == 'scroll':
+        return f"Scroll: dx={event_data.get('dx')}, dy={event_data.get('dy')} at ({event_data.get('x')}, {event_data.get('y')})"
+    elif action_type == 'move':
+        return f"Move: ({event_data.get('x')}, {event_data.get('y')})"
+    elif action_type == 'press':
+        return f"Key: {event_data.get('name')} pressed={event_data.get('pressed')}"
+    elif action_type == 'press_complete':
+        return f"Key COMPLETE: {event_data.get('name')} [Duration: {event_data.get('duration'):.3f}s]"
+
+    # Just convert the whole event to a string if we don't have special handling
+    text = str(event_data)
+    # Truncate if too long
+    if len(text) > 80:
+        text = text[:77] + "..."
+    return text
+
+def merge_press_release(press_event, release_event):
+    """Combines a press and its release into a single `<action>_complete` event."""
+    merged_event = press_event.copy()
+    merged_event['action'] = press_event.get('action') + "_complete"
+    merged_event['press_time'] = press_event.get('relative_time_sec')
+    merged_event['release_time'] = release_event.get('relative_time_sec')
+    merged_event['duration'] = release_event.get('relative_time_sec') - press_event.get('relative_time_sec')
+    return merged_event
+
+def create_visualization(event, expiry_frame, event_ref=None):
     """Creates a visualization entry for any event type."""
     # Capture any event with an action
     if not event.get('action'):
@@ -95,7 +464,8 @@ def create_visualization(event, expiry_frame):
     visualization = {
         'expiry': expiry_frame,
         'event_data': event,
-        'timestamp': event.get('relative_time_sec', 0)
+        'timestamp': event.get('relative_time_sec', 0),
+        'event_ref': event_ref
     }
 
     return visualization
@@ -118,13 +488,17 @@ def ensure_dir_exists(directory):
             return False
     return True
 
-def main(recording_dir):
+def main(recording_dir, debug_frames=False, debug_format="jpg", debug_quality=90,
+         debug_png_compression=3, debug_every_n=1, debug_events_only=False, events_only=False,
+         start_sec=None, end_sec=None, scale=1.0):
     events_path = os.path.join(recording_dir, EVENTS_FILENAME)
     video_path = os.path.join(recording_dir, VIDEO_FILENAME)
-    output_path = os.path.join(recording_dir, OUTPUT_FILENAME)
-    debug_frames_dir = os.path.join(recording_dir, FRAMES_DEBUG_DIR)
+    # A time window gets its own outputs, so it never replaces those of the full recording
+    suffix = window_suffix(start_sec, end_sec)
+    output_path = os.path.join(recording_dir, suffixed(OUTPUT_FILENAME, suffix))
+    debug_frames_dir = os.path.join(recording_dir, FRAMES_DEBUG_DIR + suffix) if debug_frames else None
 
-    if not ensure_dir_exists(debug_frames_dir):
+    if debug_frames_dir and not ensure_dir_exists(debug_frames_dir):
         debug_frames_dir = None
         print("Frame debug saving disabled due to directory creation failure.")
 
@@ -135,8 +509,12 @@ def main(recording_dir):
         print(f"Error: Video file not found: {video_path}")
         return
 
-    events, recording_start_sec = load_events(events_path)
-    if not events:
+    # A time window only needs its own events (plus a little lead-in for the first written frame)
+    events, recording_start_sec, first_event_index = load_events_window(
+        events_path,
+        start_sec=start_sec - WINDOW_LEAD_SEC if start_sec is not None and start_sec > WINDOW_LEAD_SEC else None,
+        end_sec=end_sec)
+    if events is None:
         return
 
     cap = cv2.VideoCapture(video_path)
@@ -160,109 +538,135 @@ def main(recording_dir):
     print(f"Input FPS: {fps:.2f}, Output FPS: {OUTPUT_FPS:.2f}, Writing every {frame_chunk_size}th frame.")
     print(f"Video properties: {frame_width}x{frame_height} @ {fps:.2f} FPS, Total Frames: {total_frames}")
 
+    # Frames are downsampled before drawing, so everything below works at the output size
+    if scale != 1.0:
+        frame_width = max(int(round(frame_width * scale)), 1)
+        frame_height = max(int(round(frame_height * scale)), 1)
+        print(f"Scaling frames by {scale} to {frame_width}x{frame_height}.")
+
     fourcc = cv2.VideoWriter_fourcc(*'mp4v')
     out = cv2.VideoWriter(output_path, fourcc, OUTPUT_FPS, (frame_width, frame_height))
 
+    frame_index = build_frame_index(events, fps, total_frames)
+    compositor = OverlayCompositor(frame_width, frame_height)
+    pump = FramePump(cap, seek_threshold=max(int(SEEK_MIN_GAP_SEC * fps), frame_chunk_size))
+    debug_writer = None
+    if debug_frames_dir:
+        debug_writer = DebugFrameWriter(debug_frames_dir, image_format=debug_format, quality=debug_quality,
+                                        png_compression=debug_png_compression, every_n=debug_every_n,
+                                        events_only=debug_events_only)
+
+    # Only render the requested time window, starting on a written frame. The lead-in frames
+    # before it are processed but not written, so overlays still active at the start are drawn.
+    start_frame = int(frame_index.frame_for_time(start_sec)) if start_sec is not None else 0
+    start_frame -= start_frame % frame_chunk_size
+    lead_frame = int(frame_index.frame_for_time(max(start_sec - WINDOW_LEAD_SEC, 0))) if start_sec is not None else 0
+    end_frame = int(frame_index.frame_for_time(end_sec)) if end_sec is not None else None
+    last_frame = total_frames if total_frames > 0 else frame_index.num_frames
+    if start_sec is not None or end_sec is not None:
+        end_desc = f"{end_sec:.2f}s" if end_sec is not None else "end"
+        print(f"Rendering window {start_frame / fps:.2f}s - {end_desc} (starting at frame {start_frame}).")
+
     active_visualizations = deque()
-    event_idx = 0
-    frame_count = 0
+    frame_count = lead_frame
     output_frame_count = 0
-    frame_action_map = {}
+    frame_action_map = FrameActionMapWriter(recording_dir, index_offset=first_event_index, suffix=suffix)
     actions_in_chunk = []
     
     # Track press events to match with release events
-    pending_press_events = {}  # key: event_id, value: (frame_num, event_data)
-    completed_press_release_pairs = {}  # key: frame_num, value: list of (press_event, release_event) pairs
+    pending_press_events = {}  # key: event_id, value: (frame_num, event_idx)
+    completed_press_release_pairs = {}  # key: frame_num, value: list of (press_idx, release_idx) pairs
 
     # First pass: collect all press and release events to match them
-    for i, event in enumerate(events):
-        action = event.get('action')
-        if action == 'press' or action == 'click':
-            event_id = get_event_identifier(event)
-            if event_id and event.get('pressed') is True:
-                # This is a press event, store it
-                frame_time = event['relative_time_sec']
-                frame_num = int(frame_time * fps)
-                pending_press_events[event_id] = (frame_num, event)
-            elif event_id and event.get('pressed') is False:
-                # This is a release event, find matching press
-                frame_time = event['relative_time_sec']
-                release_frame_num = int(frame_time * fps)
+    press_or_click = np.isin(frame_index.table['action'], [ACTION_CODES['press'], ACTION_CODES['click']])
+    for i in np.flatnonzero(press_or_click):
+        i = int(i)
+        event = events[i]
+        event_id = get_event_identifier(event)
+        if event_id and event.get('pressed') is True:
+            # This is a press event, store it
+            pending_press_events[event_id] = (frame_index.frame_of_event(i), i)
+        elif event_id and event.get('pressed') is False:
+            # This is a release event, find matching press
+            release_frame_num = frame_index.frame_of_event(i)
+            
+            if event_id in pending_press_events:
+                press_frame_num, press_idx = pending_press_events[event_id]
                 
-                if event_id in pending_press_events:
-                    press_frame_num, press_event = pending_press_events[event_id]
+                # If press and release are on different frames, add to completed pairs
+                if press_frame_num != release_frame_num:
+                    if release_frame_num not in completed_press_release_pairs:
+                        completed_press_release_pairs[release_frame_num] = []
+                    completed_press_release_pairs[release_frame_num].append((press_idx, i))
                     
-                    # If press and release are on different frames, add to completed pairs
-                    if press_frame_num != release_frame_num:
-                        if release_frame_num not in completed_press_release_pairs:
-                            completed_press_release_pairs[release_frame_num] = []
-                        completed_press_release_pairs[release_frame_num].append((press_event, event))
-                        
-                        # Remove from pending
-                        del pending_press_events[event_id]
-
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
+                    # Remove from pending
+                    del pending_press_events[event_id]
+
+    while True:
+        if end_frame is not None and frame_count >= end_frame:
             break
+        if events_only and not actions_in_chunk:
+            # Nothing is written until the next event, so jump straight to it; the pump then
+            # seeks rather than grabs when it is far ahead
+            next_frame = frame_index.next_event_frame(frame_count)
+            # Nothing can be written past the last event or the end of the video
+            if next_frame is None or next_frame >= last_frame:
+                break
+            frame_count = next_frame
+            if end_frame is not None and frame_count >= end_frame:
+                break
 
         current_frame_time_sec = frame_count / fps
-        frame_end_time_sec = (frame_count + 1) / fps
 
         # Remove expired visualizations
         while active_visualizations and active_visualizations[0]['expiry'] <= frame_count:
             active_visualizations.popleft()
 
         # Add new visualizations for this frame
-        while event_idx < len(events):
+        expiry_frame = frame_count + TEXT_DURATION_FRAMES
+        frame_events = frame_index.frame_slice(frame_count)
+        for event_idx in range(frame_events.start, frame_events.stop):
             event = events[event_idx]
-            event_time_sec = event['relative_time_sec']
-
-            if event_time_sec >= frame_end_time_sec:
-                break
-
-            expiry_frame = frame_count + TEXT_DURATION_FRAMES
-            
             # Check if this is a release event that should be merged with a press
             if event.get('action') in ['press', 'click'] and event.get('pressed') is False:
                 event_id = get_event_identifier(event)
                 if event_id and event_id in pending_press_events:
                     # Skip this release event as it will be handled in the merge logic below
-                    event_idx += 1
                     continue
             
-            viz = create_visualization(event, expiry_frame)
+            viz = create_visualization(event, expiry_frame, event_idx)
             if viz:
                 active_visualizations.append(viz)
                 actions_in_chunk.append(viz)
-                
-            event_idx += 1
 
         # Check if we need to merge press/release events for this frame
         if frame_count in completed_press_release_pairs:
-            for press_event, release_event in completed_press_release_pairs[frame_count]:
+            for press_idx, release_idx in completed_press_release_pairs[frame_count]:
                 # Create a merged event
-                merged_event = press_event.copy()
-                merged_event['action'] = press_event.get('action') + "_complete"
-                merged_event['press_time'] = press_event.get('relative_time_sec')
-                merged_event['release_time'] = release_event.get('relative_time_sec')
-                merged_event['duration'] = release_event.get('relative_time_sec') - press_event.get('relative_time_sec')
+                merged_event = merge_press_release(events[press_idx], events[release_idx])
                 
                 # Add to this frame's visualizations
-                viz = create_visualization(merged_event, frame_count + TEXT_DURATION_FRAMES)
+                viz = create_visualization(merged_event, frame_count + TEXT_DURATION_FRAMES, [press_idx, release_idx])
                 if viz:
                     active_visualizations.append(viz)
                     actions_in_chunk.append(viz)
 
+        # Lead-in frames only keep the bookkeeping above up to date
+        if frame_count < start_frame and frame_count % frame_chunk_size == 0:
+            actions_in_chunk = []
+
         # Draw visualizations and write frame conditionally
-        if frame_count % frame_chunk_size == 0:
+        elif frame_count % frame_chunk_size == 0 and (actions_in_chunk or not events_only):
+            # Only frames that are written get decoded
+            frame = pump.read(frame_count)
+            if frame is None:
+                break
+            if scale != 1.0:
+                frame = cv2.resize(frame, (frame_width, frame_height), interpolation=cv2.INTER_AREA)
+
             # Draw text for all actions in this chunk
             # Create a semi-transparent background for text
-            text_overlay = frame.copy()
-            cv2.rectangle(text_overlay, (10, 10), (frame_width - 10, 10 + (len(actions_in_chunk) + 1) * LINE_HEIGHT), 
-                         (0, 0, 0), -1)
-            alpha = 0.7
-            frame = cv2.addWeighted(text_overlay, alpha, frame, 1 - alpha, 0)
+            compositor.blend_box(frame, (10, 10), (frame_width - 10, 10 + (len(actions_in_chunk) + 1) * LINE_HEIGHT))
             
             # Add frame number and timestamp
             cv2.putText(frame, f"Frame: {frame_count} | Time: {current_frame_time_sec:.2f}s", 
@@ -275,7 +679,7 @@ def main(recording_dir):
                 
                 # Draw cursor indicators for move and click actions
                 if action_type in ['move', 'click'] and 'x' in event_data and 'y' in event_data:
-                    x, y = int(event_data.get('x')), int(event_data.get('y'))
+                    x, y = int(event_data.get('x') * scale), int(event_data.get('y') * scale)
                     
                     # Use different colors and styles for different action types
                     if action_type == 'click':
@@ -290,81 +694,59 @@ def main(recording_dir):
             
             # Add each action as text
             line_pos = TEXT_POSITION[1] + LINE_HEIGHT
-            for idx, viz in enumerate(actions_in_chunk):
-                event_data = viz['event_data']
-                action_type = event_data.get('action', 'unknown')
-                
-                # Create a simple text representation
-                if action_type == 'click':
-                    text = f"Click: {event_data.get('name')} at ({event_data.get('x')}, {event_data.get('y')})"
-                elif action_type == 'click_complete':
-                    text = f"Click COMPLETE: {event_data.get('name')} at ({event_data.get('x')}, {event_data.get('y')}) [Duration: {event_data.get('duration'):.3f}s]"
-                elif action_type == 'scroll':
-                    text = f"Scroll: dx={event_data.get('dx')}, dy={event_data.get('dy')} at ({event_data.get('x')}, {event_data.get('y')})"
-                elif action_type == 'move':
-                    text = f"Move: ({event_data.get('x')}, {event_data.get('y')})"
-                elif action_type == 'press':
-                    text = f"Key: {event_data.get('name')} pressed={event_data.get('pressed')}"
-                elif action_type == 'press_complete':
-                    text = f"Key COMPLETE: {event_data.get('name')} [Duration: {event_data.get('duration'):.3f}s]"
-                elif action_type == 'move':
-                    text = f"Move: ({event_data.get('x')}, {event_data.get('y')})"
-                else:
-                    # Just convert the whole event to a string if we don't have special handling
-                    text = str(event_data)
-                    # Truncate if too long
-                    if len(text) > 80:
-                        text = text[:77] + "..."
-                
-                cv2.putText(frame, text, (TEXT_POSITION[0], line_pos), FONT, FONT_SCALE, 
+            for viz in actions_in_chunk:
+                cv2.putText(frame, format_event_text(viz['event_data']), (TEXT_POSITION[0], line_pos), FONT, FONT_SCALE,
                            TEXT_COLOR, FONT_THICKNESS, cv2.LINE_AA)
                 line_pos += LINE_HEIGHT
             
-            # Update frame_action_map
-            current_chunk_actions_for_map = []
-            for viz in actions_in_chunk:
-                # Store the original event data in the map
-                current_chunk_actions_for_map.append(viz['event_data'])
-                
-            if current_chunk_actions_for_map:
-                frame_action_map[frame_count] = current_chunk_actions_for_map
+            # Update frame_action_map with references to the events in this chunk
+            if actions_in_chunk:
+                frame_action_map.write(frame_count, [viz['event_ref'] for viz in actions_in_chunk])
             
             # Write frame to video
             out.write(frame)
             
             # Save debug frame
-            if debug_frames_dir:
-                debug_frame_path = os.path.join(debug_frames_dir, f"frame_{output_frame_count:06d}.png")
-                try:
-                    cv2.imwrite(debug_frame_path, frame)
-                except Exception as e:
-                    print(f"Error saving debug frame {output_frame_count}: {e}")
+            if debug_writer and debug_writer.should_write(output_frame_count, bool(actions_in_chunk)):
+                debug_writer.submit(output_frame_count, frame)
                     
             output_frame_count += 1
             actions_in_chunk = []
 
         frame_count += 1
         if frame_count % 100 == 0:
+             frame_action_map.flush()
              print(f"Processed frame {frame_count}/{total_frames} ({current_frame_time_sec:.1f}s)")
 
     # Cleanup
     cap.release()
     out.release()
     print(f"Visualization complete. Output saved to: {output_path}")
-    print(f"Saved {output_frame_count} debug frames to {debug_frames_dir}")
+    print(f"Input video: {pump.summary()}")
+    if debug_writer:
+        debug_writer.close()
+        print(f"Saved {debug_writer.frames_written} debug frames to {debug_frames_dir}"
+              + (f" ({debug_writer.errors} failed)" if debug_writer.errors else ""))
 
-    # Save frame action map
-    map_output_path = os.path.join(recording_dir, "frame_action_map.json")
-    try:
-        with open(map_output_path, 'w') as f:
-            json.dump(frame_action_map, f, indent=4)
-        print(f"Frame-action map saved to: {map_output_path}")
-    except Exception as e:
-        print(f"Error saving frame-action map: {e}")
+    frame_action_map.close()
+    print(f"Frame-action map ({frame_action_map.frames_written} frames) saved to: {frame_action_map.map_path}")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Overlay DuckTrack actions onto the screen recording.")
     parser.add_argument("recording_dir", help="Path to the recording directory containing events.jsonl and recording.mp4")
+    parser.add_argument("--start", type=float, default=None, help="Start of the time window to render, in seconds from the start of the video")
+    parser.add_argument("--end", type=float, default=None, help="End of the time window to render, in seconds from the start of the video")
+    parser.add_argument("--scale", type=float, default=1.0, help="Downsample frames by this factor before drawing (e.g. 0.5 for a quick preview)")
+    parser.add_argument("--events-only", action="store_true", help="Only render output frames that contain events, seeking past the rest")
+    parser.add_argument("--debug-frames", action="store_true", help=f"Also save output frames as images to {FRAMES_DEBUG_DIR}/")
+    parser.add_argument("--debug-format", choices=DEBUG_FRAME_FORMATS, default="jpg", help="Image format for debug frames")
+    parser.add_argument("--debug-quality", type=int, default=90, help="JPEG quality for debug frames (0-100)")
+    parser.add_argument("--debug-png-compression", type=int, default=3, help="PNG compression level for debug frames (0-9)")
+    parser.add_argument("--debug-every", type=int, default=1, help="Save every Nth output frame")
+    parser.add_argument("--debug-events-only", action="store_true", help="Only save output frames that contain events")
     args = parser.parse_args()
 
-    main(args.recording_dir) 
\ No newline at end of file
+    main(args.recording_dir, debug_frames=args.debug_frames, debug_format=args.debug_format,
+         debug_quality=args.debug_quality, debug_png_compression=args.debug_png_compression,
+         debug_every_n=args.debug_every, debug_events_only=args.debug_events_only,
+         events_only=args.events_only, start_sec=args.start, end_sec=args.end, scale=args.scale) 
\ No newline at end of file
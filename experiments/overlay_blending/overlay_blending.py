@@ -0,0 +1,46 @@
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from ducktrack.visualize_recording import (LINE_HEIGHT, TEXT_BOX_ALPHA,
+                                           TEXT_BOX_COLOR, OverlayCompositor)
+
+RESOLUTIONS = [(1280, 720), (1920, 1080), (3840, 2160)]
+LINES_IN_BOX = [1, 5, 20]
+ITERATIONS = 200
+
+
+def full_frame_blend(frame, top_left, bottom_right):
+    """The previous path: copy the whole frame, draw the box, blend the whole frame."""
+    text_overlay = frame.copy()
+    cv2.rectangle(text_overlay, top_left, bottom_right, TEXT_BOX_COLOR, -1)
+    return cv2.addWeighted(text_overlay, TEXT_BOX_ALPHA, frame, 1 - TEXT_BOX_ALPHA, 0)
+
+def time_per_frame(blend, frames, top_left, bottom_right):
+    start = time.perf_counter()
+    for i in range(ITERATIONS):
+        blend(frames[i % len(frames)], top_left, bottom_right)
+    return (time.perf_counter() - start) / ITERATIONS
+
+rng = np.random.default_rng(0)
+
+for width, height in RESOLUTIONS:
+    frames = [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(4)]
+    compositor = OverlayCompositor(width, height)
+
+    for lines in LINES_IN_BOX:
+        top_left = (10, 10)
+        bottom_right = (width - 10, 10 + (lines + 1) * LINE_HEIGHT)
+
+        expected = full_frame_blend(frames[0], top_left, bottom_right)
+        actual = compositor.blend_box(frames[0].copy(), top_left, bottom_right)
+        assert np.array_equal(expected, actual), "ROI blend does not match the full-frame blend"
+
+        full_ms = time_per_frame(full_frame_blend, frames, top_left, bottom_right) * 1000
+        roi_ms = time_per_frame(compositor.blend_box, frames, top_left, bottom_right) * 1000
+        print(f"{width}x{height}, {lines:2d} lines: full frame {full_ms:7.3f} ms, "
+              f"ROI {roi_ms:7.3f} ms, speedup {full_ms / roi_ms:6.1f}x")
@@ -0,0 +1,100 @@
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from ducktrack.visualize_recording import (CLICK_COLOR, CURSOR_RADIUS, CURSOR_THICKNESS, FONT,
+                                           FONT_SCALE, FONT_THICKNESS, LINE_HEIGHT, TEXT_COLOR,
+                                           TEXT_POSITION)
+
+# Compares drawing overlay lines with cv2.putText against compositing cached, pre-rasterized
+# sprites (float32 and integer alpha blending), to check whether a sprite cache pays off.
+RESOLUTIONS = [(1280, 720), (1920, 1080), (3840, 2160)]
+LINES = [
+    "Click: Button.left at (1843, 912)",
+    "Click COMPLETE: Button.left at (1843, 912) [Duration: 0.084s]",
+    "Move: (1850, 915)",
+    "Scroll: dx=0, dy=-1 at (1850, 915)",
+    "Key: Key.shift pressed=True",
+    "Key COMPLETE: 'a' [Duration: 0.112s]",
+    "Move: (1862, 921)",
+    "Move: (1870, 930)",
+]
+ITERATIONS = 300
+
+
+def rasterize(text):
+    (width, height), baseline = cv2.getTextSize(text, FONT, FONT_SCALE, FONT_THICKNESS)
+    pad = FONT_THICKNESS + 1
+    mask = np.zeros((height + baseline + 2 * pad, width + 2 * pad), dtype=np.uint8)
+    cv2.putText(mask, text, (pad, pad + height), FONT, FONT_SCALE, 255, FONT_THICKNESS, cv2.LINE_AA)
+    return mask, (-pad, -(pad + height))
+
+def put_text(frame, sprites):
+    y = TEXT_POSITION[1]
+    for text in LINES:
+        cv2.putText(frame, text, (TEXT_POSITION[0], y), FONT, FONT_SCALE, TEXT_COLOR, FONT_THICKNESS, cv2.LINE_AA)
+        y += LINE_HEIGHT
+
+def float_sprites(frame, sprites):
+    y = TEXT_POSITION[1]
+    color = np.asarray(TEXT_COLOR, dtype=np.float32)
+    for text in LINES:
+        alpha, (dx, dy), _ = sprites[text]
+        x0, y0 = TEXT_POSITION[0] + dx, y + dy
+        roi = frame[y0:y0 + alpha.shape[0], x0:x0 + alpha.shape[1]]
+        blended = roi.astype(np.float32)
+        blended += (color - blended) * alpha
+        roi[:] = (blended + 0.5).astype(np.uint8)
+        y += LINE_HEIGHT
+
+def int_sprites(frame, sprites):
+    y = TEXT_POSITION[1]
+    for text in LINES:
+        _, (dx, dy), (mask, inverse, premultiplied) = sprites[text]
+        x0, y0 = TEXT_POSITION[0] + dx, y + dy
+        roi = frame[y0:y0 + mask.shape[0], x0:x0 + mask.shape[1]]
+        roi[:] = ((roi.astype(np.uint16) * inverse + premultiplied + 127) // 255).astype(np.uint8)
+        y += LINE_HEIGHT
+
+def cursor_direct(frame, x, y):
+    cv2.circle(frame, (x, y), CURSOR_RADIUS, CLICK_COLOR, CURSOR_THICKNESS)
+    cv2.line(frame, (x - CURSOR_RADIUS - 5, y), (x + CURSOR_RADIUS + 5, y), CLICK_COLOR, 2)
+    cv2.line(frame, (x, y - CURSOR_RADIUS - 5), (x, y + CURSOR_RADIUS + 5), CLICK_COLOR, 2)
+
+def time_ms(draw, frames, *args):
+    start = time.perf_counter()
+    for i in range(ITERATIONS):
+        draw(frames[i % len(frames)], *args)
+    return (time.perf_counter() - start) / ITERATIONS * 1000
+
+sprites = {}
+for text in LINES:
+    mask, offset = rasterize(text)
+    alpha = (mask.astype(np.float32) / 255)[..., None]
+    color = np.asarray(TEXT_COLOR, dtype=np.uint16)
+    inverse = (255 - mask.astype(np.uint16))[..., None]
+    premultiplied = mask.astype(np.uint16)[..., None] * color
+    sprites[text] = (alpha, offset, (mask, inverse, premultiplied))
+
+rng = np.random.default_rng(0)
+for width, height in RESOLUTIONS:
+    frames = [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(4)]
+
+    reference = frames[0].copy()
+    put_text(reference, sprites)
+    for name, draw in (("float sprites", float_sprites), ("integer sprites", int_sprites)):
+        candidate = frames[0].copy()
+        draw(candidate, sprites)
+        diff = np.abs(reference.astype(np.int16) - candidate).max()
+        print(f"{width}x{height}: {name} differ from putText by up to {diff}")
+
+    put_ms = time_ms(put_text, frames, sprites)
+    float_ms = time_ms(float_sprites, frames, sprites)
+    int_ms = time_ms(int_sprites, frames, sprites)
+    cursor_ms = time_ms(cursor_direct, frames, width // 2, height // 2)
+    print(f"{width}x{height}, {len(LINES)} lines: putText {put_ms:6.3f} ms, float sprites {float_ms:6.3f} ms, "
+          f"integer sprites {int_ms:6.3f} ms; click cursor drawn directly {cursor_ms:6.3f} ms")
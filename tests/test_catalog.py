@@ -0,0 +1,91 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from ducktrack.catalog import RecordingCatalog
+
+
+def make_recording(root, name, start_time=None, stop_time=None, system="Linux", events=(), video=True):
+    path = os.path.join(root, name)
+    os.makedirs(path)
+    with open(os.path.join(path, "events.jsonl"), "w") as f:
+        for action in events:
+            f.write(json.dumps({"time_stamp": 0.0, "action": action}) + "\n")
+    if start_time is not None:
+        with open(os.path.join(path, "metadata.json"), "w") as f:
+            json.dump({"start_time": start_time, "stop_time": stop_time, "system": system,
+                       "screen_width": 1920, "screen_height": 1080}, f)
+    if video:
+        open(os.path.join(path, "recording.mp4"), "wb").close()
+    return path
+
+def touch(path, mtime):
+    os.utime(path, (mtime, mtime))
+
+class RecordingCatalogTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.first = make_recording(self.root, "recording-1", "2024-05-06 10:00:00", "2024-05-06 10:01:30",
+                                    events=["move", "move", "click", "press", "scroll"])
+        self.second = make_recording(self.root, "recording-2", "2024-05-08 09:00:00", "2024-05-08 09:00:10",
+                                     system="Darwin", events=["move"], video=False)
+        self.catalog = RecordingCatalog(self.root)
+
+    def tearDown(self):
+        self.catalog.close()
+        self.tmp.cleanup()
+
+    def test_rescan_indexes_recordings(self):
+        self.assertEqual(self.catalog.rescan(), 2)
+        row = self.catalog.query(system="Linux")[0]
+        self.assertEqual(row["name"], "recording-1")
+        self.assertEqual(row["duration_sec"], 90.0)
+        self.assertEqual((row["event_count"], row["move_count"], row["click_count"], row["key_count"],
+                          row["scroll_count"]), (5, 2, 1, 1, 1))
+        self.assertEqual(row["has_video"], 1)
+
+    def test_rescan_skips_unchanged_directory(self):
+        self.catalog.rescan()
+        self.assertEqual(self.catalog.rescan(), 0)
+        self.assertEqual(self.catalog.rescan(force=True), 2)
+
+    def test_rescan_picks_up_changes(self):
+        self.catalog.rescan()
+        # Directory mtimes have a coarse resolution on some filesystems; move them explicitly
+        later = time.time() + 10
+        third = make_recording(self.root, "recording-3", events=["move"])
+        with open(os.path.join(self.first, "events.jsonl"), "a") as f:
+            f.write(json.dumps({"time_stamp": 1.0, "action": "click"}) + "\n")
+        touch(self.first, later)
+        touch(self.root, later)
+        self.assertEqual(self.catalog.rescan(), 2)
+        self.assertEqual(self.catalog.query(system="Linux")[0]["click_count"], 2)
+        self.assertIsNone([r for r in self.catalog.query() if r["path"] == third][0]["start_time"])
+
+        for name in os.listdir(self.second):
+            os.remove(os.path.join(self.second, name))
+        os.rmdir(self.second)
+        touch(self.root, later + 10)
+        self.catalog.rescan()
+        self.assertEqual(sorted(r["name"] for r in self.catalog.query()), ["recording-1", "recording-3"])
+
+    def test_query(self):
+        self.catalog.rescan()
+        names = lambda rows: sorted(r["name"] for r in rows)
+        self.assertEqual(names(self.catalog.between("2024-05-06", "2024-05-06")), ["recording-1"])
+        self.assertEqual(names(self.catalog.query(start="2024-05-07")), ["recording-2"])
+        self.assertEqual(names(self.catalog.query(has_video=False)), ["recording-2"])
+        self.assertEqual(names(self.catalog.query(min_duration=60)), ["recording-1"])
+        self.assertEqual(names(self.catalog.query(min_events=2, system="Darwin")), [])
+        self.assertEqual(len(self.catalog.query(limit=1)), 1)
+        self.assertIn(self.catalog.latest()["name"], ("recording-1", "recording-2"))
+
+    def test_add_recording(self):
+        self.catalog.add_recording(self.second)
+        self.assertEqual([r["name"] for r in self.catalog.query()], ["recording-2"])
+
+if __name__ == "__main__":
+    unittest.main()
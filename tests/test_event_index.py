@@ -0,0 +1,90 @@
+import json
+import os
+import tempfile
+import unittest
+
+from ducktrack.event_index import (INDEX_FILENAME, EventIndex, EventIndexWriter, build_index, open_index,
+                                   read_events, read_first_event)
+
+
+class EventIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        self.events_path = os.path.join(self.dir, "events.jsonl")
+        # Slightly out of order, as events from different listener threads can be
+        self.times = [i * 0.1 for i in range(40)]
+        self.times[17], self.times[18] = self.times[18], self.times[17]
+        with open(self.events_path, "w") as f:
+            for i, t in enumerate(self.times):
+                f.write(json.dumps({"time_stamp": t, "action": "move", "x": i, "y": i}) + "\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_build_and_seek(self):
+        self.assertEqual(build_index(self.dir, stride=4), 40)
+        index = EventIndex(self.dir)
+        self.assertEqual(index.stride, 4)
+        self.assertEqual(len(index), 10)
+
+        with open(self.events_path, "rb") as f:
+            lines = f.readlines()
+        for t in (0.0, 0.05, 1.0, 1.75, 3.9, 10.0):
+            offset, event_idx = index.seek(t)
+            self.assertEqual(offset, sum(len(line) for line in lines[:event_idx]))
+            # No event before the seek position is at or after t
+            self.assertTrue(all(time < t for time in self.times[:event_idx]))
+        self.assertEqual(index.seek(-1.0), (0, 0))
+
+    def test_writer_matches_build(self):
+        writer = EventIndexWriter(self.dir, stride=4)
+        with open(self.events_path, "rb") as f:
+            offset = 0
+            for line in f:
+                writer.add(json.loads(line)["time_stamp"], offset)
+                offset += len(line)
+        writer.close()
+        with open(os.path.join(self.dir, INDEX_FILENAME), "rb") as f:
+            written = f.read()
+
+        build_index(self.dir, stride=4)
+        with open(os.path.join(self.dir, INDEX_FILENAME), "rb") as f:
+            self.assertEqual(f.read(), written)
+
+    def test_read_events(self):
+        build_index(self.dir, stride=4)
+        events, first_index = read_events(self.dir, 1.0, 2.0)
+        expected = [i for i, t in enumerate(self.times) if 1.0 - 1e-9 <= t <= 2.0 + 1e-9]
+        self.assertEqual(first_index, expected[0])
+        self.assertEqual([e["x"] for e in events], list(range(expected[0], expected[-1] + 1)))
+
+        events, first_index = read_events(self.dir)
+        self.assertEqual((len(events), first_index), (40, 0))
+
+        events, first_index = read_events(self.dir, 100.0)
+        self.assertEqual((events, first_index), ([], 40))
+
+    def test_read_events_without_index(self):
+        self.assertIsNone(open_index(self.dir))
+        events, first_index = read_events(self.dir, 1.0, 1.25)
+        self.assertEqual(first_index, 10)
+        self.assertEqual([e["x"] for e in events], [10, 11, 12])
+
+    def test_stale_index_is_ignored(self):
+        build_index(self.dir, stride=4)
+        with open(self.events_path, "w") as f:
+            f.write(json.dumps({"time_stamp": 5.0, "action": "move"}) + "\n")
+        self.assertIsNone(open_index(self.dir))
+        self.assertEqual(read_events(self.dir, 1.0)[1], 0)
+
+    def test_read_first_event_skips_invalid_lines(self):
+        with open(self.events_path, "r") as f:
+            lines = f.readlines()
+        with open(self.events_path, "w") as f:
+            f.write('{"time_stamp": \n')
+            f.writelines(lines)
+        self.assertEqual(read_first_event(self.dir)["time_stamp"], 0.0)
+
+if __name__ == "__main__":
+    unittest.main()
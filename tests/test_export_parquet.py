@@ -0,0 +1,105 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+from ducktrack import export_parquet
+from ducktrack.export_parquet import MANIFEST_FILENAME, ShardWriter, load_manifest, open_export
+
+
+def make_recording(root, name, num_events, finished=True):
+    path = os.path.join(root, name)
+    os.makedirs(path)
+    with open(os.path.join(path, "events.jsonl"), "w") as f:
+        for i in range(num_events):
+            f.write(json.dumps({"time_stamp": float(i), "action": "move", "x": i, "y": i}) + "\n")
+        f.write("{\"time_stamp\": \n")  # Cut short by a crash
+    if finished:
+        with open(os.path.join(path, "metadata.json"), "w") as f:
+            json.dump({"system": "Linux", "start_time": "2024-05-06 10:00:00",
+                       "obs_record_state_timings": {"OBS_WEBSOCKET_OUTPUT_STARTED": [1.5]}}, f)
+    return path
+
+@unittest.skipIf(pq is None, "pyarrow is not installed")
+class ShardWriterTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_rollover(self):
+        writer = ShardWriter(self.dir, "events", max_rows=4)
+        for i in range(10):
+            writer.add("rec", {"time_stamp": float(i), "action": "click" if i % 2 else "move", "pressed": True})
+        # Nothing has its final name until the writer is closed
+        self.assertFalse([name for name in os.listdir(self.dir) if name.endswith(".parquet")])
+        shards = writer.close()
+
+        self.assertEqual(shards, [["events-000.parquet", 4], ["events-001.parquet", 4], ["events-002.parquet", 2]])
+        self.assertEqual(sorted(os.listdir(self.dir)), [name for name, _ in shards])
+        times = []
+        for name, rows in shards:
+            table = pq.read_table(os.path.join(self.dir, name))
+            self.assertEqual(table.num_rows, rows)
+            times.extend(table.column("time_stamp").to_pylist())
+        self.assertEqual(times, [float(i) for i in range(10)])
+        self.assertEqual(table.column("action").to_pylist(), ["move", "click"])
+        self.assertEqual(table.column("x").to_pylist(), [None, None])
+
+    def test_empty_writer(self):
+        self.assertEqual(ShardWriter(self.dir, "events").close(), [])
+        self.assertEqual(os.listdir(self.dir), [])
+
+@unittest.skipIf(pq is None, "pyarrow is not installed")
+class ExportTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.recordings = os.path.join(self.tmp.name, "recordings")
+        self.output = os.path.join(self.tmp.name, "export")
+        os.makedirs(self.recordings)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def export(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            export_parquet.main(self.recordings, self.output, num_workers=2, max_rows_per_shard=3)
+
+    def test_resume_exports_only_new_finished_recordings(self):
+        make_recording(self.recordings, "rec-a", 5)
+        make_recording(self.recordings, "rec-b", 2, finished=False)
+        self.export()
+        self.assertEqual(load_manifest(self.output), {"rec-a"})
+
+        # A rerun exports nothing new; once rec-b has finished and rec-c appears, only those are added
+        self.export()
+        with open(os.path.join(self.recordings, "rec-b", "metadata.json"), "w") as f:
+            json.dump({"system": "Darwin"}, f)
+        make_recording(self.recordings, "rec-c", 4)
+        self.export()
+        with open(os.path.join(self.output, MANIFEST_FILENAME), "r") as f:
+            self.assertEqual(len(f.readlines()), 2)
+        self.assertEqual(load_manifest(self.output), {"rec-a", "rec-b", "rec-c"})
+
+        events, recordings = open_export(self.output)
+        table = events.to_table()
+        counts = {}
+        for recording_id in table.column("recording_id").to_pylist():
+            counts[recording_id] = counts.get(recording_id, 0) + 1
+        self.assertEqual(counts, {"rec-a": 5, "rec-b": 2, "rec-c": 4})
+        rows = {row["recording_id"]: row for row in recordings.to_pylist()}
+        self.assertEqual(rows["rec-a"]["event_count"], 5)
+        self.assertEqual(rows["rec-a"]["obs_output_started"], 1.5)
+        self.assertEqual(rows["rec-b"]["system"], "Darwin")
+
+if __name__ == "__main__":
+    unittest.main()
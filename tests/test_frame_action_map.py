@@ -0,0 +1,72 @@
+import json
+import os
+import tempfile
+import unittest
+
+from ducktrack.visualize_recording import FrameActionMap, FrameActionMapWriter, window_suffix
+
+
+def _write_recording(recording_dir, events):
+    with open(os.path.join(recording_dir, "events.jsonl"), "w") as f:
+        for event in events:
+            f.write(json.dumps(event) + "\n")
+
+class FrameActionMapTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        self.events = [
+            {"time_stamp": 10.0, "relative_time_sec": 0.0, "action": "move", "x": 1, "y": 2},
+            {"time_stamp": 10.1, "relative_time_sec": 0.1, "action": "click", "x": 1, "y": 2, "button": "left", "pressed": True},
+            {"time_stamp": 10.2, "relative_time_sec": 0.2, "action": "click", "x": 1, "y": 2, "button": "left", "pressed": False},
+            {"time_stamp": 10.5, "relative_time_sec": 0.5, "action": "scroll", "x": 1, "y": 2, "dx": 0, "dy": -1},
+        ]
+        _write_recording(self.dir, self.events)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        writer = FrameActionMapWriter(self.dir)
+        writer.write(3, [0])
+        writer.write(6, [[1, 2], 3])
+        writer.close()
+        self.assertEqual(writer.frames_written, 2)
+
+        frame_map = FrameActionMap(self.dir, events=self.events)
+        self.assertEqual(len(frame_map), 2)
+        self.assertEqual(frame_map.event_refs(3), [0])
+        self.assertEqual(frame_map.event_refs(6), [[1, 2], 3])
+        self.assertIsNone(frame_map.event_refs(4))
+        self.assertIsNone(frame_map.event_refs(100))
+
+        self.assertEqual(frame_map.actions(3), [self.events[0]])
+        click, scroll = frame_map.actions(6)
+        self.assertEqual(click["action"], "click_complete")
+        self.assertAlmostEqual(click["duration"], 0.1)
+        self.assertEqual(scroll, self.events[3])
+        self.assertEqual(frame_map.actions(4), [])
+
+    def test_loads_events_when_not_given(self):
+        writer = FrameActionMapWriter(self.dir)
+        writer.write(0, [3])
+        writer.close()
+        self.assertEqual(FrameActionMap(self.dir).actions(0)[0]["action"], "scroll")
+
+    def test_window_map_is_offset_and_separate(self):
+        full = FrameActionMapWriter(self.dir)
+        full.write(0, [0])
+        full.close()
+
+        # A window that loaded events from index 1 on references them by their index in the full file
+        suffix = window_suffix(0.1, 0.3)
+        window = FrameActionMapWriter(self.dir, index_offset=1, suffix=suffix)
+        window.write(2, [[0, 1]])
+        window.close()
+
+        self.assertEqual(FrameActionMap(self.dir, suffix=suffix).event_refs(2), [[1, 2]])
+        self.assertEqual(FrameActionMap(self.dir).event_refs(0), [0])
+        self.assertIsNone(FrameActionMap(self.dir).event_refs(2))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+
+from ducktrack.visualize_recording import build_frame_index
+
+
+def _events(times):
+    return [{"relative_time_sec": t, "action": "move", "x": i, "y": i} for i, t in enumerate(times)]
+
+class FrameEventIndexTest(unittest.TestCase):
+    def setUp(self):
+        # At 10 fps: frame 0 gets the event before the video and the one at 0.05s, frame 3 gets
+        # two events, frame 7 one, and the frames in between none
+        self.events = _events([-0.2, 0.05, 0.3, 0.39, 0.7])
+        self.index = build_frame_index(self.events, fps=10, num_frames=10)
+
+    def test_events_for_frame(self):
+        self.assertEqual(self.index.events_for_frame(0), self.events[0:2])
+        self.assertEqual(self.index.events_for_frame(3), self.events[2:4])
+        self.assertEqual(self.index.events_for_frame(7), self.events[4:5])
+        self.assertEqual(self.index.events_for_frame(5), [])
+        self.assertEqual(self.index.events_for_frame(-1), [])
+        self.assertEqual(self.index.events_for_frame(10), [])
+
+    def test_frame_boundaries(self):
+        # An event exactly on a frame's start time belongs to that frame
+        index = build_frame_index(_events([0.0, 0.1, 0.2]), fps=10)
+        self.assertEqual([index.frame_of_event(i) for i in range(3)], [0, 1, 2])
+
+    def test_every_event_in_exactly_one_frame(self):
+        sliced = [event for frame in range(self.index.num_frames) for event in self.index.events_for_frame(frame)]
+        self.assertEqual(sliced, self.events)
+
+    def test_num_frames_covers_events(self):
+        # Events past the reported frame count still get a frame
+        index = build_frame_index(_events([0.0, 2.0]), fps=10, num_frames=5)
+        self.assertEqual(index.frame_of_event(1), 20)
+        self.assertEqual(index.events_for_frame(20), index.events[1:])
+        self.assertEqual(build_frame_index([], fps=10).num_frames, 1)
+
+    def test_frame_for_time(self):
+        self.assertEqual(self.index.frame_for_time(0.35), 3)
+        self.assertEqual(list(self.index.frame_for_time([0.0, 0.1, 0.99])), [0, 1, 9])
+
+    def test_next_event_frame(self):
+        self.assertEqual(self.index.next_event_frame(0), 0)
+        self.assertEqual(self.index.next_event_frame(1), 3)
+        self.assertEqual(self.index.next_event_frame(4), 7)
+        self.assertIsNone(self.index.next_event_frame(8))
+
+    def test_frame_range_slice(self):
+        self.assertEqual(self.events[self.index.frame_range_slice(1, 8)], self.events[2:5])
+        self.assertEqual(self.events[self.index.frame_range_slice(4, 7)], [])
+        self.assertEqual(self.events[self.index.frame_range_slice(-5, 50)], self.events)
+
+if __name__ == "__main__":
+    unittest.main()
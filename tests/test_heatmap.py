@@ -0,0 +1,110 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from ducktrack import heatmap
+from ducktrack.heatmap import HistogramAccumulator, accumulate_recordings, render_heatmap
+
+
+def make_recording(root, name, events=(), screen_size=(100, 50), with_events=True):
+    path = os.path.join(root, name)
+    os.makedirs(path)
+    if screen_size is not None:
+        with open(os.path.join(path, "metadata.json"), "w") as f:
+            json.dump({"screen_width": screen_size[0], "screen_height": screen_size[1]}, f)
+    if with_events:
+        with open(os.path.join(path, "events.jsonl"), "w") as f:
+            for event in events:
+                f.write(json.dumps(event) + "\n")
+    return path
+
+class HistogramAccumulatorTest(unittest.TestCase):
+    def test_add_and_flush(self):
+        accumulator = HistogramAccumulator(bins=(4, 2))
+        accumulator.add("move", 0.1, 0.1)
+        accumulator.add("move", 0.9, 0.9)
+        accumulator.add("move", 0.9, 0.8)
+        accumulator.add("click", 1.5, 0.5)  # Off-screen
+        # Nothing is counted until the buffers are folded
+        self.assertEqual(accumulator.histograms["move"].sum(), 0)
+        accumulator.flush()
+
+        move = accumulator.histograms["move"]
+        self.assertEqual(move.shape, (2, 4))
+        self.assertEqual((move[0, 0], move[1, 3], move.sum()), (1, 2, 3))
+        self.assertEqual(accumulator.histograms["click"].sum(), 0)
+        self.assertEqual(accumulator.out_of_bounds, {"move": 0, "click": 1, "scroll": 0})
+        # Flushing again doesn't count the same points twice
+        accumulator.flush()
+        self.assertEqual(move.sum(), 3)
+
+    def test_full_buffer_is_folded(self):
+        with mock.patch.object(heatmap, "POINT_BUFFER_SIZE", 4):
+            accumulator = HistogramAccumulator(bins=(2, 2))
+            for _ in range(9):
+                accumulator.add("scroll", 0.25, 0.75)
+            self.assertEqual(accumulator.histograms["scroll"][1, 0], 8)
+            accumulator.flush()
+        self.assertEqual(accumulator.histograms["scroll"][1, 0], 9)
+
+    def test_merge(self):
+        a, b = HistogramAccumulator(bins=(2, 2)), HistogramAccumulator(bins=(2, 2))
+        a.add("move", 0.2, 0.2)
+        b.add("move", 0.2, 0.2)
+        b.add("move", -0.1, 0.2)
+        a.flush()
+        b.flush()
+        a.merge(b.histograms, b.out_of_bounds)
+        self.assertEqual(a.histograms["move"][0, 0], 2)
+        self.assertEqual(a.out_of_bounds["move"], 1)
+
+class AccumulateRecordingsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_points_are_normalized_by_screen_size(self):
+        events = [{"time_stamp": 0, "action": "move", "x": 10, "y": 40},
+                  {"time_stamp": 1, "action": "click", "x": 90, "y": 5, "pressed": True},
+                  {"time_stamp": 2, "action": "click", "x": 90, "y": 5, "pressed": False},
+                  {"time_stamp": 3, "action": "scroll", "x": 200, "y": 5, "dx": 0, "dy": 1},
+                  {"time_stamp": 4, "action": "press", "name": "a"}]
+        path = make_recording(self.tmp.name, "rec", events)
+        histograms, out_of_bounds, skipped = accumulate_recordings([path], bins=(10, 10))
+        self.assertEqual(skipped, 0)
+        # (10, 40) on a 100x50 screen is (0.1, 0.8)
+        self.assertEqual(histograms["move"][8, 1], 1)
+        self.assertEqual(histograms["move"].sum(), 1)
+        # Only the press of a click counts
+        self.assertEqual(histograms["click"][1, 9], 1)
+        self.assertEqual(histograms["click"].sum(), 1)
+        self.assertEqual((histograms["scroll"].sum(), out_of_bounds["scroll"]), (0, 1))
+
+    def test_unusable_recordings_are_skipped(self):
+        move = {"time_stamp": 0, "action": "move", "x": 10, "y": 10}
+        good = make_recording(self.tmp.name, "good", [move])
+        no_metadata = make_recording(self.tmp.name, "no-metadata", [move], screen_size=None)
+        no_events = make_recording(self.tmp.name, "no-events", with_events=False)
+        zero_width = make_recording(self.tmp.name, "zero-width", [move], screen_size=(0, 50))
+        no_size = make_recording(self.tmp.name, "no-size", [move], screen_size=(None, 50))
+        histograms, _, skipped = accumulate_recordings([no_metadata, no_events, good, zero_width, no_size],
+                                                       bins=(10, 10))
+        self.assertEqual(skipped, 4)
+        self.assertEqual(histograms["move"].sum(), 1)
+
+class RenderHeatmapTest(unittest.TestCase):
+    def test_render(self):
+        histogram = np.zeros((2, 4), dtype=np.int64)
+        histogram[0, 0] = 100
+        image = render_heatmap(histogram, output_width=40)
+        self.assertEqual(image.shape, (20, 40, 3))
+        self.assertEqual(render_heatmap(np.zeros((2, 4), dtype=np.int64), output_width=40).shape, (20, 40, 3))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from ducktrack.page_cache import PageCache, cache_key
+
+
+class FakeResponse:
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self._body = body
+
+    async def body(self):
+        return self._body
+
+class FakeRequest:
+    def __init__(self, url, method="GET"):
+        self.url = url
+        self.method = method
+
+class FakeRoute:
+    """Serves `network` ({url: FakeResponse}) without following redirects, like route.fetch(max_redirects=0)."""
+
+    def __init__(self, request, network):
+        self.request = request
+        self.network = network
+        self.fetched = False
+        self.fulfilled = None
+        self.aborted = False
+
+    async def fetch(self, max_redirects=None):
+        assert max_redirects == 0
+        self.fetched = True
+        return self.network[self.request.url]
+
+    async def fulfill(self, status, headers, body):
+        self.fulfilled = {"status": status, "headers": headers, "body": body}
+
+    async def abort(self, error_code=None):
+        self.aborted = True
+
+class FakeContext:
+    async def route(self, pattern, handler):
+        self.handler = handler
+
+class PageCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def request(self, mode, url, network=None, method="GET"):
+        async def run():
+            cache = PageCache(self.dir, mode)
+            context, result = FakeContext(), {}
+            await cache.install(context, result)
+            route = FakeRoute(FakeRequest(url, method), network or {})
+            await context.handler(route)
+            return route, result["cache"]
+        return asyncio.run(run())
+
+    def test_store_and_load(self):
+        cache = PageCache(self.dir)
+        self.assertIsNone(cache.load("GET", "https://example.com/"))
+        cache.store("GET", "https://example.com/", 200,
+                    {"Content-Type": "text/html", "Content-Encoding": "gzip", "content-length": "99"}, b"<html>")
+        meta, body = cache.load("GET", "https://example.com/")
+        self.assertEqual(body, b"<html>")
+        self.assertEqual(meta["status"], 200)
+        # The body is stored decoded, so the wire encoding headers are dropped
+        self.assertEqual(meta["headers"], {"Content-Type": "text/html"})
+        self.assertIsNone(cache.load("HEAD", "https://example.com/"))
+        self.assertEqual(cache.size()[0], 1)
+        self.assertFalse([name for name in os.listdir(self.dir) if name.endswith(".tmp")])
+
+    def test_corrupt_entry_is_a_miss(self):
+        cache = PageCache(self.dir)
+        cache.store("GET", "https://example.com/", 200, {}, b"x")
+        with open(os.path.join(self.dir, cache_key("GET", "https://example.com/") + ".json"), "w") as f:
+            f.write("{")
+        self.assertIsNone(cache.load("GET", "https://example.com/"))
+
+    def test_fallback_fetches_then_serves_from_disk(self):
+        network = {"https://example.com/": FakeResponse(200, {"content-type": "text/html"}, b"page")}
+        route, stats = self.request("fallback", "https://example.com/", network)
+        self.assertTrue(route.fetched)
+        self.assertEqual(route.fulfilled["body"], b"page")
+        self.assertEqual((stats["misses"], stats["network"], stats["stored"]), (1, 1, 1))
+
+        route, stats = self.request("fallback", "https://example.com/")
+        self.assertFalse(route.fetched)
+        self.assertEqual(route.fulfilled, {"status": 200, "headers": {"content-type": "text/html"}, "body": b"page"})
+        self.assertEqual((stats["hits"], stats["bytes_served"]), (1, 4))
+
+    def test_redirect_is_replayed_not_followed(self):
+        network = {"https://example.com/old": FakeResponse(301, {"location": "/new", "content-length": "0"}, b"")}
+        self.request("record", "https://example.com/old", network)
+        route, _ = self.request("offline", "https://example.com/old")
+        self.assertEqual(route.fulfilled["status"], 301)
+        self.assertEqual(route.fulfilled["headers"], {"location": "/new"})
+
+    def test_offline_aborts_misses(self):
+        route, stats = self.request("offline", "https://example.com/missing")
+        self.assertTrue(route.aborted)
+        self.assertFalse(route.fetched)
+        self.assertEqual(stats["aborted"], 1)
+
+    def test_other_methods_are_not_cached(self):
+        network = {"https://example.com/form": FakeResponse(200, {}, b"ok")}
+        route, stats = self.request("fallback", "https://example.com/form", network, method="POST")
+        self.assertEqual(route.fulfilled["body"], b"ok")
+        self.assertEqual((stats["misses"], stats["stored"]), (0, 0))
+        self.assertEqual(PageCache(self.dir).size(), (0, 0))
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            PageCache(self.dir, "sometimes")
+
+if __name__ == "__main__":
+    unittest.main()
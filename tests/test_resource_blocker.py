@@ -0,0 +1,83 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from ducktrack.resource_blocker import ResourceBlocker, load_domains
+
+
+class FakeRequest:
+    def __init__(self, url, resource_type="document", body_size=0):
+        self.url = url
+        self.resource_type = resource_type
+        self.body_size = body_size
+
+    async def sizes(self):
+        return {"responseBodySize": self.body_size}
+
+class FakeRoute:
+    def __init__(self, request):
+        self.request = request
+        self.outcome = None
+
+    async def fallback(self):
+        self.outcome = "fallback"
+
+    async def abort(self, error_code=None):
+        self.outcome = "abort"
+
+class FakeContext:
+    def __init__(self):
+        self.handlers = {}
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    async def route(self, pattern, handler):
+        self.handlers["route"] = handler
+
+class ResourceBlockerTest(unittest.TestCase):
+    def test_match(self):
+        blocker = ResourceBlocker(("media", "font"), ("doubleclick.net", ".Criteo.com"))
+        self.assertEqual(blocker.match("font", "https://example.com/a.woff2"), "type:font")
+        self.assertEqual(blocker.match("script", "https://securepubads.g.doubleclick.net/tag.js"), "domain:doubleclick.net")
+        self.assertEqual(blocker.match("image", "https://DOUBLECLICK.NET:8443/pixel.gif"), "domain:doubleclick.net")
+        self.assertEqual(blocker.match("script", "https://static.criteo.com/ld.js"), "domain:criteo.com")
+        # Only whole domain labels match
+        self.assertIsNone(blocker.match("script", "https://notdoubleclick.net/tag.js"))
+        self.assertIsNone(blocker.match("document", "https://example.com/doubleclick.net"))
+        self.assertIsNone(blocker.match("image", "data:image/png;base64,AAAA"))
+
+    def test_load_domains(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "domains.txt")
+            with open(path, "w") as f:
+                f.write("# Ads\nads.example.com\n\n  tracker.example.net  # analytics\n")
+            self.assertEqual(load_domains(path), ["ads.example.com", "tracker.example.net"])
+
+    def test_install_counts_blocked_and_allowed(self):
+        async def run():
+            blocker = ResourceBlocker(("media",), ("ads.example.com",), size_hints={"https://example.com/v.mp4": 1000})
+            context, result = FakeContext(), {}
+            await blocker.install(context, result)
+
+            routes = [FakeRoute(FakeRequest("https://example.com/", "document")),
+                      FakeRoute(FakeRequest("https://example.com/v.mp4", "media")),
+                      FakeRoute(FakeRequest("https://ads.example.com/ad.js", "script"))]
+            for route in routes:
+                await context.handlers["route"](route)
+            await context.handlers["requestfinished"](FakeRequest("https://example.com/", body_size=500))
+            return blocker, result, [route.outcome for route in routes]
+
+        blocker, result, outcomes = asyncio.run(run())
+        self.assertEqual(outcomes, ["fallback", "abort", "abort"])
+        session = result["blocked"]
+        self.assertEqual((session["blocked_requests"], session["blocked_bytes"], session["blocked_unsized"]), (2, 1000, 1))
+        self.assertEqual(session["by_type"], {"media": 1, "script": 1})
+        self.assertEqual(session["by_domain"], {"ads.example.com": 1})
+        self.assertEqual((session["allowed_requests"], session["allowed_bytes"]), (1, 500))
+        self.assertEqual(blocker.size_hints["https://example.com/"], 500)
+        self.assertEqual(blocker.stats["blocked_requests"], 2)
+
+if __name__ == "__main__":
+    unittest.main()
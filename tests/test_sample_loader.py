@@ -0,0 +1,139 @@
+import contextlib
+import io
+import json
+import multiprocessing as mp
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import cv2
+import numpy as np
+
+from ducktrack import sample_loader
+from ducktrack.sample_loader import SampleLoader, decode_frame, encode_frame
+
+FPS = 10
+NUM_FRAMES = 30
+CLICKS_PER_RECORDING = 6
+
+
+def make_recording(root, name, seed):
+    """A 3 s recording of noise frames (so each encodes to a distinct size) with a click every 0.4 s."""
+    path = os.path.join(root, name)
+    os.makedirs(path)
+    rng = np.random.default_rng(seed)
+    writer = cv2.VideoWriter(os.path.join(path, "recording.mp4"), cv2.VideoWriter_fourcc(*"mp4v"), FPS, (64, 48))
+    for _ in range(NUM_FRAMES):
+        writer.write(rng.integers(0, 256, (48, 64, 3), dtype=np.uint8))
+    writer.release()
+
+    with open(os.path.join(path, "events.jsonl"), "w") as f:
+        for i in range(CLICKS_PER_RECORDING):
+            t = 100.0 + 0.4 * (i + 1)
+            for pressed, dt in ((True, 0.0), (False, 0.05)):
+                f.write(json.dumps({"time_stamp": t + dt, "action": "click", "x": 10 * i, "y": 5,
+                                    "button": "left", "pressed": pressed}) + "\n")
+    with open(os.path.join(path, "metadata.json"), "w") as f:
+        json.dump({"obs_record_state_timings": {"OBS_WEBSOCKET_OUTPUT_STARTED": [100.0]}}, f)
+    return path
+
+def _exit_on_first(recording_dir, *args):
+    # Stands in for a worker killed while decoding (runs in the forked worker). The first
+    # recording is taken before the worker has queued anything, so nothing is left half-sent.
+    if recording_dir.endswith("rec-0"):
+        os._exit(1)
+    return _original_recording_samples(recording_dir, *args)
+
+_original_recording_samples = sample_loader.recording_samples
+
+class SampleLoaderTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.recordings = [make_recording(cls.tmp.name, f"rec-{i}", i) for i in range(4)]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def load(self, **kwargs):
+        kwargs.setdefault("num_workers", 1)
+        with contextlib.redirect_stdout(io.StringIO()):
+            return [(s["recording"], s["frame_num"], s["action"]["x"]) for s in SampleLoader(self.recordings, **kwargs)]
+
+    def test_encode_round_trip(self):
+        frame = np.random.default_rng(0).integers(0, 256, (48, 64, 3), dtype=np.uint8)
+        np.testing.assert_array_equal(decode_frame(encode_frame(frame, ".png")), frame)
+        self.assertEqual(decode_frame(encode_frame(frame)).shape, frame.shape)
+
+    def test_samples(self):
+        loader = SampleLoader(self.recordings, num_workers=2, shuffle_buffer_bytes=0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            samples = list(loader)
+        self.assertEqual(len(samples), 4 * CLICKS_PER_RECORDING)
+        self.assertEqual(loader.samples, len(samples))
+        sample = samples[0]
+        self.assertEqual(sample["frame"].shape, (48, 64, 3))
+        self.assertEqual(sample["action"]["type"], "click")
+        # The frame shown just before the click at 0.4 s into the video
+        first = min((s for s in samples if s["recording"] == "rec-0"), key=lambda s: s["frame_num"])
+        self.assertEqual(first["frame_num"], 3)
+
+    def test_deterministic_sharding(self):
+        shards = [SampleLoader(self.recordings, shard_index=i, num_shards=3).recordings for i in range(3)]
+        self.assertEqual(sorted(sum(shards, [])), sorted(self.recordings))
+        self.assertEqual(shards[0], [self.recordings[0], self.recordings[3]])
+        # The split doesn't depend on the order the recordings are given in
+        self.assertEqual(SampleLoader(self.recordings[::-1], shard_index=1, num_shards=3).recordings, shards[1])
+
+        samples = self.load(shard_index=0, num_shards=3, seed=5)
+        self.assertEqual({name for name, _, _ in samples}, {"rec-0", "rec-3"})
+        self.assertEqual(samples, self.load(shard_index=0, num_shards=3, seed=5))
+        with self.assertRaises(ValueError):
+            SampleLoader(self.recordings, shard_index=3, num_shards=3)
+
+    def test_shuffle_buffer_is_bounded_by_bytes(self):
+        # Without shuffling, recordings and their samples come in order
+        in_order = self.load(shuffle_buffer_bytes=0)
+        self.assertEqual(in_order, sorted(in_order))
+        # A buffer smaller than one frame can only ever hold the sample being swapped out
+        tiny = self.load(shuffle_buffer_bytes=1, seed=0)
+        groups = [name for i, (name, _, _) in enumerate(tiny) if i == 0 or tiny[i - 1][0] != name]
+        self.assertEqual(len(groups), 4)
+        self.assertEqual(sorted(tiny), sorted(in_order))
+        # A buffer holding everything mixes the recordings
+        mixed = self.load(shuffle_buffer_bytes=2**30, seed=0)
+        self.assertEqual(sorted(mixed), sorted(in_order))
+        self.assertGreater(len([i for i in range(1, len(mixed)) if mixed[i][0] != mixed[i - 1][0]]), 4)
+
+    def test_encoded_frames(self):
+        loader = SampleLoader(self.recordings[:1], frame_format=".png", decode=False, shuffle_buffer_bytes=0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            sample = next(iter(loader))
+        self.assertIsInstance(sample["frame"], bytes)
+        self.assertEqual(decode_frame(sample["frame"]).shape, (48, 64, 3))
+
+    def test_early_stop_terminates_workers(self):
+        # Without a shuffle buffer to drain into, the workers are left blocked on the full queue
+        loader = SampleLoader(self.recordings, num_workers=2, prefetch=1, shuffle_buffer_bytes=0)
+        samples = iter(loader)
+        with contextlib.redirect_stdout(io.StringIO()):
+            next(samples)
+            self.assertTrue(mp.active_children())
+            samples.close()
+        self.assertEqual(mp.active_children(), [])
+        self.assertEqual(loader.samples, 1)
+
+    @unittest.skipUnless(mp.get_start_method() == "fork", "needs workers forked with the patched decoder")
+    def test_dead_worker_does_not_hang(self):
+        output = io.StringIO()
+        with mock.patch.object(sample_loader, "recording_samples", _exit_on_first), \
+                mock.patch.object(sample_loader, "WORKER_POLL_SEC", 0.2), contextlib.redirect_stdout(output):
+            samples = list(SampleLoader(self.recordings, num_workers=2, shuffle_buffer_bytes=0))
+        self.assertIn("died (exit code 1)", output.getvalue())
+        names = {s["recording"] for s in samples}
+        self.assertEqual(names, {"rec-1", "rec-2", "rec-3"})
+
+if __name__ == "__main__":
+    unittest.main()
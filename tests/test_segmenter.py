@@ -0,0 +1,110 @@
+import unittest
+
+from ducktrack.segmenter import MAX_DRAG_PATH_POINTS, segment_events
+
+
+def click(t, pressed, x=100, y=100, button="left"):
+    return {"time_stamp": t, "action": "click", "x": x, "y": y, "button": button, "pressed": pressed}
+
+def move(t, x, y):
+    return {"time_stamp": t, "action": "move", "x": x, "y": y}
+
+def press(t, name):
+    return {"time_stamp": t, "action": "press", "name": name}
+
+def release(t, name):
+    return {"time_stamp": t, "action": "release", "name": name}
+
+def key(t, name):
+    return [press(t, name), release(t + 0.02, name)]
+
+class SegmenterTest(unittest.TestCase):
+    def segment(self, events):
+        return list(segment_events(events))
+
+    def test_single_click(self):
+        actions = self.segment([click(0.0, True), click(0.1, False)])
+        self.assertEqual(actions, [{"type": "click", "start_time": 0.0, "end_time": 0.1, "event_range": [0, 1],
+                                    "button": "left", "x": 100, "y": 100, "count": 1}])
+
+    def test_double_and_triple_click(self):
+        double = self.segment([click(0.0, True), click(0.05, False), click(0.2, True), click(0.25, False)])
+        self.assertEqual([(a["type"], a["count"], a["event_range"]) for a in double], [("click", 2, [0, 3])])
+
+        triple = self.segment([click(t, pressed) for t, pressed in
+                               [(0.0, True), (0.05, False), (0.2, True), (0.25, False), (0.4, True), (0.45, False)]])
+        self.assertEqual([a["count"] for a in triple], [3])
+
+    def test_slow_or_distant_clicks_stay_separate(self):
+        slow = self.segment([click(0.0, True), click(0.05, False), click(1.0, True), click(1.05, False)])
+        self.assertEqual([a["count"] for a in slow], [1, 1])
+        distant = self.segment([click(0.0, True), click(0.05, False), click(0.2, True, x=300), click(0.25, False, x=300)])
+        self.assertEqual([(a["count"], a["x"]) for a in distant], [(1, 100), (1, 300)])
+
+    def test_drag(self):
+        events = [click(0.0, True)] + [move(0.01 * i, 100 + i, 100 + i) for i in range(1, 21)] + \
+                 [click(0.3, False, x=130, y=130)]
+        actions = self.segment(events)
+        self.assertEqual(len(actions), 1)
+        drag = actions[0]
+        self.assertEqual(drag["type"], "drag")
+        self.assertEqual(drag["start"], [100, 100])
+        self.assertEqual(drag["end"], [130, 130])
+        self.assertEqual(drag["event_range"], [0, 21])
+
+    def test_small_movement_is_still_a_click(self):
+        actions = self.segment([click(0.0, True), move(0.05, 102, 101), click(0.1, False, x=102, y=101)])
+        self.assertEqual([a["type"] for a in actions], ["click"])
+
+    def test_long_drag_path_is_decimated(self):
+        events = [click(0.0, True)] + [move(0.001 * i, 100 + i, 100) for i in range(1, 1001)] + \
+                 [click(2.0, False, x=1100, y=100)]
+        drag = self.segment(events)[0]
+        self.assertLessEqual(len(drag["path"]), MAX_DRAG_PATH_POINTS + 1)
+        self.assertEqual(drag["path"][0], [100, 100])
+        self.assertEqual(drag["path"][-1], [1100, 100])
+
+    def test_second_button_while_first_is_held(self):
+        events = [click(0.0, True), move(0.05, 150, 150), click(0.1, True, x=150, y=150, button="right"),
+                  click(0.15, False, x=150, y=150, button="right"), move(0.2, 200, 200),
+                  click(0.3, False, x=200, y=200)]
+        actions = self.segment(events)
+        self.assertEqual([(a["type"], a["button"]) for a in actions], [("click", "right"), ("drag", "left")])
+        self.assertEqual(actions[1]["event_range"], [0, 5])
+        self.assertEqual(actions[1]["end"], [200, 200])
+
+    def test_unreleased_press_counts_as_click(self):
+        actions = self.segment([click(0.0, True)])
+        self.assertEqual([(a["type"], a["count"]) for a in actions], [("click", 1)])
+
+    def test_typing_with_shift_caps_lock_and_backspace(self):
+        events = [press(0.0, "shift"), *key(0.01, "h"), release(0.05, "shift"), *key(0.1, "i"),
+                  *key(0.2, "space"), *key(0.3, "x"), *key(0.4, "backspace"), *key(0.5, "caps_lock"),
+                  *key(0.6, "o"), *key(0.7, "k")]
+        actions = self.segment(events)
+        self.assertEqual([(a["type"], a["text"]) for a in actions], [("type", "Hi OK")])
+        self.assertEqual(actions[0]["event_range"], [0, len(events) - 1])
+
+    def test_typing_gap_splits_spans(self):
+        actions = self.segment([*key(0.0, "a"), *key(3.0, "b")])
+        self.assertEqual([a["text"] for a in actions], ["a", "b"])
+
+    def test_hotkey_and_special_key(self):
+        events = [press(0.0, "ctrl_l"), *key(0.05, "c"), release(0.1, "ctrl_l"), *key(0.2, "esc")]
+        actions = self.segment(events)
+        self.assertEqual([(a["type"], a["key"], a["modifiers"]) for a in actions],
+                         [("hotkey", "c", ["ctrl"]), ("key", "esc", [])])
+        self.assertEqual(actions[0]["event_range"], [0, 1])
+
+    def test_click_ends_typing(self):
+        actions = self.segment([*key(0.0, "a"), click(0.1, True), click(0.15, False)])
+        self.assertEqual([a["type"] for a in actions], ["type", "click"])
+
+    def test_scroll_burst(self):
+        events = [{"time_stamp": 0.1 * i, "action": "scroll", "x": 5, "y": 5, "dx": 0, "dy": -1} for i in range(5)]
+        events.append({"time_stamp": 2.0, "action": "scroll", "x": 5, "y": 5, "dx": 0, "dy": 1})
+        actions = self.segment(events)
+        self.assertEqual([(a["type"], a["dy"], a["count"]) for a in actions], [("scroll", -5, 5), ("scroll", 1, 1)])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,199 @@
+import asyncio
+import contextlib
+import io
+import os
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from ducktrack import session_engine
+from ducktrack.page_candidates import ACTION_WEIGHTS
+from ducktrack.session_engine import PlaywrightError, SessionEngine, async_playwright, plan_actions, summarize
+
+RESULT_KEYS = {"index", "url", "seed", "status", "error", "load_sec", "duration_sec", "actions"}
+
+PAGE = """<!DOCTYPE html>
+<html><body style="height: 3000px">
+<a href="#top">A link</a> <button onclick="this.textContent = 'clicked'">Button</button>
+<input placeholder="Search">
+</body></html>
+"""
+
+
+class FakePage:
+    def __init__(self, browser, load_sec=0.0, fail_load_state=False):
+        self.browser = browser
+        self.load_sec = load_sec
+        self.fail_load_state = fail_load_state
+        self.closed = False
+
+    async def goto(self, url, **kwargs):
+        self.browser.running += 1
+        self.browser.max_running = max(self.browser.max_running, self.browser.running)
+        try:
+            await asyncio.sleep(self.load_sec)
+        finally:
+            self.browser.running -= 1
+
+    async def wait_for_load_state(self, state, timeout=None):
+        if self.fail_load_state:
+            raise PlaywrightError("Target page, context or browser has been closed")
+
+    def is_closed(self):
+        return self.closed
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.closed = False
+
+    async def new_page(self):
+        return FakePage(self.browser, **self.browser.page_options)
+
+    def on(self, event, handler):
+        pass
+
+    async def close(self):
+        self.closed = True
+
+class FakeBrowser:
+    def __init__(self, **page_options):
+        self.page_options = page_options
+        self.contexts = []
+        self.running = 0
+        self.max_running = 0
+
+    async def new_context(self, **kwargs):
+        context = FakeContext(self)
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        pass
+
+class FakePlaywright:
+    def __init__(self, browser):
+        self.chromium = self
+        self.browser = browser
+
+    async def launch(self, **kwargs):
+        return self.browser
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+class PlanAndSummaryTest(unittest.TestCase):
+    def test_plan_actions(self):
+        plan = plan_actions(random.Random(3), 2000)
+        self.assertEqual(plan, plan_actions(random.Random(3), 2000))
+        self.assertEqual(set(plan), set(ACTION_WEIGHTS))
+        # Follows the action weights
+        total = sum(ACTION_WEIGHTS.values())
+        for kind, weight in ACTION_WEIGHTS.items():
+            self.assertAlmostEqual(plan.count(kind) / len(plan), weight / total, delta=0.05)
+        self.assertEqual(plan_actions(random.Random(3), 0), [])
+
+    def test_summarize(self):
+        results = [{"status": "ok", "load_sec": 1.0, "actions": [{}, {}]},
+                   {"status": "ok", "load_sec": 3.0, "actions": [{}]},
+                   {"status": "timeout", "load_sec": None, "actions": []}]
+        self.assertEqual(summarize(results, 30.0),
+                         "3 sessions in 30.0s (6.0/min): 2 ok, 1 timeout; 3 actions (0.1/s), mean load 2.00s")
+
+class FakeBrowserSessionTest(unittest.TestCase):
+    def test_timeout(self):
+        browser = FakeBrowser(load_sec=5.0)
+        engine = SessionEngine(session_timeout=0.1, num_interactions=0)
+        result = asyncio.run(engine.run_session(browser, 0, "http://example.com/", 1))
+        self.assertEqual(set(result), RESULT_KEYS)
+        self.assertEqual(result["status"], "timeout")
+        self.assertLess(result["duration_sec"], 1.0)
+        self.assertTrue(browser.contexts[0].closed)
+
+    def test_concurrency_limit(self):
+        browser = FakeBrowser(load_sec=0.05)
+        engine = SessionEngine(max_concurrency=3, num_interactions=0)
+        urls = [f"http://example.com/{i}" for i in range(10)]
+        with mock.patch.object(session_engine, "async_playwright", lambda: FakePlaywright(browser)):
+            results = asyncio.run(engine.run(urls, seed=7))
+        self.assertEqual(browser.max_running, 3)
+        self.assertEqual([r["url"] for r in results], urls)
+        self.assertEqual([r["seed"] for r in results], list(range(7, 17)))
+        self.assertEqual({r["status"] for r in results}, {"ok"})
+        self.assertTrue(all(context.closed for context in browser.contexts))
+
+    def test_hook_error_fails_only_its_session(self):
+        async def hook(context, result):
+            if result["index"] == 1:
+                raise KeyError("bad hook")
+
+        browser = FakeBrowser()
+        engine = SessionEngine(num_interactions=0, context_hooks=[hook])
+        with mock.patch.object(session_engine, "async_playwright", lambda: FakePlaywright(browser)):
+            results = asyncio.run(engine.run(["a", "b", "c"]))
+        self.assertEqual([r["status"] for r in results], ["ok", "error", "ok"])
+        self.assertEqual(results[1]["error"], "KeyError: 'bad hook'")
+
+    def test_failed_action_and_reload_fail_only_the_action(self):
+        async def navigated(page):
+            raise PlaywrightError("Execution context was destroyed")
+
+        browser = FakeBrowser(fail_load_state=True)
+        engine = SessionEngine(num_interactions=2)
+        with mock.patch.object(session_engine, "find_candidates_async", navigated), \
+                mock.patch.object(session_engine, "PAUSE_MIN", 0), mock.patch.object(session_engine, "PAUSE_MAX", 0):
+            result = asyncio.run(engine.run_session(browser, 0, "http://example.com/", 1))
+        self.assertEqual(result["status"], "ok")
+        self.assertEqual(len(result["actions"]), 2)
+        for action in result["actions"]:
+            self.assertFalse(action["ok"])
+            self.assertEqual(action["error"], "Execution context was destroyed")
+            self.assertIn("closed", action["load_error"])
+
+@unittest.skipIf(async_playwright is None, "playwright is not installed")
+class LocalPageSessionTest(unittest.TestCase):
+    """Runs real sessions on a local file:// page; skipped when Chromium can't be launched."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp.name, "page.html")
+        with open(path, "w") as f:
+            f.write(PAGE)
+        self.url = Path(path).as_uri()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_engine(self, engine, urls):
+        try:
+            return asyncio.run(engine.run(urls))
+        except Exception as e:
+            if "Executable doesn't exist" in str(e):
+                self.skipTest("Chromium is not installed")
+            raise
+
+    def test_sessions(self):
+        engine = SessionEngine(max_concurrency=2, num_interactions=3)
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = self.run_engine(engine, [self.url] * 3)
+        for index, result in enumerate(results):
+            self.assertEqual(set(result), RESULT_KEYS)
+            self.assertEqual((result["index"], result["status"], result["error"]), (index, "ok", None))
+            self.assertGreaterEqual(result["load_sec"], 0)
+            self.assertEqual(len(result["actions"]), 3)
+            for action in result["actions"]:
+                self.assertLessEqual({"planned", "type", "ok", "duration_sec"}, set(action))
+
+    def test_timeout(self):
+        engine = SessionEngine(session_timeout=0.5, num_interactions=50)
+        results = self.run_engine(engine, [self.url])
+        self.assertEqual(results[0]["status"], "timeout")
+        self.assertLess(results[0]["duration_sec"], 5)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,215 @@
+import contextlib
+import io
+import json
+import os
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from ducktrack.event_index import open_index, read_events
+from ducktrack.synthetic_recorder import ConstantRateVideo, SyntheticRecorder, record_session, sync_playwright
+
+# Fields of each action in Recorder's events.jsonl
+RECORDER_FIELDS = {
+    "move": {"time_stamp", "action", "x", "y"},
+    "click": {"time_stamp", "action", "x", "y", "button", "pressed"},
+    "scroll": {"time_stamp", "action", "x", "y", "dx", "dy"},
+    "press": {"time_stamp", "action", "name"},
+    "release": {"time_stamp", "action", "name"},
+}
+MOUSE_ACTIONS = {"move", "click", "scroll"}
+# Fields of Recorder's metadata.json (MetadataManager plus the OBS timings)
+RECORDER_METADATA = {"system", "node", "release", "version", "machine", "id", "screen_width", "screen_height",
+                     "model", "scroll_direction", "start_time", "stop_time", "obs_record_state_timings"}
+
+PAGE = """<!DOCTYPE html>
+<html><body style="margin: 0; height: 3000px">
+<button id="button" style="position: absolute; left: 100px; top: 100px; width: 200px; height: 60px"
+        onclick="this.textContent = 'clicked'">Click</button>
+<input id="input" style="position: absolute; left: 100px; top: 300px; width: 300px; height: 30px">
+</body></html>
+"""
+
+
+def jpeg(color, size=(64, 48)):
+    frame = np.full((size[1], size[0], 3), color, dtype=np.uint8)
+    return cv2.imencode(".jpg", frame)[1].tobytes()
+
+def read_video(path):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+def read_jsonl(path):
+    with open(path, "r") as f:
+        return [json.loads(line) for line in f]
+
+class ConstantRateVideoTest(unittest.TestCase):
+    def test_repeats_frames_at_a_constant_rate(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "video.mp4")
+            video = ConstantRateVideo(path, fps=10, screen_size=(96, 64), viewport_size=(64, 48), offset=(32, 16))
+            video.add(100.0, jpeg(200))
+            video.add(100.35, jpeg(50))   # Irregular arrival: the first frame covers 4 ticks
+            video.add(100.36, b"not a jpeg")
+            video.close(100.6)
+            self.assertEqual(video.start_time, 100.0)
+            self.assertEqual(video.frames_written, 6)
+
+            frames = read_video(path)
+            self.assertEqual(len(frames), 6)
+            self.assertEqual(frames[0].shape, (64, 96, 3))
+            # The viewport sits at the offset on a gray screen
+            self.assertLess(abs(int(frames[0][16 + 24, 32 + 32, 0]) - 200), 10)
+            self.assertLess(abs(int(frames[0][5, 5, 0]) - 48), 10)
+            self.assertLess(abs(int(frames[5][16 + 24, 32 + 32, 0]) - 50), 10)
+
+class FailingCdpPage:
+    """Just enough of a Playwright page for SyntheticRecorder to get to its CDP session, which fails."""
+
+    class context:
+        class browser:
+            class browser_type:
+                name = "chromium"
+
+        @staticmethod
+        def new_cdp_session(page):
+            raise RuntimeError("no CDP")
+
+    viewport_size = {"width": 64, "height": 48}
+    url = "file:///page.html"
+
+class SyntheticRecorderStartTest(unittest.TestCase):
+    def test_failed_start_closes_files_and_writes_metadata(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "recording")
+            recorder = SyntheticRecorder(FailingCdpPage(), path)
+            with contextlib.redirect_stdout(io.StringIO()), self.assertRaises(RuntimeError):
+                recorder.start()
+            self.assertTrue(recorder.events_file.closed)
+            with open(os.path.join(path, "metadata.json"), "r") as f:
+                self.assertEqual(json.load(f)["error"], "RuntimeError: no CDP")
+
+def launch_chromium(test):
+    """Starts Playwright and a headless Chromium for `test`'s class, or skips it if there is none."""
+    if sync_playwright is None:
+        raise unittest.SkipTest("playwright is not installed")
+    test.playwright = sync_playwright().start()
+    try:
+        test.browser = test.playwright.chromium.launch(headless=True)
+    except Exception as e:
+        test.playwright.stop()
+        raise unittest.SkipTest(f"Chromium is not available ({str(e).splitlines()[0]})")
+
+class SyntheticSessionTest(unittest.TestCase):
+    """Records sessions of a local file:// page, so no network is needed."""
+
+    @classmethod
+    def setUpClass(cls):
+        launch_chromium(cls)
+        cls.tmp = tempfile.TemporaryDirectory()
+        page_path = os.path.join(cls.tmp.name, "page.html")
+        with open(page_path, "w") as f:
+            f.write(PAGE)
+        cls.url = Path(page_path).as_uri()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.browser.close()
+        cls.playwright.stop()
+        cls.tmp.cleanup()
+
+    def check_recording(self, recording_path, screen_offset):
+        events = read_jsonl(os.path.join(recording_path, "events.jsonl"))
+        self.assertTrue(events)
+        for event in events:
+            fields = RECORDER_FIELDS[event["action"]]
+            if event["action"] in MOUSE_ACTIONS:
+                # Screen coordinates are the page coordinates moved by the viewport's offset
+                self.assertEqual(set(event), fields | {"page_x", "page_y"})
+                self.assertAlmostEqual(event["x"], event["page_x"] + screen_offset[0])
+                self.assertAlmostEqual(event["y"], event["page_y"] + screen_offset[1])
+            else:
+                self.assertEqual(set(event), fields)
+        times = [event["time_stamp"] for event in events]
+        self.assertEqual(times, sorted(times))
+
+        index = open_index(recording_path)
+        self.assertIsNotNone(index)
+        middle = times[len(times) // 2]
+        window, first_index = read_events(recording_path, middle)
+        self.assertEqual(window, events[first_index:])
+
+        with open(os.path.join(recording_path, "metadata.json"), "r") as f:
+            metadata = json.load(f)
+        self.assertLessEqual(RECORDER_METADATA, set(metadata))
+        timings = metadata["obs_record_state_timings"]
+        self.assertLessEqual(timings["OBS_WEBSOCKET_OUTPUT_STARTED"][0], times[0])
+        self.assertGreaterEqual(timings["OBS_WEBSOCKET_OUTPUT_STOPPING"][0], times[-1])
+        return events, metadata
+
+    def test_recorded_actions(self):
+        offset = (10, 80)
+        path = os.path.join(self.tmp.name, "actions")
+        context = self.browser.new_context(viewport={"width": 640, "height": 480}, device_scale_factor=1)
+        try:
+            page = context.new_page()
+            page.goto(self.url)
+            recorder = SyntheticRecorder(page, path, fps=10, screen_offset=offset)
+            with contextlib.redirect_stdout(io.StringIO()):
+                recorder.start()
+                try:
+                    recorder.move_to(200, 130, 0.1)
+                    recorder.click(0.05)
+                    recorder.move_to(250, 315, 0.1)
+                    recorder.click(0.05)
+                    recorder.type_text("Hi", random.Random(0))
+                    recorder.scroll(2)
+                finally:
+                    recorder.stop()
+            self.assertEqual(page.text_content("#button"), "clicked")
+            self.assertEqual(page.input_value("#input"), "Hi")
+        finally:
+            context.close()
+
+        events, metadata = self.check_recording(path, offset)
+        clicks = [e for e in events if e["action"] == "click"]
+        self.assertEqual([(e["page_x"], e["page_y"], e["pressed"]) for e in clicks],
+                         [(200, 130, True), (200, 130, False), (250, 315, True), (250, 315, False)])
+        self.assertEqual([e["name"] for e in events if e["action"] == "press"], ["shift", "H", "i"])
+        self.assertEqual([e["dy"] for e in events if e["action"] == "scroll"], [-1, -1])
+        self.assertEqual((metadata["screen_width"], metadata["screen_height"]), (650, 560))
+
+        frames = read_video(os.path.join(path, "recording.mp4"))
+        self.assertEqual(len(frames), metadata["synthetic"]["frames"])
+        self.assertEqual(frames[0].shape, (560, 650, 3))
+
+    def test_record_session(self):
+        path = os.path.join(self.tmp.name, "session")
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = record_session(self.browser, self.url, path, seed=1, num_interactions=3, fps=10,
+                                    viewport=(640, 480))
+        self.assertNotIn("error", result)
+        self.assertEqual(result["recording"], path)
+        events, _ = self.check_recording(path, (0, 0))
+        self.assertEqual(result["events"], len(events))
+
+    def test_unreachable_page_is_a_failed_session(self):
+        path = os.path.join(self.tmp.name, "missing")
+        result = record_session(self.browser, Path(self.tmp.name, "missing.html").as_uri(), path, seed=1)
+        self.assertIsNone(result["recording"])
+        self.assertTrue(result["error"])
+        self.assertFalse(os.path.exists(path))
+
+if __name__ == "__main__":
+    unittest.main()